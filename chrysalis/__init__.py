@@ -2,12 +2,36 @@ from chrysalis._internal import _invariants as invariants
 from chrysalis._internal._controller import (
     register as register,
 )
+from chrysalis._internal._controller import (
+    replay as replay,
+)
 from chrysalis._internal._controller import (
     run as run,
 )
+from chrysalis._internal._controller import (
+    shrink as shrink,
+)
+from chrysalis._internal._relation import (
+    deterministic as deterministic,
+)
+from chrysalis._internal._results import (
+    export_results as export_results,
+)
+from chrysalis._internal._results import (
+    load_results as load_results,
+)
+from chrysalis._internal._sut import (
+    batched as batched,
+)
 
 __all__ = (
     "register",
     "run",
+    "replay",
+    "shrink",
+    "batched",
+    "deterministic",
+    "export_results",
+    "load_results",
     "invariants",
 )
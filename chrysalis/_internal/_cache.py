@@ -0,0 +1,50 @@
+"""
+Caching of values computed from input data.
+
+Input data objects are not necessarily hashable, so they are identified by the content
+hash of their serialization instead (see `_serialization.content_hash`). Two objects
+with the same serialized content are indistinguishable once they have been recorded by
+the engine, which makes the content hash a safe cache key for deterministic
+computations.
+"""
+
+from collections import OrderedDict
+from typing import overload
+
+
+class LRUCache[K, V]:
+    """
+    A mapping holding at most a fixed number of entries.
+
+    Once the cache is full, the least recently used entry is evicted whenever a new
+    entry is added.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        if max_size < 1:
+            raise ValueError("The maximum size of a cache must be at least 1.")
+        self._max_size = max_size
+        self._entries: OrderedDict[K, V] = OrderedDict()
+
+    @overload
+    def get(self, key: K) -> V | None: ...
+
+    @overload
+    def get[D](self, key: K, default: D) -> V | D: ...
+
+    def get[D](self, key: K, default: D | None = None) -> V | D | None:
+        """Return the value of an entry and mark it as recently used, if it exists."""
+        if key not in self._entries:
+            return default
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: K, value: V) -> None:
+        """Add an entry, evicting the least recently used entry if the cache is full."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,30 @@
+import pytest
+
+from chrysalis._internal._cache import LRUCache
+
+
+def test_lru_cache_eviction() -> None:
+    cache = LRUCache[str, int](max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    # Reading "a" makes "b" the least recently used entry.
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_default() -> None:
+    cache = LRUCache[str, int | None](max_size=1)
+    cache.put("a", None)
+    missing = object()
+    assert cache.get("a", missing) is None
+    assert cache.get("b", missing) is missing
+
+
+def test_lru_cache_invalid_size() -> None:
+    with pytest.raises(ValueError, match="at least 1"):
+        LRUCache[str, int](max_size=0)
@@ -1,10 +1,28 @@
-from collections.abc import Callable
+import sqlite3
+import uuid
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
 
 import duckdb
 
-from chrysalis._internal._engine import Engine, TemporarySqlite3RelationConnection
-from chrysalis._internal._relation import KnowledgeBase
-from chrysalis._internal._search import SearchSpace, SearchStrategy
+from chrysalis._internal import _replay, _shrink
+from chrysalis._internal._engine import (
+    Engine,
+    PersistentSqlite3RelationConnection,
+    Recorder,
+    TemporaryDuckDBRelationConnection,
+    TemporarySqlite3RelationConnection,
+)
+from chrysalis._internal._relation import Invariant, KnowledgeBase, Relation
+from chrysalis._internal._results import export_results
+from chrysalis._internal._search import (
+    _ONLINE_STRATEGIES,
+    RelationChain,
+    SearchSpace,
+    SearchStrategy,
+)
+from chrysalis._internal._sut import SystemUnderTest
 from chrysalis._internal._writer import TerminalUIWriter, Verbosity
 
 _CURRENT_KNOWLEDGE_BASE: KnowledgeBase | None = None
@@ -17,6 +35,23 @@ and for the knowledge base to be reset. It is important that this global variabl
 uninitialized so that its generic can be specified at run time.
 """
 
+_SELECT_COMPLETED_CHAIN_LINKS = """
+WITH RECURSIVE completed_link (seed, previous_link, transformation, link_index) AS (
+    SELECT c.seed, l.previous_link, l.transformation, l.link_index
+    FROM completed_chain c
+    JOIN chain_link l ON l.id = c.last_link
+    UNION ALL
+    SELECT c.seed, l.previous_link, l.transformation, l.link_index
+    FROM completed_link c
+    JOIN chain_link l ON l.id = c.previous_link
+)
+SELECT c.seed, t.name
+FROM completed_link c
+JOIN transformation t ON t.id = c.transformation
+ORDER BY c.seed, c.link_index;
+"""
+"""Select the recorded transformations of every completed relation chain in order."""
+
 
 def new_knowledge_base() -> None:
     """Initialize a new knowledge base for the module."""
@@ -26,9 +61,17 @@ def new_knowledge_base() -> None:
 
 def register[T, R](
     transformation: Callable[[T], T],
-    invariant: Callable[[R, R], bool],
+    invariant: Invariant[R],
+    idempotent: bool = False,
+    commutes_with: Iterable[Callable[[T], T]] = (),
 ) -> None:
-    """Register a metamorphic relation into the current knowledge base."""
+    """
+    Register a metamorphic relation into the current knowledge base.
+
+    A transformation can be declared idempotent, or to commute with other
+    transformations, so that the exhaustive search strategy skips relation chains that
+    are equivalent to another relation chain.
+    """
     global _CURRENT_KNOWLEDGE_BASE  # NOQA: PLW0603
     if _CURRENT_KNOWLEDGE_BASE is None:
         _CURRENT_KNOWLEDGE_BASE = KnowledgeBase()
@@ -36,31 +79,65 @@ def register[T, R](
     _CURRENT_KNOWLEDGE_BASE.register(
         transformation=transformation,
         invariant=invariant,
+        idempotent=idempotent,
+        commutes_with=commutes_with,
     )
 
 
 def run[T, R](
-    sut: Callable[[T], R],
-    input_data: list[T],
+    sut: SystemUnderTest[T, R],
+    input_data: Iterable[T],
     search_strategy: SearchStrategy = SearchStrategy.RANDOM,
     chain_length: int = 10,
     num_chains: int = 10,
     num_processes: int = 1,
     verbosity: Verbosity = Verbosity.FAILURE,
+    persist_baseline_results: bool = False,
+    share_prefixes: bool = False,
+    batched: bool | None = None,
+    batch_size: int | None = None,
+    max_concurrency: int = 16,
+    num_threads: int = 1,
+    window_size: int | None = None,
+    prune_failed_inputs: bool = False,
+    max_failures: int | None = None,
+    time_budget: float | None = None,
+    catch_errors: bool = False,
+    sut_timeout: float | None = None,
+    transformation_timeout: float | None = None,
+    isolate_calls: bool = False,
+    max_calls_per_worker: int | None = None,
+    transformation_cache_size: int = 1024,
+    skip_fixed_points: bool = False,
+    recorder: Recorder = Recorder.SQLITE,
+    results_dir: str | Path | None = None,
+    run_dir: str | Path | None = None,
+    run_id: str | None = None,
+    snapshot_interval: int | None = None,
 ) -> duckdb.DuckDBPyConnection | None:
     """
     Run metamorphic testing on the SUT using previously registered relations.
 
     Parameter
     ---------
-    sut : Callable[[T], R]
-        The 'system under test' that is currenting being tested.
-    input_data : list[T]
+    sut : SystemUnderTest[T, R]
+        The 'system under test' that is currenting being tested. If the SUT is batched,
+        it accepts a list of inputs and returns a list of results in the same order. The
+        SUT may also be a coroutine function, in which case the inputs of each relation
+        chain link are awaited concurrently.
+    input_data : Iterable[T]
         The input data to be transformed and used as input into the SUT. Each input
-        object in the input data should be serializable by pickling.
+        object in the input data should be serializable by pickling. The input data can
+        be any iterable, including a generator, but it is only streamed instead of held
+        in memory if a window size is specified.
     search_strategy : SearchStrategy, optional
-        The search strategy to use when generating metamorphic relation chains. The
-        serach strategy defaults to `SearchStrategy.RANDOM`.
+        The search strategy to use when generating metamorphic relation chains. With
+        `SearchStrategy.DYNAMIC`, relation chains are generated while executing and
+        favor the relations that failed invariants most often per second of execution
+        so far. With `SearchStrategy.COVERAGE`, the line coverage of the SUT is
+        collected with `sys.monitoring` and relation chains are derived from the
+        relation chains that reached new coverage, which is not supported with isolated
+        calls or more than one process. The serach strategy defaults to `SearchStrategy.RANDOM`.
     chain_length : int, optional
         The number of relations in each generated metamorphic relation chain. The chain
         length defaults to 10.
@@ -68,24 +145,184 @@ def run[T, R](
         The number of metamorphic chains to generate. The number of chains defaults to
         10.
     num_processes : int, optional
-        The number of processes to use when performing metamorphic testing.
+        The number of processes to use when performing metamorphic testing. If more
+        than one process is used, relation chains are distributed across a process pool
+        and the SUT, input data and transformations must be picklable.
     verbosity : Verbosity, optional
         The verbosity of logging during execution.
+    persist_baseline_results : bool, optional
+        Whether the results of the SUT on the unmodified input data should be stored in
+        the `baseline_result` table. Baseline results are always computed once and
+        shared by every relation chain, regardless of this setting.
+    share_prefixes : bool, optional
+        Whether relation chains that share leading relations should evaluate the shared
+        prefix only once. Transformations must not mutate their input in place when
+        prefixes are shared.
+    batched : bool | None, optional
+        Whether the SUT accepts a list of inputs instead of a single input. If not
+        specified, the SUT is batched if it was decorated with `chrysalis.batched`.
+    batch_size : int | None, optional
+        The maximum number of inputs passed to a batched SUT in a single call. If not
+        specified, the batch size of the `chrysalis.batched` decorator is used,
+        otherwise all inputs of a relation chain link are passed at once.
+    max_concurrency : int, optional
+        The maximum number of concurrent calls to an asynchronous SUT. The maximum
+        concurrency defaults to 16 and is ignored for synchronous SUTs.
+    num_threads : int, optional
+        The number of threads used to call a synchronous SUT within each process. This
+        is useful for SUTs that release the GIL, such as C extensions or subprocess
+        calls. The number of threads defaults to 1.
+    window_size : int | None, optional
+        The number of inputs processed at once. If specified, input data is streamed
+        into the results database and relation chains are executed on windows of at
+        most this many inputs, so peak memory is bounded by the window size. If not
+        specified, all input data is held in memory.
+    prune_failed_inputs : bool, optional
+        Whether an input should be dropped from the rest of a relation chain after it
+        first fails an invariant. This is useful for triage runs, the number of skipped
+        SUT calls is reported in the summary.
+    max_failures : int | None, optional
+        The number of failed invariants after which the run is stopped. When using
+        multiple processes, links that are already executing are allowed to finish so
+        slightly more failures may be recorded. If not specified, the run is never
+        stopped early.
+    time_budget : float | None, optional
+        The number of seconds the run is allowed to take. If specified, relation chains
+        are generated lazily and executed until the time budget is exhausted, ignoring
+        the number of chains. Relation chains that are not expected to complete in time
+        are not started, and all results recorded before the deadline are returned.
+    catch_errors : bool, optional
+        Whether exceptions raised by the SUT or a transformation should be recorded in
+        the `failed_execution` table instead of aborting the run. The affected input is
+        dropped from the rest of the relation chain. Errors are always caught if a
+        timeout is specified or calls are isolated.
+    sut_timeout : float | None, optional
+        The number of seconds a single call to the SUT (or a single batch) is allowed to
+        take before it is recorded as timed out.
+    transformation_timeout : float | None, optional
+        The number of seconds a single transformation is allowed to take before it is
+        recorded as timed out.
+    isolate_calls : bool, optional
+        Whether calls to a synchronous SUT and to transformations should be executed in
+        supervised worker processes, so that a call which crashes the interpreter is
+        recorded instead of aborting the run. The SUT, transformations, input data and
+        results must be picklable.
+    max_calls_per_worker : int | None, optional
+        The number of calls after which an isolated worker process is replaced, which
+        prevents state leaked by the SUT from accumulating. If not specified, workers
+        are only replaced after a timeout or crash.
+    transformation_cache_size : int, optional
+        The maximum number of outputs of transformations decorated with
+        `chrysalis.deterministic` that are cached within each process. The cache size
+        defaults to 1024, and a cache size of 0 disables caching.
+    skip_fixed_points : bool, optional
+        Whether the SUT should be skipped for transformed inputs that are identical to
+        their previous input, reusing the previous result instead. Inputs are compared
+        by identity or by the hash of their serialized content. This assumes the SUT is
+        deterministic, and the number of skipped calls is reported in the summary.
+    recorder : Recorder, optional
+        The database that results are recorded into during execution. With
+        `Recorder.SQLITE`, results are recorded into sqlite and converted into duckdb
+        once the run finishes, which requires the duckdb sqlite extension. With
+        `Recorder.DUCKDB`, results are appended directly into an in-memory duckdb
+        database in bulk, so no conversion is required and the run works offline. The
+        recorder defaults to `Recorder.SQLITE`.
+    results_dir : str | Path | None, optional
+        The directory that the results are exported into as Parquet files, with
+        invariant failures partitioned by invariant and transformation. The exported
+        results can be opened again with `chrysalis.load_results`. If not specified,
+        the results are only returned.
+    run_dir : str | Path | None, optional
+        The directory that persistent runs are recorded into. If specified, the run is
+        recorded into a sqlite database within a subdirectory named after the run ID,
+        which is kept after the run and checkpoints the seed of every completed relation
+        chain. Baseline results are always persisted. Only the sqlite recorder supports
+        persistent runs.
+    run_id : str | None, optional
+        The ID of a persistent run. Relation chains are generated from a seed derived
+        from the run ID, so restarting a run with the same run ID and arguments skips
+        the relation chains that already completed and continues from where the run
+        stopped. The records of relation chains that were stopped before they completed
+        are discarded, and those chains are executed again. If not specified, a new run
+        ID is generated and printed in the header.
+    snapshot_interval : int | None, optional
+        The number of relation chain links between snapshots of the transformed input
+        data, which are stored in the `input_snapshot` table. Replaying a failed
+        invariant with `chrysalis.replay` then applies at most this many
+        transformations again. If not specified, no snapshots are taken.
     """
     if _CURRENT_KNOWLEDGE_BASE is None:
         raise RuntimeError(
             "No metamorphic relations have been registered in the current session, exiting."
         )
-    search_space = SearchSpace(
-        knowledge_base=_CURRENT_KNOWLEDGE_BASE,
-        strategy=search_strategy,
-        chain_length=chain_length,
+    relation_connection: (
+        TemporaryDuckDBRelationConnection
+        | TemporarySqlite3RelationConnection
+        | PersistentSqlite3RelationConnection
     )
-    relation_chains = search_space.generate_chains(num_chains=num_chains)
-    writer = TerminalUIWriter(verbosity=verbosity, pretty=True, total_relations=len(relation_chains))
-    writer.print_header(search_strategy, chain_length, num_chains)
+    if run_dir is None:
+        relation_connection = (
+            TemporaryDuckDBRelationConnection()
+            if recorder == Recorder.DUCKDB
+            else TemporarySqlite3RelationConnection()
+        )
+    else:
+        if recorder != Recorder.SQLITE:
+            raise ValueError("Persistent runs are only supported by the sqlite recorder.")
+        run_id = uuid.uuid4().hex if run_id is None else run_id
+        relation_connection = PersistentSqlite3RelationConnection(Path(run_dir) / run_id)
+        persist_baseline_results = True
+
+    with relation_connection as (conn, db_path):
+        # The relation chains of a resumed run that already completed are skipped.
+        completed_chains = _completed_chains(conn)
+        search_space = SearchSpace(
+            knowledge_base=_CURRENT_KNOWLEDGE_BASE,
+            strategy=search_strategy,
+            chain_length=chain_length,
+            # The seeds of the online strategies only identify relation chains within
+            # a run, so a resumed run draws seeds that differ from the completed ones.
+            seed=(
+                f"{run_id}:{len(completed_chains)}"
+                if search_strategy in _ONLINE_STRATEGIES and len(completed_chains) > 0
+                else run_id
+            ),
+        )
+        relation_chains: Iterable[list[Relation]]
+        if time_budget is None and search_strategy not in _ONLINE_STRATEGIES:
+            remaining_chains = list(
+                _iter_remaining_chains(
+                    search_space, search_strategy, completed_chains, num_chains
+                )
+            )
+            writer = TerminalUIWriter(
+                verbosity=verbosity,
+                pretty=True,
+                total_relations=len(remaining_chains),
+            )
+            # Persistent runs pass their relation chains lazily, so that the engine
+            # commits a checkpoint after every chunk of relation chains.
+            relation_chains = (
+                remaining_chains if run_dir is None else iter(remaining_chains)
+            )
+        else:
+            # Relation chains are generated while executing, either until the time
+            # budget is exhausted or from the outcomes of the previous relation chains.
+            relation_chains = _iter_remaining_chains(
+                search_space,
+                search_strategy,
+                completed_chains,
+                num_chains if time_budget is None else None,
+            )
+            writer = TerminalUIWriter(
+                verbosity=verbosity,
+                pretty=True,
+                total_relations=num_chains if time_budget is None else None,
+            )
+        writer.print_header(
+            search_strategy, chain_length, num_chains, time_budget, run_id=run_id
+        )
 
-    with TemporarySqlite3RelationConnection() as (conn, db_path):
         engine = Engine(
             sut=sut,
             sqlite_conn=conn,
@@ -93,9 +330,191 @@ def run[T, R](
             sqlite_db=db_path,
             writer=writer,
             num_processes=num_processes,
+            persist_baseline_results=persist_baseline_results,
+            share_prefixes=share_prefixes,
+            batched=batched,
+            batch_size=batch_size,
+            max_concurrency=max_concurrency,
+            num_threads=num_threads,
+            window_size=window_size,
+            prune_failed_inputs=prune_failed_inputs,
+            max_failures=max_failures,
+            catch_errors=catch_errors,
+            sut_timeout=sut_timeout,
+            transformation_timeout=transformation_timeout,
+            isolate_calls=isolate_calls,
+            max_calls_per_worker=max_calls_per_worker,
+            transformation_cache_size=transformation_cache_size,
+            skip_fixed_points=skip_fixed_points,
+            snapshot_interval=snapshot_interval,
+            collect_coverage=search_strategy == SearchStrategy.COVERAGE,
+        )
+        engine.execute(
+            relation_chains,
+            time_budget=time_budget,
+            on_chain_executed=search_space.observe,
         )
-        engine.execute(relation_chains)
 
         writer.print_failed_relations()
 
-        return engine.results_to_duckdb()
+        # The sqlite database of a persistent run is kept, so it is summarized as well.
+        if run_dir is not None:
+            engine.create_summaries()
+
+        results = engine.results_to_duckdb()
+        if results_dir is not None:
+            export_results(results, results_dir)
+        return results
+
+
+def replay[T, R](
+    results: duckdb.DuckDBPyConnection,
+    failed_invariant_id: int,
+    sut: SystemUnderTest[T, R],
+    batched: bool | None = None,
+) -> _replay.Replay:
+    """
+    Replay the relation chain link at which an invariant failed.
+
+    The transformations of the relation chain are looked up by name in the current
+    knowledge base, so the relations of the run must still be registered. The returned
+    replay holds the inputs before and after the transformation of the failed link and
+    the results of the SUT on both.
+
+    Parameter
+    ---------
+    results : duckdb.DuckDBPyConnection
+        The results of a run, as returned by `run` or `chrysalis.load_results`.
+    failed_invariant_id : int
+        The id of the record in the `failed_invariant` view to replay.
+    sut : SystemUnderTest[T, R]
+        The 'system under test' that was tested during the run.
+    batched : bool | None, optional
+        Whether the SUT accepts a list of inputs instead of a single input. If not
+        specified, the SUT is batched if it was decorated with `chrysalis.batched`.
+    """
+    if _CURRENT_KNOWLEDGE_BASE is None:
+        raise RuntimeError(
+            "No metamorphic relations have been registered in the current session, exiting."
+        )
+    return _replay.replay(
+        conn=results,
+        failed_invariant_id=failed_invariant_id,
+        sut=sut,
+        relations={
+            relation.transformation_name: relation
+            for relation in _CURRENT_KNOWLEDGE_BASE.relations
+        },
+        batched=batched,
+    )
+
+
+def shrink[T, R](
+    results: duckdb.DuckDBPyConnection,
+    failed_invariant_id: int,
+    sut: SystemUnderTest[T, R],
+    batched: bool | None = None,
+    shrink_input: Callable[[T], Iterable[T]] | None = None,
+) -> _shrink.Shrink:
+    """
+    Shrink the relation chain and input at which an invariant failed.
+
+    The relation chain up to the failed link is shrunk with delta debugging into the
+    shortest relation chain found that still fails the same invariant, and the input is
+    shrunk alongside it. Results of the SUT are cached across attempts, and the number
+    of calls to the SUT is returned along with the shrunk relation chain and input. As
+    with `replay`, the relations of the run must still be registered.
+
+    Parameter
+    ---------
+    results : duckdb.DuckDBPyConnection
+        The results of a run, as returned by `run` or `chrysalis.load_results`.
+    failed_invariant_id : int
+        The id of the record in the `failed_invariant` view to shrink.
+    sut : SystemUnderTest[T, R]
+        The 'system under test' that was tested during the run.
+    batched : bool | None, optional
+        Whether the SUT accepts a list of inputs instead of a single input. If not
+        specified, the SUT is batched if it was decorated with `chrysalis.batched`.
+    shrink_input : Callable[[T], Iterable[T]] | None, optional
+        A function returning smaller candidates of an input, which are tried in order.
+        If not specified, inputs that are strings, bytes, lists or tuples are shrunk by
+        dropping elements, and any other input is kept as is.
+    """
+    if _CURRENT_KNOWLEDGE_BASE is None:
+        raise RuntimeError(
+            "No metamorphic relations have been registered in the current session, exiting."
+        )
+    return _shrink.shrink(
+        conn=results,
+        failed_invariant_id=failed_invariant_id,
+        sut=sut,
+        relations={
+            relation.transformation_name: relation
+            for relation in _CURRENT_KNOWLEDGE_BASE.relations
+        },
+        batched=batched,
+        shrink_input=shrink_input,
+    )
+
+
+def _completed_chains(
+    conn: sqlite3.Connection | duckdb.DuckDBPyConnection,
+) -> dict[int, tuple[str, ...]]:
+    """
+    Return the recorded transformations of each completed relation chain by its seed.
+
+    Only the links that were executed on at least one input are recorded, so the
+    recorded transformations of a relation chain may be a prefix of its relations.
+    """
+    completed_chains: dict[int, tuple[str, ...]] = {
+        seed: ()
+        for (seed,) in conn.execute("SELECT seed FROM completed_chain;").fetchall()
+    }
+    for seed, transformation in conn.execute(
+        _SELECT_COMPLETED_CHAIN_LINKS
+    ).fetchall():
+        completed_chains[seed] += (transformation,)
+    return completed_chains
+
+
+def _iter_remaining_chains(
+    search_space: SearchSpace,
+    search_strategy: SearchStrategy,
+    completed_chains: dict[int, tuple[str, ...]],
+    num_chains: int | None,
+) -> Iterator[RelationChain]:
+    """
+    Lazily generate the relation chains of a run that did not complete yet.
+
+    The random and exhaustive strategies always generate the same relation chain from
+    the same seed, so the relation chains whose seed completed are skipped. The online
+    strategies also generate relation chains from the outcomes observed before them, so
+    completed relation chains are identified by their transformations instead. Each
+    completed relation chain skips one generated relation chain with the same
+    transformations, and only as many relation chains are executed as did not complete.
+    """
+    if search_strategy not in _ONLINE_STRATEGIES:
+        yield from (
+            relation_chain
+            for relation_chain in search_space.iter_chains(num_chains=num_chains)
+            if relation_chain.seed not in completed_chains
+        )
+        return
+
+    unmatched_chains = Counter(completed_chains.values())
+    num_remaining = (
+        None if num_chains is None else max(num_chains - len(completed_chains), 0)
+    )
+    num_generated = 0
+    for relation_chain in search_space.iter_chains():
+        if num_remaining is not None and num_generated >= num_remaining:
+            return
+        transformations = tuple(
+            relation.transformation_name for relation in relation_chain
+        )
+        if unmatched_chains[transformations] > 0:
+            unmatched_chains[transformations] -= 1
+            continue
+        yield relation_chain
+        num_generated += 1
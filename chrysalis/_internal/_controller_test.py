@@ -1,8 +1,15 @@
+import ast
+
 from chrysalis._internal import _controller as controller
 from chrysalis._internal import _invariants as invariants
+from chrysalis._internal._engine import Recorder
+from chrysalis._internal._search import RelationChain, SearchSpace, SearchStrategy
+from chrysalis._internal._writer import Verbosity
 from chrysalis._internal.conftest import (
+    eval_expr,
     identity,
     inverse,
+    subtract_1_from_expression,
 )
 
 
@@ -48,3 +55,131 @@ def test_multiple_register() -> None:
         invariants.is_same_sign,
     }
     assert knowledge_base._relations["inverse"].invariants == [invariants.not_equals]
+
+
+def test_run_parallel(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+) -> None:
+    controller.new_knowledge_base()
+    controller.register(
+        transformation=identity,
+        invariant=invariants.equals,
+    )
+    controller.register(
+        transformation=subtract_1_from_expression,
+        invariant=invariants.equals,
+    )
+
+    results = controller.run(
+        sut=eval_expr,
+        input_data=[sample_expression_1, sample_expression_2],
+        chain_length=3,
+        num_chains=4,
+        num_processes=2,
+        verbosity=Verbosity.SILENT,
+        recorder=Recorder.DUCKDB,
+    )
+
+    assert results is not None
+    assert results.execute("SELECT COUNT(*) FROM applied_transformation;").fetchall() == [
+        (12,)
+    ]
+    assert results.execute("SELECT COUNT(*) FROM failed_execution;").fetchall() == [(0,)]
+
+
+def test_run_isolated(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+) -> None:
+    controller.new_knowledge_base()
+    controller.register(
+        transformation=identity,
+        invariant=invariants.equals,
+    )
+    controller.register(
+        transformation=subtract_1_from_expression,
+        invariant=invariants.equals,
+    )
+
+    results = controller.run(
+        sut=eval_expr,
+        input_data=[sample_expression_1, sample_expression_2],
+        chain_length=3,
+        num_chains=2,
+        verbosity=Verbosity.SILENT,
+        isolate_calls=True,
+        recorder=Recorder.DUCKDB,
+    )
+
+    assert results is not None
+    assert results.execute("SELECT COUNT(*) FROM failed_execution;").fetchall() == [(0,)]
+    [(num_failed_invariants,)] = results.execute(
+        "SELECT COUNT(*) FROM failed_invariant;"
+    ).fetchall()
+    [(num_subtract_links,)] = results.execute(
+        """
+SELECT COUNT(*)
+FROM applied_transformation
+WHERE name = 'subtract_1_from_expression';
+"""
+    ).fetchall()
+    assert num_failed_invariants == 2 * num_subtract_links
+
+
+def test_iter_remaining_chains() -> None:
+    controller.new_knowledge_base()
+    controller.register(
+        transformation=identity,
+        invariant=invariants.equals,
+    )
+    controller.register(
+        transformation=subtract_1_from_expression,
+        invariant=invariants.equals,
+    )
+    knowledge_base = controller._CURRENT_KNOWLEDGE_BASE
+    assert knowledge_base is not None
+
+    def transformations(relation_chain: RelationChain) -> tuple[str, ...]:
+        return tuple(relation.transformation_name for relation in relation_chain)
+
+    def remaining_seeds(
+        strategy: SearchStrategy, completed_chains: dict[int, tuple[str, ...]]
+    ) -> list[int]:
+        search_space = SearchSpace(
+            knowledge_base, strategy=strategy, chain_length=3, seed="run"
+        )
+        return [
+            relation_chain.seed
+            for relation_chain in controller._iter_remaining_chains(
+                search_space, strategy, completed_chains, 4
+            )
+        ]
+
+    for strategy in (SearchStrategy.RANDOM, SearchStrategy.DYNAMIC):
+        relation_chains = SearchSpace(
+            knowledge_base, strategy=strategy, chain_length=3, seed="run"
+        ).generate_chains(num_chains=5)
+        seeds = [relation_chain.seed for relation_chain in relation_chains]
+        completed_chain = relation_chains[1]
+
+        if strategy == SearchStrategy.RANDOM:
+            # The seed of a completed relation chain identifies it.
+            assert remaining_seeds(strategy, {completed_chain.seed: ()}) == [
+                seeds[0],
+                *seeds[2:4],
+            ]
+        else:
+            # The seed of a completed relation chain does not identify it, but the
+            # first relation chain with the same transformations is skipped instead.
+            skipped = next(
+                i
+                for i, relation_chain in enumerate(relation_chains)
+                if transformations(relation_chain) == transformations(completed_chain)
+            )
+            assert remaining_seeds(
+                strategy, {-1: transformations(completed_chain)}
+            ) == [seed for i, seed in enumerate(seeds) if i != skipped][:3]
+            assert remaining_seeds(strategy, {completed_chain.seed: ("missing",)}) == (
+                seeds[:3]
+            )
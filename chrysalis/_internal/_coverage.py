@@ -0,0 +1,81 @@
+"""
+Line coverage of the SUT collected with `sys.monitoring`.
+
+Coverage is only used to tell whether calling the SUT reached code that was never
+reached before, so each line only needs to be reported once. The line event of a line
+is disabled as soon as it is reported, after which executing the line again costs
+nothing, and events are only enabled while the SUT is being called. Lines reached
+during the baseline calls of the SUT are therefore never reported as new coverage for
+a relation chain. Lines are identified by their file name and line number, so code that
+is compiled again on every call (such as by `eval`) is only reported once as well.
+
+Events are process-wide, so a single collector is shared by every engine within a
+process. Calls that are isolated in supervised worker processes cannot be monitored.
+"""
+
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import CodeType
+
+_TOOL_NAME = "chrysalis"
+
+_TOOL_IDS = (sys.monitoring.COVERAGE_ID, 3, 4)
+"""The tool ids that can be used for coverage, in order of preference."""
+
+
+class CoverageCollector:
+    """
+    Count the lines of code that are executed for the first time while collecting.
+
+    Use `get_collector` to obtain the collector of the current process.
+    """
+
+    def __init__(self) -> None:
+        for tool_id in _TOOL_IDS:
+            if sys.monitoring.get_tool(tool_id) is None:
+                break
+        else:
+            raise RuntimeError(
+                "Coverage cannot be collected since every coverage tool id is in use."
+            )
+        sys.monitoring.use_tool_id(tool_id, _TOOL_NAME)
+        sys.monitoring.register_callback(
+            tool_id, sys.monitoring.events.LINE, self._on_line
+        )
+        self._tool_id = tool_id
+        self._lines: set[tuple[str, int]] = set()
+
+    def _on_line(self, code: CodeType, line_number: int) -> object:
+        self._lines.add((code.co_filename, line_number))
+        return sys.monitoring.DISABLE
+
+    @property
+    def num_lines(self) -> int:
+        """Return the number of lines covered so far."""
+        return len(self._lines)
+
+    def reset(self) -> None:
+        """Forget every covered line, so all lines are reported again."""
+        self._lines.clear()
+        sys.monitoring.restart_events()
+
+    @contextmanager
+    def collect(self) -> Iterator[None]:
+        """Report the lines that are executed for the first time within the context."""
+        sys.monitoring.set_events(self._tool_id, sys.monitoring.events.LINE)
+        try:
+            yield
+        finally:
+            sys.monitoring.set_events(self._tool_id, sys.monitoring.events.NO_EVENTS)
+
+
+_COLLECTOR: CoverageCollector | None = None
+
+
+def get_collector() -> CoverageCollector:
+    """Return the coverage collector of the current process, creating it if needed."""
+    global _COLLECTOR  # NOQA: PLW0603
+    if _COLLECTOR is None:
+        _COLLECTOR = CoverageCollector()
+    return _COLLECTOR
@@ -0,0 +1,33 @@
+from chrysalis._internal._coverage import CoverageCollector, get_collector
+
+
+def _sign(value: float) -> float:
+    if value < 0:
+        return -1.0
+    return 1.0
+
+
+def _collect(collector: CoverageCollector, value: float) -> int:
+    num_lines = collector.num_lines
+    with collector.collect():
+        _sign(value)
+    return collector.num_lines - num_lines
+
+
+def test_coverage_collector() -> None:
+    collector = get_collector()
+    assert get_collector() is collector
+    collector.reset()
+
+    assert _collect(collector, 1.0) > 0
+    assert _collect(collector, 2.0) == 0
+    # Only the line returning a negative sign is reached for the first time.
+    assert _collect(collector, -1.0) == 1
+
+    num_lines = collector.num_lines
+    _sign(-2.0)
+    assert collector.num_lines == num_lines
+
+    collector.reset()
+    assert collector.num_lines == 0
+    assert _collect(collector, -1.0) > 0
@@ -1,46 +1,694 @@
+import asyncio
+import csv
+import functools
+import inspect
+import itertools
+import os
 import pickle
+import re
 import sqlite3
-import uuid
-from collections.abc import Callable
+import threading
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable, Iterator, Sequence
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import ExitStack, contextmanager, nullcontext
+from enum import Enum, auto
+from multiprocessing import util
+from multiprocessing.managers import ValueProxy
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from typing import Any, NamedTuple, cast
 
 import duckdb
 
+from chrysalis._internal._cache import LRUCache
+from chrysalis._internal._coverage import CoverageCollector, get_collector
 from chrysalis._internal._relation import Relation
+from chrysalis._internal._replay import Replay, replay
+from chrysalis._internal._search import RelationChain
+from chrysalis._internal._serialization import (
+    SerializedObject,
+    blob_to_pickle,
+    content_hash,
+    decompress,
+)
+from chrysalis._internal._sut import SystemUnderTest, get_batch_size, is_batched
+from chrysalis._internal._trie import ChainTrie, ChainTrieNode
+from chrysalis._internal._vectorized_invariants import is_vectorized
+from chrysalis._internal._watchdog import _MP_CONTEXT, FailedCall, Watchdog
 from chrysalis._internal._writer import TerminalUIWriter
 
-_CREATE_INPUT_DATA_TABLE = """
-CREATE TABLE input_data (
-    id TEXT PRIMARY KEY,
-    obj BLOB NOT NULL
+type _Connection = sqlite3.Connection | duckdb.DuckDBPyConnection
+"""A connection to a results database, recorded into with sqlite3 or duckdb."""
+
+type _Cursor = sqlite3.Cursor | duckdb.DuckDBPyConnection
+"""A cursor of a results database, which duckdb represents as a connection."""
+
+_CREATE_INPUT_BLOB_TABLE = """
+CREATE TABLE input_blob (
+    hash BLOB PRIMARY KEY,
+    data BLOB NOT NULL
 );
 """
 
-_CREATE_APPLIED_TRANSFORMATION_TABLE = """
-CREATE TABLE applied_transformation (
-    id TEXT PRIMARY KEY,
-    name TEXT NOT NULL,
-    previous_transformation TEXT,
-    link_index INT NOT NULL,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+_CREATE_INPUT_RECORD_TABLE = """
+CREATE TABLE input_record (
+    id INTEGER PRIMARY KEY,
+    blob BLOB NOT NULL,
+
+    FOREIGN KEY (blob) REFERENCES input_blob(hash)
+);
+"""
+
+_CREATE_BASELINE_RESULT_TABLE = """
+CREATE TABLE baseline_result (
+    input_data INTEGER PRIMARY KEY,
+    obj BLOB NOT NULL,
+
+    FOREIGN KEY (input_data) REFERENCES input_record(id)
+);
+"""
 
-    FOREIGN KEY (previous_transformation) REFERENCES applied_transformation(id)
+_CREATE_TRANSFORMATION_TABLE = """
+CREATE TABLE transformation (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
 );
 """
 
 _CREATE_INVARIANT_TABLE = """
-CREATE TABLE failed_invariant (
-    id TEXT PRIMARY KEY,
-    name TEXT NOT NULL,
-    applied_transformation TEXT NOT NULL,
-    input_data TEXT NOT NULL,
-
-    FOREIGN KEY (applied_transformation) REFERENCES applied_transformation(id),
-    FOREIGN KEY (input_data) REFERENCES input_data(id)
+CREATE TABLE invariant (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+"""
+
+_CREATE_CHAIN_LINK_TABLE = """
+CREATE TABLE chain_link (
+    id INTEGER PRIMARY KEY,
+    transformation INTEGER NOT NULL,
+    previous_link INTEGER,
+    link_index INTEGER NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (transformation) REFERENCES transformation(id),
+    FOREIGN KEY (previous_link) REFERENCES chain_link(id)
+);
+"""
+
+_CREATE_INVARIANT_FAILURE_TABLE = """
+CREATE TABLE invariant_failure (
+    id INTEGER PRIMARY KEY,
+    invariant INTEGER NOT NULL,
+    chain_link INTEGER NOT NULL,
+    input_data INTEGER NOT NULL,
+
+    FOREIGN KEY (invariant) REFERENCES invariant(id),
+    FOREIGN KEY (chain_link) REFERENCES chain_link(id),
+    FOREIGN KEY (input_data) REFERENCES input_record(id)
+);
+"""
+
+_CREATE_FAILED_EXECUTION_TABLE = """
+CREATE TABLE failed_execution (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    message TEXT NOT NULL,
+    applied_transformation INTEGER,
+    input_data INTEGER NOT NULL,
+
+    FOREIGN KEY (applied_transformation) REFERENCES chain_link(id),
+    FOREIGN KEY (input_data) REFERENCES input_record(id)
+);
+"""
+
+_CREATE_INPUT_SNAPSHOT_TABLE = """
+CREATE TABLE input_snapshot (
+    chain_link INTEGER NOT NULL,
+    input_data INTEGER NOT NULL,
+    blob BLOB NOT NULL,
+
+    PRIMARY KEY (chain_link, input_data),
+    FOREIGN KEY (chain_link) REFERENCES chain_link(id),
+    FOREIGN KEY (input_data) REFERENCES input_record(id),
+    FOREIGN KEY (blob) REFERENCES input_blob(hash)
+);
+"""
+
+_CREATE_COMPLETED_CHAIN_TABLE = """
+CREATE TABLE completed_chain (
+    seed BIGINT PRIMARY KEY,
+    last_link INTEGER,
+    completed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (last_link) REFERENCES chain_link(id)
+);
+"""
+
+_BLOB_TO_PICKLE_FUNCTION = "chrysalis_blob_to_pickle"
+
+_CREATE_INPUT_DATA_VIEW = f"""
+CREATE VIEW input_data AS
+SELECT
+    i.id,
+    {_BLOB_TO_PICKLE_FUNCTION}(b.data) AS obj
+FROM input_record i
+JOIN input_blob b ON b.hash = i.blob;
+"""
+
+_CREATE_APPLIED_TRANSFORMATION_VIEW = """
+CREATE VIEW applied_transformation AS
+SELECT
+    l.id,
+    t.name,
+    l.previous_link AS previous_transformation,
+    l.link_index,
+    l.created_at
+FROM chain_link l
+JOIN transformation t ON t.id = l.transformation;
+"""
+
+_CREATE_FAILED_INVARIANT_VIEW = """
+CREATE VIEW failed_invariant AS
+SELECT
+    f.id,
+    i.name,
+    f.chain_link AS applied_transformation,
+    f.input_data
+FROM invariant_failure f
+JOIN invariant i ON i.id = f.invariant;
+"""
+
+_CREATE_STATEMENTS = (
+    _CREATE_INPUT_BLOB_TABLE,
+    _CREATE_INPUT_RECORD_TABLE,
+    _CREATE_BASELINE_RESULT_TABLE,
+    _CREATE_TRANSFORMATION_TABLE,
+    _CREATE_INVARIANT_TABLE,
+    _CREATE_CHAIN_LINK_TABLE,
+    _CREATE_INVARIANT_FAILURE_TABLE,
+    _CREATE_FAILED_EXECUTION_TABLE,
+    _CREATE_INPUT_SNAPSHOT_TABLE,
+    _CREATE_COMPLETED_CHAIN_TABLE,
+    _CREATE_INPUT_DATA_VIEW,
+    _CREATE_APPLIED_TRANSFORMATION_VIEW,
+    _CREATE_FAILED_INVARIANT_VIEW,
+)
+"""Every statement required to create the results schema, in dependency order."""
+
+
+_CREATE_INDEX_STATEMENTS = (
+    "CREATE INDEX IF NOT EXISTS chain_link_previous_link ON chain_link (previous_link);",
+    "CREATE INDEX IF NOT EXISTS chain_link_transformation ON chain_link (transformation);",
+    "CREATE INDEX IF NOT EXISTS chain_link_link_index ON chain_link (link_index);",
+    "CREATE INDEX IF NOT EXISTS invariant_failure_chain_link ON invariant_failure (chain_link);",
+    "CREATE INDEX IF NOT EXISTS invariant_failure_invariant ON invariant_failure (invariant);",
+    "CREATE INDEX IF NOT EXISTS invariant_failure_input_data ON invariant_failure (input_data);",
+    "CREATE INDEX IF NOT EXISTS failed_execution_applied_transformation ON failed_execution (applied_transformation);",
+)
+"""
+Every secondary index of the results schema.
+
+Indexes are only created once results have been recorded, since maintaining them would
+slow down every insert during execution.
+"""
+
+_CREATE_CHAIN_PATH_TABLE = """
+CREATE TABLE chain_path AS
+WITH RECURSIVE path (chain_link, root_link, link_index, path) AS (
+    SELECT l.id, l.id, l.link_index, t.name
+    FROM chain_link l
+    JOIN transformation t ON t.id = l.transformation
+    WHERE l.previous_link IS NULL
+    UNION ALL
+    SELECT l.id, p.root_link, l.link_index, p.path || ' -> ' || t.name
+    FROM path p
+    JOIN chain_link l ON l.previous_link = p.chain_link
+    JOIN transformation t ON t.id = l.transformation
+)
+SELECT chain_link, root_link, link_index, path
+FROM path;
+"""
+"""Flatten the path of transformations leading up to every chain link."""
+
+_CREATE_FAILURE_COUNT_BY_RELATION_TABLE = """
+CREATE TABLE failure_count_by_relation AS
+SELECT
+    t.name AS transformation,
+    i.name AS invariant,
+    COUNT(*) AS num_failures,
+    COUNT(DISTINCT f.input_data) AS num_inputs
+FROM invariant_failure f
+JOIN invariant i ON i.id = f.invariant
+JOIN chain_link l ON l.id = f.chain_link
+JOIN transformation t ON t.id = l.transformation
+GROUP BY t.name, i.name;
+"""
+
+_CREATE_FAILURE_COUNT_BY_INPUT_TABLE = """
+CREATE TABLE failure_count_by_input AS
+SELECT
+    input_data,
+    COUNT(*) AS num_failures,
+    COUNT(DISTINCT invariant) AS num_invariants,
+    COUNT(DISTINCT chain_link) AS num_chain_links
+FROM invariant_failure
+GROUP BY input_data;
+"""
+
+_CREATE_FAILURE_COUNT_BY_DEPTH_TABLE = """
+CREATE TABLE failure_count_by_depth AS
+SELECT
+    l.link_index,
+    COUNT(*) AS num_failures,
+    COUNT(DISTINCT f.input_data) AS num_inputs
+FROM invariant_failure f
+JOIN chain_link l ON l.id = f.chain_link
+GROUP BY l.link_index;
+"""
+
+_CREATE_FAILED_INVARIANT_PATH_VIEW = """
+CREATE VIEW IF NOT EXISTS failed_invariant_path AS
+SELECT
+    f.id,
+    i.name,
+    f.input_data,
+    p.link_index,
+    p.path
+FROM invariant_failure f
+JOIN invariant i ON i.id = f.invariant
+JOIN chain_path p ON p.chain_link = f.chain_link;
+"""
+
+_SUMMARY_TABLES = {
+    "chain_path": _CREATE_CHAIN_PATH_TABLE,
+    "failure_count_by_relation": _CREATE_FAILURE_COUNT_BY_RELATION_TABLE,
+    "failure_count_by_input": _CREATE_FAILURE_COUNT_BY_INPUT_TABLE,
+    "failure_count_by_depth": _CREATE_FAILURE_COUNT_BY_DEPTH_TABLE,
+}
+"""
+Every summary table along with the statement creating it.
+
+Neither sqlite nor duckdb support materialized views, so summaries are materialized as
+tables which are rebuilt from scratch whenever they are refreshed.
+"""
+
+
+class _InsertStatement(NamedTuple):
+    """An insert into a results table, which can be executed row-wise or in bulk."""
+
+    table: str
+    columns: tuple[str, ...]
+    ignore_conflicts: bool = False
+    blob_columns: tuple[str, ...] = ()
+
+    @property
+    def _prefix(self) -> str:
+        or_ignore = " OR IGNORE" if self.ignore_conflicts else ""
+        return f"INSERT{or_ignore} INTO {self.table} ({', '.join(self.columns)})"
+
+    @property
+    def row_sql(self) -> str:
+        """Return the statement inserting a single row of parameters."""
+        return f"{self._prefix} VALUES ({', '.join('?' for _ in self.columns)});"
+
+    @property
+    def csv_sql(self) -> str:
+        """
+        Return the statement inserting every row of a CSV file written by `to_csv`.
+
+        Every value is read as text and cast to the type of its column on insert, except
+        for blobs which are decoded from hex.
+        """
+        values = ", ".join(
+            f"unhex({column})" if column in self.blob_columns else column
+            for column in self.columns
+        )
+        types = ", ".join(f"'{column}': 'VARCHAR'" for column in self.columns)
+        return f"""
+{self._prefix}
+SELECT {values}
+FROM read_csv(
+    ?,
+    auto_detect = false,
+    header = false,
+    delim = ',',
+    quote = '"',
+    escape = '"',
+    new_line = '\\n',
+    allow_quoted_nulls = false,
+    columns = {{{types}}}
 );
 """
 
+    def to_csv(self, rows: list[tuple], path: Path) -> None:
+        """
+        Write rows into a CSV file that is read back by `csv_sql`.
+
+        Blobs are hex encoded, and strings are always quoted so that empty strings are
+        told apart from NULL values, which are written as empty unquoted fields.
+        """
+        blob_indices = [self.columns.index(column) for column in self.blob_columns]
+        if len(blob_indices) > 0:
+            rows = [
+                tuple(
+                    value.hex() if i in blob_indices else value
+                    for i, value in enumerate(row)
+                )
+                for row in rows
+            ]
+        with path.open("w", newline="", encoding="utf-8") as f:
+            csv.writer(f, quoting=csv.QUOTE_STRINGS, lineterminator="\n").writerows(
+                rows
+            )
+
+
+_INSERT_INPUT_BLOB = _InsertStatement(
+    "input_blob",
+    ("hash", "data"),
+    ignore_conflicts=True,
+    blob_columns=("hash", "data"),
+)
+_INSERT_INPUT_RECORD = _InsertStatement(
+    "input_record", ("id", "blob"), blob_columns=("blob",)
+)
+_INSERT_BASELINE_RESULT = _InsertStatement(
+    "baseline_result", ("input_data", "obj"), blob_columns=("obj",)
+)
+_INSERT_CHAIN_LINK = _InsertStatement(
+    "chain_link", ("id", "transformation", "previous_link", "link_index")
+)
+_INSERT_INPUT_SNAPSHOT = _InsertStatement(
+    "input_snapshot", ("chain_link", "input_data", "blob"), blob_columns=("blob",)
+)
+_INSERT_INVARIANT_FAILURE = _InsertStatement(
+    "invariant_failure", ("id", "invariant", "chain_link", "input_data")
+)
+_INSERT_FAILED_EXECUTION = _InsertStatement(
+    "failed_execution",
+    ("id", "kind", "stage", "message", "applied_transformation", "input_data"),
+)
+_INSERT_COMPLETED_CHAIN = _InsertStatement(
+    "completed_chain", ("seed", "last_link"), ignore_conflicts=True
+)
+
+_INSERT_STATEMENTS = (
+    _INSERT_INPUT_BLOB,
+    _INSERT_INPUT_RECORD,
+    _INSERT_BASELINE_RESULT,
+    _INSERT_CHAIN_LINK,
+    _INSERT_INPUT_SNAPSHOT,
+    _INSERT_INVARIANT_FAILURE,
+    _INSERT_FAILED_EXECUTION,
+    _INSERT_COMPLETED_CHAIN,
+)
+"""Every buffered insert statement, ordered so that referenced rows are inserted first."""
+
+_SELECT_MAX_IDS = """
+SELECT
+    (SELECT COALESCE(MAX(id), 0) FROM main.chain_link),
+    (SELECT COALESCE(MAX(id), 0) FROM main.invariant_failure),
+    (SELECT COALESCE(MAX(id), 0) FROM main.failed_execution);
+"""
+"""Select the largest id of every table whose ids are assigned by the engine."""
+
+_SELECT_COMPLETED_LINKS = """
+WITH RECURSIVE completed_link (id) AS (
+    SELECT last_link FROM completed_chain WHERE last_link IS NOT NULL
+    UNION
+    SELECT l.previous_link
+    FROM chain_link l
+    JOIN completed_link c ON c.id = l.id
+    WHERE l.previous_link IS NOT NULL
+)
+SELECT id FROM completed_link
+"""
+"""Select every chain link that belongs to a relation chain recorded as completed."""
+
+_DELETE_INCOMPLETE_CHAINS = (
+    f"""
+DELETE FROM input_snapshot
+WHERE chain_link NOT IN ({_SELECT_COMPLETED_LINKS});
+""",
+    f"""
+DELETE FROM invariant_failure
+WHERE chain_link NOT IN ({_SELECT_COMPLETED_LINKS});
+""",
+    f"""
+DELETE FROM failed_execution
+WHERE applied_transformation NOT IN ({_SELECT_COMPLETED_LINKS});
+""",
+    f"""
+DELETE FROM chain_link
+WHERE id NOT IN ({_SELECT_COMPLETED_LINKS});
+""",
+)
+"""Delete the records of every relation chain that was not recorded as completed."""
+
+_WRITE_BUFFER_SIZE = 10_000
+"""The number of buffered rows after which all buffered rows are written."""
+
+_RECENT_INPUT_BLOBS_SIZE = 65_536
+"""The number of recently stored input blobs that are never compressed again."""
+
+
+_SKIPPED_SUT_CALLS = "Skipped SUT calls"
+_FAILED_CALLS = "Failed calls"
+_TRANSFORMATION_CACHE_HITS = "Transformation cache hits"
+_TRANSFORMATION_CACHE_MISSES = "Transformation cache misses"
+_FIXED_POINT_SUT_CALLS = "Fixed point SUT calls skipped"
+
+
+class _Missing(Enum):
+    """A sentinel for values that are missing from a cache."""
+
+    MISSING = auto()
+
+
+_SUT_STAGE = "sut"
+_TRANSFORMATION_STAGE = "transformation"
+
+_MAX_LAZY_CHUNK_SIZE = 256
+"""The largest number of relation chains executed at once when chains are lazy."""
+
+_TARGET_CHUNK_DURATION = 1.0
+"""The number of seconds a chunk of lazily provided relation chains should take."""
+
+_SHARD_MERGE_INTERVAL = 10.0
+"""The number of seconds after which a worker hands its shard over to be merged."""
+
+_CHAIN_DURATION_SMOOTHING = 0.3
+"""The weight of the most recent chain in the estimated duration of a chain."""
+
+
+def _configure_connection(conn: sqlite3.Connection) -> None:
+    """
+    Configure a sqlite connection for fast inserts.
+
+    The results database is temporary, so durability is traded for throughput. Writes
+    are not synced to disk, and the write-ahead log allows worker processes to read the
+    input data while the main process merges shards.
+    """
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+
+
+class Recorder(Enum):
+    """The database that results are recorded into during execution."""
+
+    SQLITE = auto()
+    DUCKDB = auto()
+
+
+def _without_foreign_keys(statement: str) -> str:
+    """Remove the foreign key constraints from a `CREATE TABLE` statement."""
+    lines = [
+        line
+        for line in statement.splitlines()
+        if not line.strip().startswith("FOREIGN KEY")
+    ]
+    return re.sub(r",\s*\)", "\n)", "\n".join(lines))
+
+
+def _create_tables(
+    conn: _Connection,
+    foreign_keys: bool = True,
+) -> None:
+    """
+    Create all tables and views required to record the results of relation chains.
+
+    Rows are keyed by integers and transformation and invariant names are interned in
+    their own tables. The `applied_transformation` and `failed_invariant` views resolve
+    the interned names, so they can be queried as if the names were stored inline.
+    Similarly, input data is stored compressed and deduplicated by content hash, and the
+    `input_data` view exposes each input as a plain pickle through a function registered
+    on the connection.
+
+    Foreign keys can be omitted for databases that are appended to in bulk, since
+    duckdb cannot check self-referential foreign keys within a single insert.
+    """
+    _register_functions(conn)
+    for statement in _CREATE_STATEMENTS:
+        conn.execute(statement if foreign_keys else _without_foreign_keys(statement))
+
+
+def _register_functions(conn: _Connection) -> None:
+    """Register the functions used by the views of the results schema."""
+    if isinstance(conn, sqlite3.Connection):
+        conn.create_function(
+            _BLOB_TO_PICKLE_FUNCTION, 1, blob_to_pickle, deterministic=True
+        )
+    else:
+        conn.create_function(_BLOB_TO_PICKLE_FUNCTION, blob_to_pickle, ["BLOB"], "BLOB")
+
+
+def _create_summaries(conn: _Connection) -> None:
+    """
+    Create the secondary indexes and (re)build the summary tables of a results database.
+
+    The summary tables are only up to date with the results recorded before they were
+    built. The `failed_invariant_path` view joins every failed invariant with the
+    flattened path of its chain link, so the path of a failure is a single lookup
+    instead of a recursive query.
+    """
+    for statement in _CREATE_INDEX_STATEMENTS:
+        conn.execute(statement)
+    for table, statement in _SUMMARY_TABLES.items():
+        conn.execute(f"DROP TABLE IF EXISTS {table};")
+        conn.execute(statement)
+    conn.execute(_CREATE_FAILED_INVARIANT_PATH_VIEW)
+    conn.commit()
+
+
+def _partition_chains(
+    relation_chains: list[list[Relation]],
+    num_partitions: int,
+    share_prefixes: bool,
+) -> list[list[list[Relation]]]:
+    """
+    Partition relation chains into at most the provided number of partitions.
+
+    If prefixes are shared, chains starting with the same relation are kept within the
+    same partition so that their shared prefixes are still only evaluated once.
+    """
+    num_partitions = max(min(num_partitions, len(relation_chains)), 1)
+    if not share_prefixes:
+        return [relation_chains[i::num_partitions] for i in range(num_partitions)]
+
+    groups: dict[Relation | None, list[list[Relation]]] = {}
+    for relation_chain in relation_chains:
+        key = relation_chain[0] if relation_chain else None
+        groups.setdefault(key, []).append(relation_chain)
+    num_partitions = min(num_partitions, len(groups))
+    partitions: list[list[list[Relation]]] = [[] for _ in range(num_partitions)]
+    for group in sorted(groups.values(), key=len, reverse=True):
+        min(partitions, key=len).extend(group)
+    return partitions
+
+
+def _fetch_row(cursor: _Cursor) -> tuple[Any, ...]:
+    """Fetch the next row of a query that is known to return a row."""
+    row = cursor.fetchone()
+    assert row is not None
+    return row
+
+
+def _drop_indices[V](indices: set[int], values: list[V]) -> list[V]:
+    """Return a copy of a list without the values at the provided indices."""
+    return [value for i, value in enumerate(values) if i not in indices]
+
+
+def _drop_failed_calls[V](indices: set[int], outputs: list[V | FailedCall]) -> list[V]:
+    """
+    Return a copy of the outputs of calls without the failed calls.
+
+    The indices must be those of every failed call, which are only returned instead of
+    raised when errors are caught.
+    """
+    return cast("list[V]", _drop_indices(indices, outputs))
+
+
+def _content_hash_at(objs: list[Any], hashes: list[bytes | None], index: int) -> bytes:
+    """
+    Return the content hash of an object, computing it only if it is not known yet.
+
+    Computed hashes are stored back into the list of hashes, so every object is hashed
+    at most once while it is carried along a relation chain.
+    """
+    obj_hash = hashes[index]
+    if obj_hash is None:
+        obj_hash = hashes[index] = content_hash(objs[index])
+    return obj_hash
+
+
+def _is_fixed_point(
+    previous_inputs: list[Any],
+    previous_hashes: list[bytes | None],
+    current_inputs: list[Any],
+    current_hashes: list[bytes | None],
+    index: int,
+) -> bool:
+    """Return whether a transformation left the input at an index unchanged."""
+    if previous_inputs[index] is current_inputs[index]:
+        return True
+    previous_hash = _content_hash_at(previous_inputs, previous_hashes, index)
+    return previous_hash == _content_hash_at(current_inputs, current_hashes, index)
+
+
+def _failed_invariant_indices[R](
+    invariant: Callable[..., Any],
+    previous_results: list[R],
+    current_results: list[R],
+) -> list[int]:
+    """
+    Return the indices of the results for which an invariant does not hold.
+
+    Scalar invariants are called once per pair of results. Vectorized invariants are
+    called once with arrays of all results and return a boolean mask, which is reduced
+    so that an input only passes if every element of its mask holds.
+    """
+    if not is_vectorized(invariant):
+        return [
+            i
+            for i, (prev_result, curr_result) in enumerate(
+                zip(previous_results, current_results, strict=False)
+            )
+            if not invariant(curr_result, prev_result)
+        ]
+
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise ImportError(
+            "NumPy is required to use vectorized invariants, install it with `pip install numpy`."
+        ) from e
+
+    mask = np.asarray(
+        invariant(np.asarray(current_results), np.asarray(previous_results)),
+        dtype=np.bool_,
+    )
+    if mask.ndim > 1:
+        mask = mask.reshape(len(current_results), -1).all(axis=1)
+    return np.flatnonzero(~mask).tolist()
+
+
+class LinkOutcome(NamedTuple):
+    """The outcome of testing a single link of a relation chain on all input data."""
+
+    relation: str
+    link_index: int
+    failed_invariants: list[str]
+    duration: float
+    new_coverage: int
+
 
 class TemporarySqlite3RelationConnection(TemporaryDirectory):
     """
@@ -86,10 +734,8 @@ class TemporarySqlite3RelationConnection(TemporaryDirectory):
 
         # Sqlite3 doesn't enfore foreign key existance by default.
         self.conn.execute("PRAGMA foreign_keys = ON")
-        
-        self.conn.execute(_CREATE_INPUT_DATA_TABLE)
-        self.conn.execute(_CREATE_APPLIED_TRANSFORMATION_TABLE)
-        self.conn.execute(_CREATE_INVARIANT_TABLE)
+        _configure_connection(self.conn)
+        _create_tables(self.conn)
 
         return self.conn, self.db_path
 
@@ -103,6 +749,63 @@ class TemporarySqlite3RelationConnection(TemporaryDirectory):
         return super().__exit__(*args, **kwargs)
 
 
+class PersistentSqlite3RelationConnection:
+    """
+    A sqlite3 database within a run directory that is kept after execution.
+
+    A run recorded into a persistent database can be resumed after it was interrupted,
+    such as by a crash. If the database already exists, it is opened as is, otherwise
+    it is created along with the relevant tables. Results are only lost if they were
+    not yet committed, and the engine commits whenever a chunk of relation chains
+    completes.
+    """
+
+    def __init__(self, run_dir: Path) -> None:
+        self.run_dir = Path(run_dir)
+
+    def __enter__(self) -> tuple[sqlite3.Connection, Path]:
+        """Open the database within the run directory, creating it if required."""
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.run_dir / "chry.db"
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        _configure_connection(self.conn)
+        (num_tables,) = self.conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table';"
+        ).fetchone()
+        if num_tables == 0:
+            _create_tables(self.conn)
+        else:
+            _register_functions(self.conn)
+        return self.conn, self.db_path
+
+    def __exit__(self, *args) -> None:
+        self.conn.close()
+
+
+class TemporaryDuckDBRelationConnection(TemporaryDirectory):
+    """
+    An in-memory duckdb database that results are appended to in bulk.
+
+    Recording results directly into duckdb avoids converting a sqlite database once
+    execution finishes, which is both the slowest step of a large run and the only step
+    that requires the duckdb sqlite extension to be installed from the network. The
+    temporary directory only holds the shards written by worker processes and the files
+    that buffered rows are staged in before they are loaded.
+
+    Unlike the sqlite connection, the duckdb connection is not closed when exiting the
+    context manager since it is returned as the results of the run.
+    """
+
+    def __enter__(self, *args, **kwargs) -> tuple[duckdb.DuckDBPyConnection, Path]:
+        """Create an in-memory database with the relevant tables."""
+        temp_dir = super().__enter__(*args, **kwargs)
+        self.db_path = Path(temp_dir) / "chry.duckdb"
+        self.conn = duckdb.connect()
+        _create_tables(self.conn, foreign_keys=False)
+        return self.conn, self.db_path
+
+
 class Engine[T, R]:
     """
     A class responsible for execution in metamorphic testing.
@@ -123,195 +826,1832 @@ class Engine[T, R]:
     result so it can be determined if each invariant for the given transformation held.
     This process is repeated for each transformation in the relation chain.
 
+    The results of the SUT on the unmodified input data are the same for every relation
+    chain, so they are computed once per engine and reused by every chain. Optionally,
+    these baseline results can be persisted in the `baseline_result` table.
+
+    Relation chains frequently share leading relations. If the engine is configured to
+    share prefixes, the relation chains passed to `execute` are merged into a trie and
+    each shared prefix is only evaluated once.
+
+    A SUT can either be called on a single input at a time or, if it is batched, on a
+    list of inputs at once. Batched SUTs can be flagged explicitly or by decorating the
+    SUT with `chrysalis.batched`. Coroutine functions are also supported as SUTs, in
+    which case every input (or batch) of a link is awaited concurrently, bounded by the
+    maximum concurrency of the engine. Results are always gathered in the order of the
+    input data, so invariant checking and database inserts remain deterministic.
+
+    SUTs that release the GIL (such as C extensions or subprocess calls) can instead be
+    fanned out across a thread pool. Inputs and results are shared with the threads
+    without being copied, and all database writes still happen on the calling thread.
+
+    By default, all input data is held in memory. Large corpora can instead be streamed
+    by specifying a window size, in which case the input data can be any iterable (such
+    as a generator). Each input is pickled into the database as soon as it is consumed
+    and relation chains are executed on windows of input data read back from the
+    database, so peak memory is bounded by the window size instead of the corpus size.
+
+    For triage runs, inputs can be pruned from the rest of a relation chain as soon as
+    they fail an invariant, and the engine can stop once a maximum number of failures
+    has been recorded. The number of SUT calls skipped this way is reported in the
+    summary.
+
+    A single input that makes a transformation or the SUT raise, hang or crash should
+    not abort a run. If the engine is configured to catch errors, every call is
+    supervised by a watchdog, optionally with a timeout or within recyclable worker
+    processes. Failed calls are recorded in the `failed_execution` table and the
+    affected input is dropped from the rest of the relation chain.
+
+    Transformations marked as deterministic are memoized. Their outputs are kept in a
+    bounded LRU cache keyed by the transformation name and the content hash of the
+    input, so applying the same transformation to the same intermediate input in
+    multiple relation chains only computes it once.
+
+    Transformations are frequently no-ops on some inputs. If the engine is configured
+    to skip fixed points, a transformed input that is identical to its previous input
+    reuses the previous result instead of calling the SUT again. This assumes the SUT
+    is deterministic.
+
+    Execution can also be given a time budget, in which case relation chains are pulled
+    from the provided iterable until the deadline. Chains that are not expected to
+    finish before the deadline are not started, and links still executing at the
+    deadline stop cleanly, so all results recorded so far remain valid.
+
     Under the hood, a sqlite database is maintained which denotes the results of
     executing each relation chain on all of the input data. This data is kept so it can
-    be used later for debugging if an invariant failed.
+    be used later for debugging if an invariant failed. Records are buffered and written
+    in large batches, so they are only guaranteed to be in the database once the
+    engine commits.
+
+    Every relation chain generated by a search space carries the seed it was generated
+    from. Once such a chain completes, its seed and its last recorded link are recorded
+    in the `completed_chain` table, in the same transaction as its results. An engine
+    created on a database that already holds input data resumes that run: the provided
+    input data must match the recorded input data, and persisted baseline results are
+    read back instead of being recomputed. Chains stopped early by a deadline or failure
+    limit are not recorded as completed, so the records they committed are deleted when
+    the run is resumed, along with the records of any chain without a seed.
+
+    Transformed inputs are not stored, since they can be derived again by replaying the
+    transformations of a relation chain with `replay`. Replaying a link deep within a
+    long relation chain applies every previous transformation again, so the engine can
+    optionally snapshot the transformed inputs every k links into the `input_snapshot`
+    table, which bounds a replay to at most k transformations.
+
+    Alternatively, the engine can record directly into a duckdb connection. Buffered
+    records are then staged in a CSV file and loaded by duckdb in bulk, and the
+    connection is returned as is instead of being converted once execution finishes.
+
+    The engine can also collect the line coverage of the SUT with `sys.monitoring`, in
+    which case the outcome of each link reports the number of lines that it covered for
+    the first time.
     """
 
     def __init__(
         self,
-        sut: Callable[[T], R],
-        input_data: list[T],
-        sqlite_conn: sqlite3.Connection,
+        sut: SystemUnderTest[T, R],
+        input_data: Iterable[T],
+        sqlite_conn: _Connection,
         sqlite_db: Path,
         writer: TerminalUIWriter,
         num_processes: int = 8,
+        persist_baseline_results: bool = False,
+        share_prefixes: bool = False,
+        batched: bool | None = None,
+        batch_size: int | None = None,
+        max_concurrency: int = 16,
+        num_threads: int = 1,
+        window_size: int | None = None,
+        prune_failed_inputs: bool = False,
+        max_failures: int | None = None,
+        catch_errors: bool = False,
+        sut_timeout: float | None = None,
+        transformation_timeout: float | None = None,
+        isolate_calls: bool = False,
+        max_calls_per_worker: int | None = None,
+        transformation_cache_size: int = 1024,
+        skip_fixed_points: bool = False,
+        snapshot_interval: int | None = None,
+        collect_coverage: bool = False,
     ):
-        if num_processes > 1:
-            raise NotImplementedError
+        if num_processes < 1:
+            raise ValueError("The number of processes must be at least 1.")
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("The batch size of a SUT must be at least 1.")
+        if max_concurrency < 1:
+            raise ValueError("The maximum concurrency must be at least 1.")
+        if num_threads < 1:
+            raise ValueError("The number of threads must be at least 1.")
+        if window_size is not None and window_size < 1:
+            raise ValueError("The window size must be at least 1.")
+        if max_failures is not None and max_failures < 1:
+            raise ValueError("The maximum number of failures must be at least 1.")
+        if sut_timeout is not None and sut_timeout <= 0:
+            raise ValueError("The SUT timeout must be positive.")
+        if transformation_timeout is not None and transformation_timeout <= 0:
+            raise ValueError("The transformation timeout must be positive.")
+        if max_calls_per_worker is not None and max_calls_per_worker < 1:
+            raise ValueError("The maximum number of calls per worker must be at least 1.")
+        if transformation_cache_size < 0:
+            raise ValueError("The transformation cache size must not be negative.")
+        if snapshot_interval is not None and snapshot_interval < 1:
+            raise ValueError("The snapshot interval must be at least 1.")
+        if isolate_calls and inspect.iscoroutinefunction(sut):
+            raise ValueError(
+                "Calls to an asynchronous SUT cannot be isolated in worker processes."
+            )
+        if isolate_calls and collect_coverage:
+            raise ValueError(
+                "Coverage cannot be collected from calls isolated in worker processes."
+            )
+        if num_processes > 1 and collect_coverage:
+            raise ValueError(
+                "Coverage cannot be collected from relation chains executed in worker "
+                "processes."
+            )
+        is_columnar = isinstance(sqlite_conn, duckdb.DuckDBPyConnection)
+        if is_columnar and window_size is not None and num_processes > 1:
+            raise ValueError(
+                "Streamed input data cannot be shared with worker processes when "
+                "recording into an in-memory duckdb database."
+            )
 
         self._sut = sut
         self._conn = sqlite_conn
+        self._input_conn = sqlite_conn
         self._sqlite_db = sqlite_db
+        self._is_columnar = is_columnar
         self._writer = writer
         self._num_processes = num_processes
+        self._persist_baseline_results = persist_baseline_results
+        self._baseline_results: dict[int, R] | None = None
+        self._num_baseline_results: int | None = None
+        self._has_baseline_results = False
+        self._share_prefixes = share_prefixes
+        self._batched = is_batched(sut) if batched is None else batched
+        self._batch_size = get_batch_size(sut) if batch_size is None else batch_size
+        self._is_async = inspect.iscoroutinefunction(sut)
+        self._max_concurrency = max_concurrency
+        self._async_runner: asyncio.Runner | None = None
+        self._num_threads = num_threads
+        self._thread_pool: ThreadPoolExecutor | None = None
+        self._window_size = window_size
+        self._prune_failed_inputs = prune_failed_inputs
+        self._max_failures = max_failures
+        self._num_failures = 0
+        self._shared_num_failures: ValueProxy[int] | None = None
+        self._shared_num_failures_lock: threading.Lock | None = None
+        self._stats: Counter[str] = Counter()
+        self._deadline: float | None = None
+        self._on_chain_executed: Callable[[list[LinkOutcome]], None] | None = None
+        self._chain_duration_estimate: float | None = None
+        # Timeouts and isolation both require calls to be supervised, which implies
+        # that errors are caught.
+        self._catch_errors = (
+            catch_errors
+            or isolate_calls
+            or sut_timeout is not None
+            or transformation_timeout is not None
+        )
+        self._sut_timeout = sut_timeout
+        self._transformation_timeout = transformation_timeout
+        self._isolate_calls = isolate_calls
+        self._max_calls_per_worker = max_calls_per_worker
+        self._watchdog: Watchdog | None = None
+        self._transformation_cache_size = transformation_cache_size
+        self._transformation_cache = self._new_transformation_cache()
+        self._skip_fixed_points = skip_fixed_points
+        self._snapshot_interval = snapshot_interval
+        self._recent_snapshot_blobs = LRUCache[bytes, bool](
+            max_size=_RECENT_INPUT_BLOBS_SIZE
+        )
+        self._relations: dict[str, Relation] = {}
+        # Coverage is relative to the lines covered since the engine was created,
+        # including the lines covered by the baseline results.
+        self._collect_coverage = collect_coverage
+        self._coverage: CoverageCollector | None = None
+        if collect_coverage:
+            get_collector().reset()
+        self._pending_rows: dict[_InsertStatement, list[tuple]] = {
+            statement: [] for statement in _INSERT_STATEMENTS
+        }
+        self._num_pending_rows = 0
+        self._num_chain_links = 0
+        self._num_invariant_failures = 0
+        self._num_failed_executions = 0
+        self._transformation_ids: dict[str, int] = {}
+        self._invariant_ids: dict[str, int] = {}
+        # The shard a worker process currently records into, if it has one open.
+        self._shard_db: Path | None = None
+        self._shard_opened_at = 0.0
+        self._num_shards = 0
 
-        # Insert input data into database and store uuid for future reference.
-        self._input_data: dict[str, T] = {}
+        # Insert input data into database and store its id for future reference.
+        # Streamed input data is only kept in the database and read back in windows.
+        self._input_data: dict[int, T] | None = None if window_size else {}
+        # The content hash of each input held in memory, which also keys its blob.
+        self._input_hashes: dict[int, bytes] = {}
         cur = self._conn.cursor()
+        (self._num_inputs,) = _fetch_row(
+            cur.execute("SELECT COUNT(*) FROM input_record;")
+        )
+        if self._num_inputs > 0:
+            self._resume(input_data=input_data, cursor=cur)
+            return
+
+        recent_input_blobs = LRUCache[bytes, bool](max_size=_RECENT_INPUT_BLOBS_SIZE)
         for input_obj in input_data:
-            obj_id = self._insert_input_data(
+            obj_id, obj_hash = self._insert_input_data(
                 obj=input_obj,
+                recent_blobs=recent_input_blobs,
                 cursor=cur,
             )
-            self._input_data[obj_id] = input_obj
+            if self._input_data is not None:
+                self._input_data[obj_id] = input_obj
+                self._input_hashes[obj_id] = obj_hash
+        self._commit()
+
+    def _resume(self, input_data: Iterable[T], cursor: _Cursor) -> None:
+        """
+        Restore the state of a run that was previously recorded into the database.
+
+        Input data held in memory is matched against the recorded input data by content
+        hash, while streamed input data is read back from the database and the provided
+        input data is not consumed. Baseline results are only restored if every input
+        has either a persisted baseline result or a failed baseline call, otherwise they
+        are recomputed and any failed baseline calls are recorded again.
+
+        The records of relation chains that were not recorded as completed are deleted,
+        since those chains are executed again from the start.
+        """
+        if self._input_data is not None:
+            recorded_blobs = [
+                blob
+                for (blob,) in cursor.execute(
+                    "SELECT blob FROM input_record ORDER BY id;"
+                ).fetchall()
+            ]
+            self._input_data = dict(enumerate(input_data, start=1))
+            self._input_hashes = dict(enumerate(recorded_blobs, start=1))
+            if len(self._input_data) != len(recorded_blobs) or any(
+                content_hash(input_obj) != blob
+                for input_obj, blob in zip(
+                    self._input_data.values(), recorded_blobs, strict=True
+                )
+            ):
+                raise ValueError(
+                    "The input data does not match the input data of the resumed run."
+                )
+
+        (num_baseline_results,) = _fetch_row(
+            cursor.execute("SELECT COUNT(*) FROM baseline_result;")
+        )
+        (num_failed_baseline_calls,) = _fetch_row(
+            cursor.execute(
+                "SELECT COUNT(*) FROM failed_execution WHERE applied_transformation IS NULL;"
+            )
+        )
+        if num_baseline_results + num_failed_baseline_calls == self._num_inputs:
+            self._has_baseline_results = True
+            if self._input_data is not None:
+                self._baseline_results = {
+                    input_data_id: pickle.loads(result)
+                    for input_data_id, result in cursor.execute(
+                        "SELECT input_data, obj FROM baseline_result ORDER BY input_data;"
+                    ).fetchall()
+                }
+        else:
+            cursor.execute(
+                "DELETE FROM failed_execution WHERE applied_transformation IS NULL;"
+            )
+
+        for statement in _DELETE_INCOMPLETE_CHAINS:
+            cursor.execute(statement)
+        (
+            self._num_chain_links,
+            self._num_invariant_failures,
+            self._num_failed_executions,
+        ) = _fetch_row(cursor.execute(_SELECT_MAX_IDS))
+        self._commit()
+
+    def __getstate__(self) -> dict:
+        """
+        Pickle the engine without its database connection or writer.
+
+        An engine is sent to each worker process when executing relation chains in
+        parallel. Neither database connections nor terminal writers can be shared across
+        processes, so each worker attaches its own shard database instead.
+        """
+        state = self.__dict__.copy()
+        del state["_conn"]
+        del state["_input_conn"]
+        del state["_writer"]
+        state["_async_runner"] = None
+        state["_thread_pool"] = None
+        state["_watchdog"] = None
+        state["_on_chain_executed"] = None
+        state["_coverage"] = None
+        state["_pending_rows"] = {statement: [] for statement in _INSERT_STATEMENTS}
+        state["_num_pending_rows"] = 0
+        # Each worker builds its own cache instead of receiving a copy of the cache
+        # with every chunk of relation chains.
+        state["_transformation_cache"] = self._new_transformation_cache()
+        state["_recent_snapshot_blobs"] = LRUCache[bytes, bool](
+            max_size=_RECENT_INPUT_BLOBS_SIZE
+        )
+        return state
+
+    def _new_transformation_cache(self) -> LRUCache[tuple[str, bytes], T] | None:
+        """Create an empty transformation cache, or nothing if caching is disabled."""
+        if self._transformation_cache_size == 0:
+            return None
+        return LRUCache(max_size=self._transformation_cache_size)
+
+    def _buffer_rows(
+        self,
+        statement: _InsertStatement,
+        rows: list[tuple],
+        cursor: _Cursor,
+    ) -> None:
+        """Buffer rows to be inserted, writing every buffered row once it is full."""
+        self._pending_rows[statement].extend(rows)
+        self._num_pending_rows += len(rows)
+        if self._num_pending_rows >= _WRITE_BUFFER_SIZE:
+            self._flush_rows(cursor)
 
-    def _generate_uuid(self) -> str:
-        """Generate a 16 byte random uuid using the UUID4 specification."""
-        return uuid.uuid4().hex
+    def _flush_rows(self, cursor: _Cursor) -> None:
+        """
+        Write every buffered row with a single statement per table.
+
+        Tables are written in the order of `_INSERT_STATEMENTS` so that foreign keys
+        always reference rows that have already been written. Sqlite inserts the rows
+        with `executemany`. Duckdb converts bound parameters one value at a time, which
+        is orders of magnitude slower, so its rows are staged in a temporary CSV file
+        instead and loaded by its native CSV reader in a single insert.
+        """
+        if self._num_pending_rows == 0:
+            return
+        # Each process stages its rows in a file of its own next to its database.
+        rows_csv = self._sqlite_db.with_name(f"rows_{os.getpid()}.csv")
+        for statement, rows in self._pending_rows.items():
+            if len(rows) == 0:
+                continue
+            if self._is_columnar:
+                statement.to_csv(rows, rows_csv)
+                cursor.execute(statement.csv_sql, (str(rows_csv),))
+            else:
+                cursor.executemany(statement.row_sql, rows)
+            rows.clear()
+        if self._is_columnar:
+            rows_csv.unlink(missing_ok=True)
+        self._num_pending_rows = 0
+
+    def _commit(self) -> None:
+        """Write every buffered row and commit the current transaction."""
+        self._flush_rows(self._conn.cursor())
+        self._conn.commit()
+
+    def _intern_name(
+        self,
+        table: str,
+        name_ids: dict[str, int],
+        name: str,
+        cursor: _Cursor,
+    ) -> int:
+        """
+        Return the id of a name within a dictionary table, inserting it if required.
+
+        Names are cached once interned, so the database is only queried the first time
+        each name is recorded. Ids are assigned explicitly since duckdb does not
+        generate integer primary keys.
+        """
+        name_id = name_ids.get(name)
+        if name_id is None:
+            row = cursor.execute(
+                f"SELECT id FROM {table} WHERE name = ?;", (name,)
+            ).fetchone()
+            if row is None:
+                cursor.execute(
+                    f"INSERT INTO {table} (id, name) SELECT COALESCE(MAX(id), 0) + 1, ? FROM {table};",
+                    (name,),
+                )
+                row = _fetch_row(
+                    cursor.execute(f"SELECT id FROM {table} WHERE name = ?;", (name,))
+                )
+            (name_id,) = row
+            name_ids[name] = name_id
+        return name_id
 
     def _insert_input_data(
         self,
         obj: T,
-        cursor: sqlite3.Cursor,
-    ) -> str:
-        """Insert a record into the `input_data` table."""
-        input_data_id = self._generate_uuid()
-        cursor.execute(
-            """
-INSERT INTO input_data (id, obj)
-VALUES (?, ?);
-""",
-            (input_data_id, pickle.dumps(obj)),
+        recent_blobs: LRUCache[bytes, bool],
+        cursor: _Cursor,
+    ) -> tuple[int, bytes]:
+        """
+        Insert a record into the `input_record` table and return its id and hash.
+
+        The content of each input is stored once in the `input_blob` table, keyed by its
+        content hash.
+        """
+        self._num_inputs += 1
+        input_data_id = self._num_inputs
+        digest = self._insert_input_blob(obj, recent_blobs, cursor)
+        self._buffer_rows(_INSERT_INPUT_RECORD, [(input_data_id, digest)], cursor)
+        return input_data_id, digest
+
+    def _insert_input_blob(
+        self,
+        obj: T,
+        recent_blobs: LRUCache[bytes, bool],
+        cursor: _Cursor,
+    ) -> bytes:
+        """
+        Insert a record into the `input_blob` table and return its content hash.
+
+        Recently stored hashes are remembered so that duplicate objects are not
+        compressed again, while older duplicates are ignored by the database.
+        """
+        serialized = SerializedObject(obj)
+        if recent_blobs.get(serialized.digest) is None:
+            self._buffer_rows(
+                _INSERT_INPUT_BLOB, [(serialized.digest, serialized.compress())], cursor
+            )
+            recent_blobs.put(serialized.digest, True)
+        return serialized.digest
+
+    def _insert_input_snapshots(
+        self,
+        applied_transformation: int,
+        input_data_ids: list[int],
+        inputs: list[T],
+        cursor: _Cursor,
+    ) -> None:
+        """Insert a record into the `input_snapshot` table for each transformed input."""
+        self._buffer_rows(
+            _INSERT_INPUT_SNAPSHOT,
+            [
+                (
+                    applied_transformation,
+                    input_data_id,
+                    self._insert_input_blob(
+                        input_obj, self._recent_snapshot_blobs, cursor
+                    ),
+                )
+                for input_data_id, input_obj in zip(input_data_ids, inputs, strict=True)
+            ],
+            cursor,
+        )
+
+    def _insert_baseline_result(
+        self,
+        input_data: int,
+        result: R,
+        cursor: _Cursor,
+    ) -> None:
+        """Insert a record into the `baseline_result` table."""
+        self._buffer_rows(
+            _INSERT_BASELINE_RESULT, [(input_data, pickle.dumps(result))], cursor
         )
-        return input_data_id
 
     def _insert_applied_transformation(
         self,
         name: str,
-        previous_transformation: str | None,
+        previous_transformation: int | None,
         link_index: int,
-        cursor: sqlite3.Cursor,
-    ) -> str:
-        """Insert a record into the `applied_transformation` table."""
-        applied_transformation_id = self._generate_uuid()
-        cursor.execute(
-            """
-INSERT INTO applied_transformation (id, name, previous_transformation, link_index)
-VALUES (?, ?, ?, ?);
-""",
-            (applied_transformation_id, name, previous_transformation, link_index),
+        cursor: _Cursor,
+    ) -> int:
+        """Insert a record into the `chain_link` table backing `applied_transformation`."""
+        self._num_chain_links += 1
+        applied_transformation_id = self._num_chain_links
+        transformation_id = self._intern_name(
+            "transformation", self._transformation_ids, name, cursor
+        )
+        self._buffer_rows(
+            _INSERT_CHAIN_LINK,
+            [
+                (
+                    applied_transformation_id,
+                    transformation_id,
+                    previous_transformation,
+                    link_index,
+                )
+            ],
+            cursor,
         )
         return applied_transformation_id
 
-    def _insert_failed_invariant(
+    def _insert_failed_invariants(
         self,
         name: str,
-        applied_transformation: str,
-        input_data: str,
-        cursor: sqlite3.Cursor,
+        applied_transformation: int,
+        input_data: list[int],
+        cursor: _Cursor,
     ) -> None:
-        """Insert a record into the `failed_invariant` table."""
-        invaraint_id = self._generate_uuid()
-        cursor.execute(
-            """
-INSERT INTO failed_invariant (id, name, applied_transformation, input_data)
-VALUES (?, ?, ?, ?);
-        """,
-            (invaraint_id, name, applied_transformation, input_data),
+        """Insert a record into the `invariant_failure` table for each failed input."""
+        invariant_id = self._intern_name("invariant", self._invariant_ids, name, cursor)
+        first_id = self._num_invariant_failures + 1
+        self._num_invariant_failures += len(input_data)
+        self._buffer_rows(
+            _INSERT_INVARIANT_FAILURE,
+            [
+                (first_id + i, invariant_id, applied_transformation, input_data_id)
+                for i, input_data_id in enumerate(input_data)
+            ],
+            cursor,
         )
 
-    def _execute_chain(
+    def _record_completed_chain(
         self,
         relation_chain: list[Relation],
-        cursor: sqlite3.Cursor,
+        last_link: int | None,
+        cursor: _Cursor,
     ) -> None:
-        """Execute a relation chain and store all results in a provided database."""
-        results: list[R] = []
-        input_data_ids = list(self._input_data.keys())
-        # TODO(nathanhuey44.gmail.com): The results of the SUT on the input data is
-        # consistent for all relation chains and should be cached.
-        for curr_input in self._input_data.values():
-            # TODO(nathanhuey44@gmail.com): Catch errors, exit gracefully, and report
-            # error.
-            results.append(self._sut(curr_input))  # NOQA: PERF401
-        previous_transformation_id: str | None = None
-        previous_inputs = list(self._input_data.values())
-        previous_results = results
-        
-        self._writer.start_live()
-        for link_index, relation in enumerate(relation_chain):
-            current_inputs: list[T] = []
-            for prev_input in previous_inputs:
-                # TODO(nathanhuey44@gmail.com): Catch errors, exit gracefully, and
-                # report error.
-                current_inputs.append(  # NOQA: PERF401
-                    relation.apply_transform(prev_input)
+        """
+        Insert a record into the `completed_chain` table if the chain has a seed.
+
+        The last link is the deepest link of the chain that was recorded, which is none
+        if every input was pruned before the chain's first link.
+        """
+        if isinstance(relation_chain, RelationChain):
+            self._buffer_rows(
+                _INSERT_COMPLETED_CHAIN, [(relation_chain.seed, last_link)], cursor
+            )
+
+    def _record_failed_calls(
+        self,
+        stage: str,
+        applied_transformation: int | None,
+        input_data_ids: list[int],
+        outputs: list,
+        cursor: _Cursor,
+    ) -> set[int]:
+        """
+        Insert a record into the `failed_execution` table for each failed call.
+
+        The indices of the failed calls are returned so that the affected inputs can be
+        dropped. If errors are not caught, no call can fail without raising.
+        """
+        if not self._catch_errors:
+            return set()
+        failed_calls = {
+            i: output for i, output in enumerate(outputs) if isinstance(output, FailedCall)
+        }
+        if len(failed_calls) == 0:
+            return set()
+        first_id = self._num_failed_executions + 1
+        self._num_failed_executions += len(failed_calls)
+        self._buffer_rows(
+            _INSERT_FAILED_EXECUTION,
+            [
+                (
+                    first_id + j,
+                    failed_call.kind.value,
+                    stage,
+                    failed_call.message,
+                    applied_transformation,
+                    input_data_ids[i],
+                )
+                for j, (i, failed_call) in enumerate(failed_calls.items())
+            ],
+            cursor,
+        )
+        self._stats[_FAILED_CALLS] += len(failed_calls)
+        return set(failed_calls)
+
+    @contextmanager
+    def _sut_context(self) -> Iterator[None]:
+        """
+        Manage the resources required to call the SUT during execution.
+
+        Asynchronous SUTs share a single event loop for the duration of execution so
+        that clients bound to an event loop can be reused between calls. Similarly,
+        synchronous SUTs executed on multiple threads share a single thread pool, and
+        supervised calls share a single watchdog with a worker for each thread.
+        """
+        with ExitStack() as stack:
+            if self._catch_errors:
+                self._watchdog = stack.enter_context(
+                    Watchdog(
+                        isolate=self._isolate_calls,
+                        num_workers=self._num_threads,
+                        max_calls_per_worker=self._max_calls_per_worker,
+                    )
+                )
+            if self._is_async:
+                self._async_runner = stack.enter_context(asyncio.Runner())
+            elif self._num_threads > 1:
+                self._thread_pool = stack.enter_context(
+                    ThreadPoolExecutor(max_workers=self._num_threads)
+                )
+            if self._collect_coverage:
+                self._coverage = get_collector()
+            try:
+                yield
+            finally:
+                self._async_runner = None
+                self._thread_pool = None
+                self._watchdog = None
+                self._coverage = None
+
+    async def _gather_async_sut(self, args: list) -> list:
+        """Await the SUT on every argument concurrently, bounded by a semaphore."""
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        sut = cast("Callable[[Any], Awaitable[Any]]", self._sut)
+
+        async def call(arg: T | list[T]) -> R | list[R] | FailedCall:
+            async with semaphore:
+                if not self._catch_errors:
+                    return await sut(arg)
+                try:
+                    return await asyncio.wait_for(sut(arg), self._sut_timeout)
+                except TimeoutError:
+                    return FailedCall.from_timeout(self._sut_timeout)
+                except Exception as e:  # NOQA: BLE001
+                    return FailedCall.from_exception(e)
+
+        return await asyncio.gather(*(call(arg) for arg in args))
+
+    def _call_sut(self, inputs: list[T]) -> list[R | FailedCall]:
+        """
+        Execute the SUT on a list of inputs, returning the results in the same order.
+
+        Batched SUTs are called on chunks of at most the configured batch size, or on
+        all of the inputs at once if no batch size was configured. If errors are caught,
+        the result of each failed call is a `FailedCall`, and every input of a failed
+        batch shares the same `FailedCall`.
+        """
+        args: list
+        if self._batched:
+            batch_size = self._batch_size or max(len(inputs), 1)
+            args = [
+                inputs[i : i + batch_size] for i in range(0, len(inputs), batch_size)
+            ]
+        else:
+            args = inputs
+
+        sut: Callable[[Any], Any] = self._sut
+        if self._watchdog is not None:
+            sut = functools.partial(
+                self._watchdog.call, self._sut, timeout=self._sut_timeout
+            )
+
+        with nullcontext() if self._coverage is None else self._coverage.collect():
+            if self._is_async:
+                if self._async_runner is None:
+                    raw_results = asyncio.run(self._gather_async_sut(args))
+                else:
+                    raw_results = self._async_runner.run(self._gather_async_sut(args))
+            elif self._thread_pool is not None:
+                raw_results = list(self._thread_pool.map(sut, args))
+            else:
+                raw_results = [sut(arg) for arg in args]
+
+        if not self._batched:
+            return raw_results
+
+        results: list[R | FailedCall] = []
+        for batch, batch_results in zip(args, raw_results, strict=True):
+            if isinstance(batch_results, FailedCall):
+                results.extend([batch_results] * len(batch))
+                continue
+            batch_results = list(batch_results)
+            if len(batch_results) != len(batch):
+                raise ValueError(
+                    f"A batched SUT returned {len(batch_results)} results for a batch of {len(batch)} inputs."
                 )
+            results.extend(batch_results)
+        return results
+
+    def _call_transform(self, relation: Relation, input_obj: T) -> T | FailedCall:
+        """Apply the transformation of a relation to a single input."""
+        if self._watchdog is None:
+            return relation.apply_transform(input_obj)
+        return self._watchdog.call(
+            relation.apply_transform,
+            input_obj,
+            timeout=self._transformation_timeout,
+        )
+
+    def _apply_transform(
+        self,
+        relation: Relation,
+        inputs: list[T],
+        input_hashes: list[bytes | None],
+    ) -> tuple[list[T | FailedCall], list[bytes | None]]:
+        """
+        Apply the transformation of a relation to each input.
+
+        Outputs of deterministic transformations are looked up in the transformation
+        cache first, keyed by the content hash of their input. Failed calls are never
+        cached, so they are retried if the same input is transformed again.
+
+        The content hashes of the outputs are returned along with the outputs. They are
+        only known if the transformation returned its input unchanged, otherwise they
+        are computed once they are needed.
+        """
+        cache = self._transformation_cache
+        if cache is None or not relation.is_deterministic:
+            outputs = [
+                self._call_transform(relation, input_obj) for input_obj in inputs
+            ]
+        else:
+            outputs = self._apply_cached_transform(
+                cache, relation, inputs, input_hashes
+            )
+        output_hashes = [
+            input_hash if output is input_obj else None
+            for input_obj, input_hash, output in zip(
+                inputs, input_hashes, outputs, strict=True
+            )
+        ]
+        return outputs, output_hashes
+
+    def _apply_cached_transform(
+        self,
+        cache: LRUCache[tuple[str, bytes], T],
+        relation: Relation,
+        inputs: list[T],
+        input_hashes: list[bytes | None],
+    ) -> list[T | FailedCall]:
+        """Apply a deterministic transformation to each input through the cache."""
+        outputs: list[T | FailedCall] = []
+        for i, input_obj in enumerate(inputs):
+            key = (
+                relation.transformation_name,
+                _content_hash_at(inputs, input_hashes, i),
+            )
+            cached = cache.get(key, _Missing.MISSING)
+            if cached is _Missing.MISSING:
+                self._stats[_TRANSFORMATION_CACHE_MISSES] += 1
+                output = self._call_transform(relation, input_obj)
+                if not isinstance(output, FailedCall):
+                    cache.put(key, output)
+            else:
+                self._stats[_TRANSFORMATION_CACHE_HITS] += 1
+                output = cached
+            outputs.append(output)
+        return outputs
+
+    def _call_sut_on_changed_inputs(
+        self,
+        previous_inputs: list[T],
+        previous_hashes: list[bytes | None],
+        current_inputs: list[T],
+        current_hashes: list[bytes | None],
+        previous_results: list[R],
+    ) -> list[R | FailedCall]:
+        """
+        Execute the SUT on the transformed inputs that differ from their previous input.
+
+        An unchanged input is a fixed point of the transformation, so its previous
+        result is reused instead of calling the SUT again. The content hashes of the
+        previous inputs were already computed by the previous link if it needed them.
+        """
+        changed_indices = [
+            i
+            for i in range(len(current_inputs))
+            if not _is_fixed_point(
+                previous_inputs, previous_hashes, current_inputs, current_hashes, i
+            )
+        ]
+        self._stats[_FIXED_POINT_SUT_CALLS] += len(current_inputs) - len(
+            changed_indices
+        )
+        if len(changed_indices) == len(current_inputs):
+            return self._call_sut(current_inputs)
+
+        current_results: list[R | FailedCall] = list(previous_results)
+        changed_results = self._call_sut([current_inputs[i] for i in changed_indices])
+        for i, result in zip(changed_indices, changed_results, strict=True):
+            current_results[i] = result
+        return current_results
+
+    def _iter_input_windows(
+        self,
+    ) -> Iterator[tuple[list[int], list[T], list[bytes | None], list[R]]]:
+        """
+        Yield windows of input data ids, input data, their content hashes and the
+        baseline results.
 
-            current_results: list[R] = []
-            for curr_input in current_inputs:
-                # TODO(nathanhuey44@gmail.com): Catch errors, exit gracefully, and
-                # report error.
-                current_results.append(self._sut(curr_input))  # NOQA: PERF401
+        The content hash of every input is the key of its blob in the database, so it
+        is known without hashing the input again.
 
-            current_transformation_id = self._insert_applied_transformation(
-                name=relation.transformation_name,
-                previous_transformation=previous_transformation_id,
+        If the engine holds its input data in memory, all of the input data is yielded
+        as a single window. Otherwise, the input data and baseline results are streamed
+        from the database in windows of at most the configured window size. Input data
+        without a baseline result, since the SUT failed on it, is never yielded.
+        """
+        if self._input_data is not None:
+            assert self._baseline_results is not None
+            input_data_ids = list(self._baseline_results.keys())
+            input_hashes: list[bytes | None] = [
+                self._input_hashes[input_data_id] for input_data_id in input_data_ids
+            ]
+            yield (
+                input_data_ids,
+                [self._input_data[input_data_id] for input_data_id in input_data_ids],
+                input_hashes,
+                list(self._baseline_results.values()),
+            )
+            return
+
+        assert self._window_size is not None
+        # Reads use a separate cursor, since duckdb only keeps one result per cursor and
+        # records are written while the windows are consumed.
+        cursor = self._input_conn.cursor().execute(
+            """
+SELECT i.id, b.data, i.blob, r.obj
+FROM input_record i
+JOIN input_blob b ON b.hash = i.blob
+JOIN baseline_result r ON r.input_data = i.id
+ORDER BY i.id;
+"""
+        )
+        while rows := cursor.fetchmany(self._window_size):
+            window_hashes: list[bytes | None] = [bytes(blob) for _, _, blob, _ in rows]
+            yield (
+                [input_data_id for input_data_id, _, _, _ in rows],
+                [decompress(data) for _, data, _, _ in rows],
+                window_hashes,
+                [pickle.loads(result) for _, _, _, result in rows],
+            )
+
+    def _num_covered_lines(self) -> int:
+        """Return the number of lines covered so far, if coverage is collected."""
+        return 0 if self._coverage is None else self._coverage.num_lines
+
+    def _record_failures(self, num_failures: int) -> None:
+        """Record failed invariants towards the maximum number of failures."""
+        self._num_failures += num_failures
+        if self._shared_num_failures is not None:
+            assert self._shared_num_failures_lock is not None
+            with self._shared_num_failures_lock:
+                self._shared_num_failures.value += num_failures
+
+    def _should_stop(self) -> bool:
+        """Return whether execution should stop as soon as possible."""
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            return True
+        return self._failure_limit_reached()
+
+    def _can_start_chains(self, num_chains: int) -> bool:
+        """
+        Return whether there is time to execute the provided number of chains.
+
+        The duration of a relation chain is estimated from the chains that have already
+        been executed, so chains that are unlikely to complete before the deadline are
+        never started.
+        """
+        if self._should_stop():
+            return False
+        if self._deadline is None or self._chain_duration_estimate is None:
+            return True
+        estimated_end = time.monotonic() + num_chains * self._chain_duration_estimate
+        return estimated_end <= self._deadline
+
+    def _record_chain_duration(self, duration: float, num_chains: int) -> None:
+        """Update the estimated duration of a relation chain."""
+        if num_chains == 0:
+            return
+        chain_duration = duration / num_chains
+        if self._chain_duration_estimate is None:
+            self._chain_duration_estimate = chain_duration
+        else:
+            self._chain_duration_estimate = (
+                _CHAIN_DURATION_SMOOTHING * chain_duration
+                + (1 - _CHAIN_DURATION_SMOOTHING) * self._chain_duration_estimate
+            )
+
+    def _failure_limit_reached(self) -> bool:
+        """Return whether the maximum number of failures has been recorded."""
+        if self._max_failures is None:
+            return False
+        if self._shared_num_failures is not None:
+            return self._shared_num_failures.value >= self._max_failures
+        return self._num_failures >= self._max_failures
+
+    def _num_tested_inputs(self) -> int:
+        """Return the number of inputs with a baseline result."""
+        if self._baseline_results is not None:
+            return len(self._baseline_results)
+        if self._num_baseline_results is None:
+            (self._num_baseline_results,) = _fetch_row(
+                self._input_conn.cursor().execute("SELECT COUNT(*) FROM baseline_result;")
+            )
+        return self._num_baseline_results
+
+    def _record_skipped_sut_calls(self, num_inputs: int, num_links: int) -> None:
+        """
+        Record the SUT calls skipped for inputs on the remaining links of a chain.
+
+        Calls are only skipped when inputs are pruned after failing an invariant or
+        when the maximum number of failures is reached. Inputs dropped because the SUT
+        or a transformation failed on them are not skipped calls.
+        """
+        if self._prune_failed_inputs or self._max_failures is not None:
+            self._stats[_SKIPPED_SUT_CALLS] += num_inputs * num_links
+
+    def _execute_link(
+        self,
+        relation: Relation,
+        transformation_id: int,
+        link_index: int,
+        input_data_ids: list[int],
+        previous_inputs: list[T],
+        previous_hashes: list[bytes | None],
+        previous_results: list[R],
+        cursor: _Cursor,
+    ) -> tuple[list[int], list[T], list[bytes | None], list[R], set[str], set[int]]:
+        """
+        Execute a single link of a relation chain on a window of input data.
+
+        The transformed inputs, their content hashes (if known) and the results of the
+        SUT on the transformed inputs are returned so they can be used by the next link
+        in the chain, along with the names of the invariants that failed for at least
+        one input and the indices of the inputs that failed at least one invariant.
+        Inputs for which the transformation or the SUT failed are dropped, so the ids of
+        the remaining input data are returned as well.
+        """
+        outputs, output_hashes = self._apply_transform(
+            relation, previous_inputs, previous_hashes
+        )
+        failed_calls = self._record_failed_calls(
+            stage=_TRANSFORMATION_STAGE,
+            applied_transformation=transformation_id,
+            input_data_ids=input_data_ids,
+            outputs=outputs,
+            cursor=cursor,
+        )
+        current_inputs = _drop_failed_calls(failed_calls, outputs)
+        current_hashes = output_hashes
+        if len(failed_calls) > 0:
+            input_data_ids = _drop_indices(failed_calls, input_data_ids)
+            previous_inputs = _drop_indices(failed_calls, previous_inputs)
+            previous_hashes = _drop_indices(failed_calls, previous_hashes)
+            current_hashes = _drop_indices(failed_calls, current_hashes)
+            previous_results = _drop_indices(failed_calls, previous_results)
+        if (
+            self._snapshot_interval is not None
+            and (link_index + 1) % self._snapshot_interval == 0
+        ):
+            self._insert_input_snapshots(
+                applied_transformation=transformation_id,
+                input_data_ids=input_data_ids,
+                inputs=current_inputs,
+                cursor=cursor,
+            )
+
+        if self._skip_fixed_points:
+            results = self._call_sut_on_changed_inputs(
+                previous_inputs=previous_inputs,
+                previous_hashes=previous_hashes,
+                current_inputs=current_inputs,
+                current_hashes=current_hashes,
+                previous_results=previous_results,
+            )
+        else:
+            results = self._call_sut(current_inputs)
+        failed_calls = self._record_failed_calls(
+            stage=_SUT_STAGE,
+            applied_transformation=transformation_id,
+            input_data_ids=input_data_ids,
+            outputs=results,
+            cursor=cursor,
+        )
+        current_results = _drop_failed_calls(failed_calls, results)
+        if len(failed_calls) > 0:
+            input_data_ids = _drop_indices(failed_calls, input_data_ids)
+            current_inputs = _drop_indices(failed_calls, current_inputs)
+            current_hashes = _drop_indices(failed_calls, current_hashes)
+            previous_results = _drop_indices(failed_calls, previous_results)
+
+        failed_invariants: set[str] = set()
+        failed_inputs: set[int] = set()
+        for invariant in relation.invariants:
+            failed_indices = _failed_invariant_indices(
+                invariant=invariant,
+                previous_results=previous_results,
+                current_results=current_results,
+            )
+            if len(failed_indices) > 0:
+                failed_invariants.add(invariant.__name__)
+                failed_inputs.update(failed_indices)
+                self._insert_failed_invariants(
+                    name=invariant.__name__,
+                    applied_transformation=transformation_id,
+                    input_data=[input_data_ids[i] for i in failed_indices],
+                    cursor=cursor,
+                )
+                self._record_failures(len(failed_indices))
+        return (
+            input_data_ids,
+            current_inputs,
+            current_hashes,
+            current_results,
+            failed_invariants,
+            failed_inputs,
+        )
+
+    def _execute_chain(
+        self,
+        relation_chain: list[Relation],
+        cursor: _Cursor,
+    ) -> list[LinkOutcome]:
+        """
+        Execute a relation chain and store all results in a provided database.
+
+        Only the links that were executed on at least one input are recorded and their
+        outcomes returned, since pruning or reaching the maximum number of failures can
+        stop a relation chain early.
+        """
+        # Each link is recorded the first time it is executed on any window of input
+        # data, so that every window references the same applied transformations and a
+        # stopped relation chain leaves no records of links that were never executed.
+        transformation_ids: list[int | None] = [None for _ in relation_chain]
+        failed_invariants: list[set[str]] = [set() for _ in relation_chain]
+        durations = [0.0 for _ in relation_chain]
+        new_coverage = [0 for _ in relation_chain]
+        num_executed_links = 0
+        is_stopped = False
+        for input_data_ids, inputs, hashes, results in self._iter_input_windows():
+            previous_inputs, previous_hashes, previous_results = inputs, hashes, results
+            for link_index, relation in enumerate(relation_chain):
+                if len(input_data_ids) == 0:
+                    break
+                if self._should_stop():
+                    is_stopped = True
+                    if self._failure_limit_reached():
+                        self._record_skipped_sut_calls(
+                            len(input_data_ids), len(relation_chain) - link_index
+                        )
+                    break
+                transformation_id = transformation_ids[link_index]
+                if transformation_id is None:
+                    transformation_id = self._insert_applied_transformation(
+                        name=relation.transformation_name,
+                        previous_transformation=(
+                            transformation_ids[link_index - 1]
+                            if link_index > 0
+                            else None
+                        ),
+                        link_index=link_index,
+                        cursor=cursor,
+                    )
+                    transformation_ids[link_index] = transformation_id
+                start_time = time.monotonic()
+                num_covered_lines = self._num_covered_lines()
+                (
+                    input_data_ids,
+                    previous_inputs,
+                    previous_hashes,
+                    previous_results,
+                    window_failed_invariants,
+                    pruned,
+                ) = self._execute_link(
+                    relation=relation,
+                    transformation_id=transformation_id,
+                    link_index=link_index,
+                    input_data_ids=input_data_ids,
+                    previous_inputs=previous_inputs,
+                    previous_hashes=previous_hashes,
+                    previous_results=previous_results,
+                    cursor=cursor,
+                )
+                durations[link_index] += time.monotonic() - start_time
+                new_coverage[link_index] += (
+                    self._num_covered_lines() - num_covered_lines
+                )
+                failed_invariants[link_index] |= window_failed_invariants
+                num_executed_links = max(num_executed_links, link_index + 1)
+                if self._prune_failed_inputs and len(pruned) > 0:
+                    self._record_skipped_sut_calls(
+                        len(pruned), len(relation_chain) - link_index - 1
+                    )
+                    input_data_ids = _drop_indices(pruned, input_data_ids)
+                    previous_inputs = _drop_indices(pruned, previous_inputs)
+                    previous_hashes = _drop_indices(pruned, previous_hashes)
+                    previous_results = _drop_indices(pruned, previous_results)
+        if not is_stopped:
+            self._record_completed_chain(
+                relation_chain,
+                next(
+                    (
+                        transformation_id
+                        for transformation_id in reversed(transformation_ids)
+                        if transformation_id is not None
+                    ),
+                    None,
+                ),
+                cursor,
+            )
+
+        return [
+            LinkOutcome(
+                relation=relation.transformation_name,
                 link_index=link_index,
+                failed_invariants=sorted(link_failed_invariants),
+                duration=duration,
+                new_coverage=link_new_coverage,
+            )
+            for link_index, (
+                relation,
+                link_failed_invariants,
+                duration,
+                link_new_coverage,
+            ) in enumerate(
+                zip(
+                    relation_chain,
+                    failed_invariants,
+                    durations,
+                    new_coverage,
+                    strict=True,
+                )
+            )
+        ][:num_executed_links]
+
+    def _execute_chain_trie(
+        self,
+        relation_chains: list[list[Relation]],
+        cursor: _Cursor,
+    ) -> list[list[LinkOutcome]]:
+        """
+        Execute relation chains, evaluating each shared prefix only once.
+
+        The relation chains are merged into a trie which is traversed depth first. The
+        transformed inputs and results of each node are branched to all of its children,
+        so every child's transformation references the same parent transformation in the
+        database. Since intermediate inputs are shared between branches, transformations
+        must not mutate their input in place.
+        """
+        trie = ChainTrie(relation_chains)
+        edges = list(trie.walk())
+        nodes = [node for _, node in edges]
+        parents = {node: parent for parent, node in edges}
+        # Each node is recorded the first time it is executed on any window of input
+        # data, after its parent, so no records are left of nodes that never executed.
+        transformation_ids: dict[ChainTrieNode, int] = {}
+        failed_invariants: dict[ChainTrieNode, set[str]] = {
+            node: set() for node in nodes
+        }
+        durations: dict[ChainTrieNode, float] = dict.fromkeys(nodes, 0.0)
+        new_coverage: dict[ChainTrieNode, int] = dict.fromkeys(nodes, 0)
+        # The number of links within the subtree of each node, including the node.
+        subtree_links: dict[ChainTrieNode, int] = dict.fromkeys(nodes, 1)
+        for parent, node in reversed(edges):
+            if parent in subtree_links:
+                subtree_links[parent] += subtree_links[node]
+        is_stopped = False
+        for window_ids, inputs, hashes, results in self._iter_input_windows():
+            # Each stack entry holds a node to execute along with the input data ids,
+            # transformed inputs, their content hashes and results of its parent.
+            stack = [
+                (child, window_ids, inputs, hashes, results)
+                for child in reversed(trie.root.children.values())
+            ]
+            while stack and not self._should_stop():
+                (
+                    node,
+                    input_data_ids,
+                    previous_inputs,
+                    previous_hashes,
+                    previous_results,
+                ) = stack.pop()
+                assert node.relation is not None
+                if len(input_data_ids) == 0:
+                    continue
+                if node not in transformation_ids:
+                    transformation_ids[node] = self._insert_applied_transformation(
+                        name=node.relation.transformation_name,
+                        previous_transformation=transformation_ids.get(parents[node]),
+                        link_index=node.link_index,
+                        cursor=cursor,
+                    )
+                start_time = time.monotonic()
+                num_covered_lines = self._num_covered_lines()
+                (
+                    input_data_ids,
+                    current_inputs,
+                    current_hashes,
+                    current_results,
+                    window_failed_invariants,
+                    pruned,
+                ) = self._execute_link(
+                    relation=node.relation,
+                    transformation_id=transformation_ids[node],
+                    link_index=node.link_index,
+                    input_data_ids=input_data_ids,
+                    previous_inputs=previous_inputs,
+                    previous_hashes=previous_hashes,
+                    previous_results=previous_results,
+                    cursor=cursor,
+                )
+                durations[node] += time.monotonic() - start_time
+                new_coverage[node] += self._num_covered_lines() - num_covered_lines
+                failed_invariants[node] |= window_failed_invariants
+                if self._prune_failed_inputs and len(pruned) > 0:
+                    self._record_skipped_sut_calls(
+                        len(pruned), subtree_links[node] - 1
+                    )
+                    input_data_ids = _drop_indices(pruned, input_data_ids)
+                    current_inputs = _drop_indices(pruned, current_inputs)
+                    current_hashes = _drop_indices(pruned, current_hashes)
+                    current_results = _drop_indices(pruned, current_results)
+                stack.extend(
+                    (
+                        child,
+                        input_data_ids,
+                        current_inputs,
+                        current_hashes,
+                        current_results,
+                    )
+                    for child in reversed(node.children.values())
+                )
+            if len(stack) > 0:
+                is_stopped = True
+                if self._failure_limit_reached():
+                    for node, input_data_ids, _, _, _ in stack:
+                        self._record_skipped_sut_calls(
+                            len(input_data_ids), subtree_links[node]
+                        )
+        if not is_stopped:
+            # The last recorded link of each node is the node itself or, if the node
+            # was never executed, the last recorded link of its parent.
+            last_links: dict[ChainTrieNode, int | None] = {trie.root: None}
+            chain_ends: dict[int, ChainTrieNode] = dict.fromkeys(
+                trie.root.chain_indices, trie.root
+            )
+            for parent, node in edges:
+                last_links[node] = transformation_ids.get(node, last_links[parent])
+                chain_ends.update(dict.fromkeys(node.chain_indices, node))
+            for chain_index, relation_chain in enumerate(relation_chains):
+                self._record_completed_chain(
+                    relation_chain, last_links[chain_ends[chain_index]], cursor
+                )
+
+        # The outcomes of a relation chain only include the links that were executed,
+        # which always form a prefix of the relation chain.
+        chain_outcomes: list[list[LinkOutcome]] = [[] for _ in range(trie.num_chains)]
+        paths: dict[ChainTrieNode, list[LinkOutcome]] = {trie.root: []}
+        for parent, node in trie.walk():
+            assert node.relation is not None
+            paths[node] = paths[parent]
+            if node in transformation_ids:
+                paths[node] = [
+                    *paths[parent],
+                    LinkOutcome(
+                        relation=node.relation.transformation_name,
+                        link_index=node.link_index,
+                        failed_invariants=sorted(failed_invariants[node]),
+                        duration=durations[node],
+                        new_coverage=new_coverage[node],
+                    ),
+                ]
+            for chain_index in node.chain_indices:
+                chain_outcomes[chain_index] = paths[node]
+        return chain_outcomes
+
+    def _execute_chains(
+        self,
+        relation_chains: list[list[Relation]],
+        cursor: _Cursor,
+    ) -> list[list[LinkOutcome]]:
+        """Execute relation chains using the configured chain executor."""
+        if self._share_prefixes:
+            start_time = time.monotonic()
+            trie_outcomes = self._execute_chain_trie(
+                relation_chains=relation_chains, cursor=cursor
+            )
+            self._record_chain_duration(
+                time.monotonic() - start_time, len(relation_chains)
+            )
+            return trie_outcomes
+
+        outcomes: list[list[LinkOutcome]] = []
+        for relation_chain in relation_chains:
+            if not self._can_start_chains(1):
+                if self._failure_limit_reached():
+                    self._record_skipped_sut_calls(
+                        self._num_tested_inputs(), len(relation_chain)
+                    )
+                continue
+            start_time = time.monotonic()
+            outcomes.append(
+                self._execute_chain(relation_chain=relation_chain, cursor=cursor)
+            )
+            self._record_chain_duration(time.monotonic() - start_time, 1)
+        return outcomes
+
+    def _compute_baseline_results(self, cursor: _Cursor) -> None:
+        """
+        Compute the results of the SUT on the unmodified input data.
+
+        The results are only computed the first time they are requested and are cached
+        for all future relation chains and calls to `execute`. When input data is
+        streamed, the baseline results are always persisted since they are read back
+        alongside the input data. Input data on which the SUT fails has no baseline
+        result and is excluded from every relation chain.
+        """
+        if self._has_baseline_results:
+            return
+
+        if self._input_data is not None:
+            input_data_ids = list(self._input_data.keys())
+            results = self._call_sut(list(self._input_data.values()))
+            failed_calls = self._record_failed_calls(
+                stage=_SUT_STAGE,
+                applied_transformation=None,
+                input_data_ids=input_data_ids,
+                outputs=results,
                 cursor=cursor,
             )
-            failed_invariants: set[str] = set()
-            for invariant in relation.invariants:
-                for i, (prev_result, curr_result) in enumerate(
-                    zip(previous_results, current_results, strict=False)
+            self._baseline_results = dict(
+                zip(
+                    _drop_indices(failed_calls, input_data_ids),
+                    _drop_failed_calls(failed_calls, results),
+                    strict=True,
+                )
+            )
+            if self._persist_baseline_results:
+                for input_data_id, result in self._baseline_results.items():
+                    self._insert_baseline_result(
+                        input_data=input_data_id,
+                        result=result,
+                        cursor=cursor,
+                    )
+        else:
+            assert self._window_size is not None
+            input_cursor = self._conn.cursor().execute(
+                """
+SELECT i.id, b.data
+FROM input_record i
+JOIN input_blob b ON b.hash = i.blob
+ORDER BY i.id;
+"""
+            )
+            while rows := input_cursor.fetchmany(self._window_size):
+                window_ids = [input_data_id for input_data_id, _ in rows]
+                window_results = self._call_sut([decompress(blob) for _, blob in rows])
+                failed_calls = self._record_failed_calls(
+                    stage=_SUT_STAGE,
+                    applied_transformation=None,
+                    input_data_ids=window_ids,
+                    outputs=window_results,
+                    cursor=cursor,
+                )
+                for input_data_id, result in zip(
+                    _drop_indices(failed_calls, window_ids),
+                    _drop_failed_calls(failed_calls, window_results),
+                    strict=True,
                 ):
-                    if not invariant(curr_result, prev_result):
-                        failed_invariants.add(invariant.__name__)
-                        self._insert_failed_invariant(
-                            name=invariant.__name__,
-                            applied_transformation=current_transformation_id,
-                            input_data=input_data_ids[i],
-                            cursor=cursor,
-                        )
+                    self._insert_baseline_result(
+                        input_data=input_data_id,
+                        result=result,
+                        cursor=cursor,
+                    )
+        self._commit()
+        self._has_baseline_results = True
 
-            if len(failed_invariants) == 0:
+    def _report_chain(self, outcomes: list[LinkOutcome]) -> None:
+        """
+        Report the outcome of each link of an executed relation chain.
+
+        The outcomes are also passed to the callback provided to `execute`, if any.
+        """
+        if self._on_chain_executed is not None:
+            self._on_chain_executed(outcomes)
+        for outcome in outcomes:
+            if len(outcome.failed_invariants) == 0:
                 self._writer.print_tested_relation(
                     success=True,
                     metadata={
-                        "relation": relation.transformation_name,
-                        "index": link_index,
+                        "relation": outcome.relation,
+                        "index": outcome.link_index,
                     },
                 )
             else:
                 self._writer.store_failed_relation(
-                    failed_relation=relation.transformation_name,
-                    failed_invariants=list(failed_invariants),
+                    failed_relation=outcome.relation,
+                    failed_invariants=outcome.failed_invariants,
                 )
                 self._writer.print_tested_relation(
                     success=False,
                     metadata={
-                        "relation": relation.transformation_name,
-                        "index": link_index,
-                        "failed_invariants": list(failed_invariants),
+                        "relation": outcome.relation,
+                        "index": outcome.link_index,
+                        "failed_invariants": outcome.failed_invariants,
                     },
                 )
 
-            previous_transformation_id = current_transformation_id
-            previous_inputs = current_inputs
-            previous_results = current_results
-        
-        self._writer.stop_live()
-        self._writer.print_failed_relations()
-        self._writer.print_summary()
+    def _start_worker(self) -> None:
+        """
+        Prepare the engine of a worker process to execute chunks of relation chains.
+
+        The engine is only sent to a worker process once, when the worker starts. The
+        SUT context is entered for the whole lifetime of the worker, and both the context
+        and the current shard are closed when the worker exits.
+        """
+        self._worker_context = ExitStack()
+        self._worker_context.enter_context(self._sut_context())
+        util.Finalize(self, self._stop_worker, exitpriority=0)
+
+    def _stop_worker(self) -> None:
+        """Close the current shard and the SUT context of a worker process."""
+        self._close_shard()
+        self._worker_context.close()
+
+    def _open_shard(self) -> None:
+        """
+        Open a new shard database for the current worker process.
+
+        Each worker owns a separate database, of the same kind as the main database, so
+        that no locking is required between processes. Foreign keys are not enforced
+        within a shard since the input data only exists in the main database, they are
+        checked once the shard is merged. Streamed input data is read directly from the
+        main sqlite database.
+        """
+        # Ids within a shard start from scratch, they are offset when the shard is
+        # merged into the main database.
+        self._num_chain_links = 0
+        self._num_invariant_failures = 0
+        self._num_failed_executions = 0
+        self._transformation_ids = {}
+        self._invariant_ids = {}
+        self._num_shards += 1
+        self._shard_db = self._sqlite_db.with_name(
+            f"shard_{os.getpid()}_{self._num_shards}.db"
+        )
+        self._shard_opened_at = time.monotonic()
+        if self._is_columnar:
+            self._conn = duckdb.connect(self._shard_db)
+            self._input_conn = self._conn
+        else:
+            self._conn = sqlite3.connect(self._shard_db)
+            self._input_conn = sqlite3.connect(self._sqlite_db)
+            _configure_connection(self._conn)
+        _create_tables(self._conn, foreign_keys=not self._is_columnar)
+
+    def _close_shard(self) -> Path | None:
+        """Commit and close the current shard, returning its path if one was open."""
+        shard_db = self._shard_db
+        if shard_db is None:
+            return None
+        self._shard_db = None
+        try:
+            self._commit()
+        finally:
+            self._conn.close()
+            self._input_conn.close()
+        return shard_db
+
+    def _execute_shard(
+        self,
+        relation_chains: list[list[Relation]],
+    ) -> tuple[list[list[LinkOutcome]], Counter[str], Path | None]:
+        """
+        Execute relation chains within a worker process and store them in its shard.
+
+        A worker keeps recording into the same shard across chunks of relation chains.
+        Once a shard has been open for long enough, it is closed and its path is
+        returned so that the main process merges it, and the next chunk opens a new
+        shard. This bounds the results that are lost if a persistent run is interrupted.
+
+        The statistics collected by the worker are returned along with the outcomes of
+        each relation chain so that they can be reported by the main process.
+        """
+        self._stats = Counter()
+        if self._shard_db is None:
+            self._open_shard()
+        outcomes = self._execute_chains(
+            relation_chains=relation_chains, cursor=self._conn.cursor()
+        )
+        self._commit()
+        if time.monotonic() - self._shard_opened_at < _SHARD_MERGE_INTERVAL:
+            return outcomes, self._stats, None
+        return outcomes, self._stats, self._close_shard()
+
+    def _merge_shard(self, shard_db: Path) -> None:
+        """
+        Merge the results stored in a shard database into the main database.
 
-    def execute(self, relation_chains: list[list[Relation]]) -> None:
+        Every shard numbers its records from 1, so they are offset by the largest id of
+        each table in the main database. Interned names are matched by name, since the
+        same name can have a different id in each shard.
         """
-        Execute a list of provided relation chains and store the results.
+        if self._is_columnar:
+            self._conn.execute(f"ATTACH '{shard_db}' AS shard;")
+        else:
+            self._conn.execute("ATTACH DATABASE ? AS shard;", (str(shard_db),))
+        for table in ("transformation", "invariant"):
+            self._conn.execute(
+                f"""
+INSERT INTO main.{table} (id, name)
+SELECT
+    (SELECT COALESCE(MAX(id), 0) FROM main.{table}) + ROW_NUMBER() OVER (ORDER BY s.id),
+    s.name
+FROM shard.{table} s
+WHERE s.name NOT IN (SELECT name FROM main.{table});
+"""
+            )
+        offsets = {
+            table: _fetch_row(
+                self._conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM main.{table};")
+            )[0]
+            for table in ("chain_link", "invariant_failure", "failed_execution")
+        }
+        self._conn.execute(
+            "INSERT OR IGNORE INTO main.input_blob (hash, data) SELECT hash, data FROM shard.input_blob;"
+        )
+        # Chain links are inserted in order of their id so that each link's previous
+        # link exists before it is referenced.
+        self._conn.execute(
+            """
+INSERT INTO main.chain_link (id, transformation, previous_link, link_index, created_at)
+SELECT l.id + ?, t.id, l.previous_link + ?, l.link_index, l.created_at
+FROM shard.chain_link l
+JOIN shard.transformation s ON s.id = l.transformation
+JOIN main.transformation t ON t.name = s.name
+ORDER BY l.id;
+""",
+            (offsets["chain_link"], offsets["chain_link"]),
+        )
+        self._conn.execute(
+            """
+INSERT INTO main.input_snapshot (chain_link, input_data, blob)
+SELECT chain_link + ?, input_data, blob
+FROM shard.input_snapshot;
+""",
+            (offsets["chain_link"],),
+        )
+        self._conn.execute(
+            """
+INSERT INTO main.invariant_failure (id, invariant, chain_link, input_data)
+SELECT f.id + ?, i.id, f.chain_link + ?, f.input_data
+FROM shard.invariant_failure f
+JOIN shard.invariant s ON s.id = f.invariant
+JOIN main.invariant i ON i.name = s.name
+ORDER BY f.id;
+""",
+            (offsets["invariant_failure"], offsets["chain_link"]),
+        )
+        self._conn.execute(
+            """
+INSERT INTO main.failed_execution
+    (id, kind, stage, message, applied_transformation, input_data)
+SELECT id + ?, kind, stage, message, applied_transformation + ?, input_data
+FROM shard.failed_execution
+ORDER BY id;
+""",
+            (offsets["failed_execution"], offsets["chain_link"]),
+        )
+        self._conn.execute(
+            """
+INSERT OR IGNORE INTO main.completed_chain (seed, last_link, completed_at)
+SELECT seed, last_link + ?, completed_at
+FROM shard.completed_chain;
+""",
+            (offsets["chain_link"],),
+        )
+        (
+            self._num_chain_links,
+            self._num_invariant_failures,
+            self._num_failed_executions,
+        ) = _fetch_row(self._conn.execute(_SELECT_MAX_IDS))
+        self._conn.commit()
+        self._conn.execute("DETACH DATABASE shard;")
+        shard_db.unlink()
+
+    def _iter_chunks(
+        self,
+        relation_chains: Iterable[list[Relation]],
+        num_chunks: int,
+    ) -> Iterator[list[list[Relation]]]:
+        """
+        Split relation chains into chunks that are executed at once.
+
+        A sequence of relation chains is partitioned into the provided number of chunks,
+        while any other iterable is consumed lazily in chunks sized by
+        `_lazy_chunk_size` so that it is never materialized. This allows relation chains
+        to be generated until a deadline.
+
+        The relations of each chunk are remembered by name so that their relation chains
+        can be replayed later.
+        """
+        if isinstance(relation_chains, Sequence):
+            chunks: Iterable[list[list[Relation]]] = _partition_chains(
+                relation_chains=list(relation_chains),
+                num_partitions=num_chunks,
+                share_prefixes=self._share_prefixes,
+            )
+        else:
+            remaining_chains = iter(relation_chains)
+            chunks = iter(
+                lambda: list(
+                    itertools.islice(remaining_chains, self._lazy_chunk_size())
+                ),
+                [],
+            )
+        for chunk in chunks:
+            for relation_chain in chunk:
+                for relation in relation_chain:
+                    self._relations[relation.transformation_name] = relation
+            yield chunk
+
+    def _lazy_chunk_size(self) -> int:
+        """
+        Return the number of lazily provided relation chains to execute at once.
+
+        Chunks are sized from the estimated duration of a relation chain so that each
+        chunk takes about the same time. Fast relation chains are then sent to workers
+        and committed in large chunks, while slow ones are still pulled one at a time,
+        and a chunk is never expected to run past the deadline.
+        """
+        if self._chain_duration_estimate is None:
+            return 1
+        chunk_size = _MAX_LAZY_CHUNK_SIZE
+        if self._chain_duration_estimate > 0:
+            chunk_size = min(
+                chunk_size, int(_TARGET_CHUNK_DURATION / self._chain_duration_estimate)
+            )
+            if self._deadline is not None:
+                remaining_time = self._deadline - time.monotonic()
+                chunk_size = min(
+                    chunk_size, int(remaining_time / self._chain_duration_estimate)
+                )
+        return max(chunk_size, 1)
+
+    def _execute_serial(self, relation_chains: Iterable[list[Relation]]) -> None:
+        """Execute relation chains within the current process."""
+        is_lazy = not isinstance(relation_chains, Sequence)
+        cursor = self._conn.cursor()
+        for chunk in self._iter_chunks(relation_chains, num_chunks=1):
+            if is_lazy and not self._can_start_chains(len(chunk)):
+                break
+            for outcomes in self._execute_chains(relation_chains=chunk, cursor=cursor):
+                self._report_chain(outcomes)
+            self._commit()
+
+    def _execute_parallel(self, relation_chains: Iterable[list[Relation]]) -> None:
+        """
+        Execute relation chains across a pool of worker processes.
+
+        The engine is sent to each worker once, when the worker starts, after which
+        only chunks of relation chains are submitted to the pool as workers become
+        available. Each worker records its results into a shard of its own, which is
+        merged into the main database whenever the worker hands it over, and once the
+        pool shuts down.
+        """
+        # Attaching a shard database is not possible within an open transaction.
+        self._commit()
+        # Shards left behind by an interrupted run are discarded, since their chains
+        # are executed again.
+        for shard_db in self._sqlite_db.parent.glob("shard_*"):
+            shard_db.unlink()
+        is_lazy = not isinstance(relation_chains, Sequence)
+        chunks = self._iter_chunks(relation_chains, num_chunks=self._num_processes)
+        with ExitStack() as stack:
+            if self._max_failures is not None:
+                # Workers share a single failure count so that the maximum number of
+                # failures applies to the whole run instead of to each worker.
+                manager = stack.enter_context(_MP_CONTEXT.Manager())
+                self._shared_num_failures = manager.Value("i", self._num_failures)
+                self._shared_num_failures_lock = manager.Lock()
+            # Workers are never forked, since the main process may already run threads
+            # of its own, such as those of duckdb, the watchdog or the SUT thread pool.
+            executor = stack.enter_context(
+                ProcessPoolExecutor(
+                    max_workers=self._num_processes,
+                    mp_context=_MP_CONTEXT,
+                    initializer=_start_worker,
+                    initargs=(self,),
+                )
+            )
+            pending: dict[Future, tuple[int, float]] = {}
+
+            def submit_next_chunk() -> None:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                if is_lazy and not self._can_start_chains(len(chunk)):
+                    return
+                future = executor.submit(_execute_worker_chunk, chunk)
+                pending[future] = (len(chunk), time.monotonic())
+
+            try:
+                for _ in range(self._num_processes):
+                    submit_next_chunk()
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        num_chains, start_time = pending.pop(future)
+                        shard_outcomes, shard_stats, shard_db = future.result()
+                        self._record_chain_duration(
+                            time.monotonic() - start_time, num_chains
+                        )
+                        for outcomes in shard_outcomes:
+                            self._report_chain(outcomes)
+                        self._stats.update(shard_stats)
+                        if shard_db is not None:
+                            self._merge_shard(shard_db)
+                        submit_next_chunk()
+            finally:
+                if self._shared_num_failures is not None:
+                    self._num_failures = self._shared_num_failures.value
+                self._shared_num_failures = None
+                self._shared_num_failures_lock = None
+        # Every worker closes its last shard when the pool shuts down.
+        for shard_db in sorted(self._sqlite_db.parent.glob("shard_*.db")):
+            self._merge_shard(shard_db)
+
+    def execute(
+        self,
+        relation_chains: Iterable[list[Relation]],
+        time_budget: float | None = None,
+        on_chain_executed: Callable[[list[LinkOutcome]], None] | None = None,
+    ) -> None:
+        """
+        Execute the provided relation chains and store the results.
 
         Execution of a relation chain involves iteratively applying transformations to
-        each item in the input data and ensuring all invariants hold. At the moment,
-        we do not anticipate transformations causing errors regardless of the input.
-        It is important to note that multiple relations can reference the same
+        each item in the input data and ensuring all invariants hold. Unless the engine
+        is configured to catch errors, an error raised by a transformation or the SUT
+        aborts execution. It is important to note that multiple relations can reference the same
         transformation and thus multiple invariant can be checked during a single step
         in a relation chain.
+
+        If the engine was configured with multiple processes, relation chains are
+        distributed across a process pool. Each worker records its results into its own
+        shard which is merged into the main database periodically and once every worker
+        finishes.
+
+        If a maximum number of failures was configured and has been reached, the
+        remaining relation chains are skipped. Similarly, if a time budget (in seconds)
+        is provided, relation chains are pulled from the provided iterable until the
+        budget is exhausted. Relation chains may be provided lazily (such as by a
+        generator), in which case they are never materialized.
+
+        If a callback is provided, it is called with the outcomes of every relation
+        chain in the main process as soon as the relation chain is reported. Since lazily
+        provided relation chains are pulled in chunks that take about a second each,
+        this allows relation chains to be generated from the outcomes of previous
+        relation chains.
         """
-        # TODO(nathanhuey44@gmail.com): Implement a multi-process version of this
-        # execute functionality using sqlite3 cursors.
-        cursor = self._conn.cursor()
-        for relation_chain in relation_chains:
-            self._execute_chain(relation_chain=relation_chain, cursor=cursor)
-        self._conn.commit()
+        start_time = time.perf_counter()
+        self._stats = Counter()
+        if self._prune_failed_inputs or self._max_failures is not None:
+            self._stats[_SKIPPED_SUT_CALLS] = 0
+        if self._skip_fixed_points:
+            self._stats[_FIXED_POINT_SUT_CALLS] = 0
+        self._deadline = None if time_budget is None else time.monotonic() + time_budget
+        self._on_chain_executed = on_chain_executed
+        try:
+            with self._sut_context():
+                # The baseline results are computed before any worker processes are
+                # started so that each worker receives them instead of recomputing them.
+                self._compute_baseline_results(cursor=self._conn.cursor())
+                self._writer.start_live()
+                if self._num_processes > 1 and not (
+                    isinstance(relation_chains, Sequence) and len(relation_chains) <= 1
+                ):
+                    self._execute_parallel(relation_chains)
+                else:
+                    self._execute_serial(relation_chains)
+        finally:
+            self._deadline = None
+            self._on_chain_executed = None
+        self._writer.stop_live()
+        self._writer.print_summary(
+            time_taken=time.perf_counter() - start_time,
+            statistics=dict(self._stats),
+        )
+
+    def create_summaries(self) -> None:
+        """
+        Index the results database and build its summary tables.
+
+        This is useful for databases that are kept after execution, such as the sqlite
+        database of a persistent run. The duckdb database returned by
+        `results_to_duckdb` is always summarized.
+        """
+        self._commit()
+        _create_summaries(self._conn)
+
+    def replay(self, failed_invariant_id: int) -> Replay:
+        """
+        Replay the relation chain link at which an invariant failed.
+
+        Every relation executed by the engine can be replayed. The inputs before and
+        after the transformation of the failed link are derived again, starting from
+        the latest snapshot if snapshots were taken, and the SUT is called on both.
+        """
+        self._commit()
+        return replay(
+            conn=self._conn,
+            failed_invariant_id=failed_invariant_id,
+            sut=self._sut,
+            relations=self._relations,
+            batched=self._batched,
+        )
 
     def results_to_duckdb(self) -> duckdb.DuckDBPyConnection:
         """
@@ -322,25 +2662,39 @@ VALUES (?, ?, ?, ?);
         is using multiple cores. Once all the results have been accumulated, we can
         convert the database into a duckdb database due to duckdb's better performance
         on analytical queries and better data compression.
+
+        If the results were recorded directly into duckdb, no conversion is required and
+        the recording connection is returned once every buffered record is written.
+        Either way, the returned database is indexed and summarized.
         """
+        if isinstance(self._conn, duckdb.DuckDBPyConnection):
+            self.create_summaries()
+            return self._conn
+
         duckdb_conn = duckdb.connect()
 
         # Sqlite needs to be installed within duckdb before `sqlite_scan` can be used.
         duckdb_conn.execute("INSTALL sqlite;")
 
         # The schema of the tables needs to be specified before records are inserted. If
-        # the schema is inferred from sqlite, it may be wrong.
-        duckdb_conn.execute(_CREATE_INPUT_DATA_TABLE)
-        duckdb_conn.execute(_CREATE_APPLIED_TRANSFORMATION_TABLE)
-        duckdb_conn.execute(_CREATE_INVARIANT_TABLE)
+        # the schema is inferred from sqlite, it may be wrong. The views are created
+        # alongside the tables so the results keep the same shape in both databases.
+        _create_tables(duckdb_conn)
 
-        duckdb_conn.execute(
-            """
-INSERT INTO input_data
+        for table in (
+            "input_blob",
+            "input_record",
+            "baseline_result",
+            "transformation",
+            "invariant",
+        ):
+            duckdb_conn.execute(
+                f"""
+INSERT INTO {table}
 SELECT * FROM sqlite_scan(?, ?);
                 """,
-            (str(self._sqlite_db), "input_data"),
-        )
+                (str(self._sqlite_db), table),
+            )
 
         # Unfortunately, there is a bug in `duckdb` with self-referential tables when
         # batch loading. To work around this issue, we can partition the data ourselves
@@ -348,8 +2702,12 @@ SELECT * FROM sqlite_scan(?, ?);
         # https://github.com/duckdb/duckdb/issues/10574
         match duckdb_conn.execute(
             "SELECT MAX(link_index) FROM sqlite_scan(?, ?)",
-            (str(self._sqlite_db), "applied_transformation"),
+            (str(self._sqlite_db), "chain_link"),
         ).fetchone():
+            # No transformations are recorded if execution stopped before any relation
+            # chain was started.
+            case (None,):
+                max_link_index = -1
             case (max_link_index,):
                 pass
             case _:
@@ -360,17 +2718,43 @@ SELECT * FROM sqlite_scan(?, ?);
         for i in range(max_link_index + 1):
             duckdb_conn.execute(
                 """
-INSERT INTO applied_transformation
+INSERT INTO chain_link
 SELECT * FROM sqlite_scan(?, ?) WHERE link_index = ?;
                     """,
-                (str(self._sqlite_db), "applied_transformation", i),
+                (str(self._sqlite_db), "chain_link", i),
             )
 
-        duckdb_conn.execute(
-            """
-INSERT INTO failed_invariant
+        for table in (
+            "input_snapshot",
+            "invariant_failure",
+            "failed_execution",
+            "completed_chain",
+        ):
+            duckdb_conn.execute(
+                f"""
+INSERT INTO {table}
 SELECT * FROM sqlite_scan(?, ?);
                 """,
-            (str(self._sqlite_db), "failed_invariant"),
-        )
+                (str(self._sqlite_db), table),
+            )
+        _create_summaries(duckdb_conn)
         return duckdb_conn
+
+
+_WORKER_ENGINE: Engine | None = None
+"""The engine of the current worker process, which is received when it starts."""
+
+
+def _start_worker(engine: Engine) -> None:
+    """Keep the engine sent to a worker process to execute every chunk it receives."""
+    global _WORKER_ENGINE  # NOQA: PLW0603
+    _WORKER_ENGINE = engine
+    engine._start_worker()
+
+
+def _execute_worker_chunk(
+    relation_chains: list[list[Relation]],
+) -> tuple[list[list[LinkOutcome]], Counter[str], Path | None]:
+    """Execute a chunk of relation chains with the engine of the worker process."""
+    assert _WORKER_ENGINE is not None
+    return _WORKER_ENGINE._execute_shard(relation_chains)
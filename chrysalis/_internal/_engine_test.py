@@ -1,11 +1,28 @@
 import ast
+import asyncio
 import pickle
+import threading
+import time
+from collections.abc import Iterator
 from pathlib import Path
 
-from chrysalis._internal._engine import Engine, TemporarySqlite3RelationConnection
-from chrysalis._internal._relation import Relation
+import duckdb
+import pytest
+
+from chrysalis._internal import _engine
+from chrysalis._internal import _invariants as invariants
+from chrysalis._internal._engine import (
+    Engine,
+    PersistentSqlite3RelationConnection,
+    TemporaryDuckDBRelationConnection,
+    TemporarySqlite3RelationConnection,
+)
+from chrysalis._internal._relation import Relation, deterministic
+from chrysalis._internal._search import RelationChain
+from chrysalis._internal._serialization import content_hash
+from chrysalis._internal._sut import batched
 from chrysalis._internal._writer import TerminalUIWriter, Verbosity
-from chrysalis._internal.conftest import eval_expr
+from chrysalis._internal.conftest import eval_expr, subtract_1_from_expression
 
 
 def test_temporary_sqlite_db_deletes() -> None:
@@ -111,3 +128,1167 @@ ORDER BY link_index;
     assert [("equals",)] == conn.execute(
         "SELECT name FROM failed_invariant;"
     ).fetchall()
+
+
+def test_parallel_relation_chains(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    correct_relation_chain: list[Relation[ast.Expression, float]],
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=2,
+        )
+        engine.execute([correct_relation_chain, incorrect_relation_chain] * 2)
+
+        assert temp_conn.execute(
+            "SELECT COUNT(*) FROM applied_transformation;"
+        ).fetchall() == [(12,)]
+        assert temp_conn.execute(
+            """
+SELECT name, COUNT(*)
+FROM failed_invariant
+GROUP BY name;
+            """
+        ).fetchall() == [("equals", 4)]
+        assert not any(db_path.parent.glob("shard_*.db"))
+
+
+def test_baseline_results_cached(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    correct_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    evaluated: list[ast.Expression] = []
+
+    def counting_eval_expr(a: ast.Expression) -> float:
+        evaluated.append(a)
+        return eval_expr(a)
+
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=counting_eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            persist_baseline_results=True,
+        )
+        engine.execute([correct_relation_chain] * 3)
+        engine.execute([correct_relation_chain])
+
+        # 2 baseline calls plus 2 calls for each of the 3 links of the 4 chains.
+        assert len(evaluated) == 2 + 4 * 3 * 2
+        assert sorted(
+            pickle.loads(obj)
+            for (obj,) in temp_conn.execute(
+                "SELECT obj FROM baseline_result;"
+            ).fetchall()
+        ) == sorted([eval_expr(sample_expression_1), eval_expr(sample_expression_2)])
+
+
+def test_shared_prefix_relation_chains(
+    sample_expression_1: ast.Expression,
+    correct_relation_chain: list[Relation[ast.Expression, float]],
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            share_prefixes=True,
+        )
+        engine.execute(
+            [correct_relation_chain, incorrect_relation_chain, correct_relation_chain]
+        )
+
+        # The `identity` and `inverse` prefix is shared by all chains, while the last
+        # link branches since the chains test different invariants.
+        assert temp_conn.execute(
+            """
+SELECT t.name, t.link_index, p.name
+FROM applied_transformation t
+LEFT JOIN applied_transformation p ON t.previous_transformation = p.id
+ORDER BY t.link_index;
+            """
+        ).fetchall() == [
+            ("identity", 0, None),
+            ("inverse", 1, "identity"),
+            ("subtract_1_from_expression", 2, "inverse"),
+            ("subtract_1_from_expression", 2, "inverse"),
+        ]
+        assert temp_conn.execute(
+            "SELECT name FROM failed_invariant;"
+        ).fetchall() == [("equals",)]
+
+
+def test_batched_sut(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    batch_sizes: list[int] = []
+
+    @batched(batch_size=2)
+    def eval_expr_batch(exprs: list[ast.Expression]) -> list[float]:
+        batch_sizes.append(len(exprs))
+        return [eval_expr(expr) for expr in exprs]
+
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr_batch,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2] * 2
+            + [sample_expression_1],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+        )
+        engine.execute([incorrect_relation_chain])
+
+        # The baseline and each of the 3 links split 5 inputs into batches of 2.
+        assert batch_sizes == [2, 2, 1] * 4
+        assert temp_conn.execute(
+            "SELECT name, COUNT(*) FROM failed_invariant GROUP BY name;"
+        ).fetchall() == [("equals", 5)]
+
+
+def test_vectorized_invariants(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+) -> None:
+    pytest.importorskip("numpy")
+
+    relation = Relation[ast.Expression, float](
+        transformation=subtract_1_from_expression
+    )
+    relation.add_invariant(invariant=invariants.vectorized.equals)
+    relation.add_invariant(invariant=invariants.vectorized.less_than)
+
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+        )
+        engine.execute([[relation, relation]])
+
+        assert temp_conn.execute(
+            """
+SELECT f.name, t.link_index, COUNT(*)
+FROM failed_invariant f
+JOIN applied_transformation t ON f.applied_transformation = t.id
+GROUP BY f.name, t.link_index
+ORDER BY t.link_index;
+            """
+        ).fetchall() == [("equals", 0, 2), ("equals", 1, 2)]
+
+
+def test_async_sut(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    in_flight = 0
+    max_in_flight = 0
+
+    async def async_eval_expr(a: ast.Expression) -> float:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return eval_expr(a)
+
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine[ast.Expression, float](
+            sut=async_eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2] * 4,
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            max_concurrency=3,
+        )
+        engine.execute([incorrect_relation_chain])
+
+        assert max_in_flight == 3
+        assert temp_conn.execute(
+            "SELECT name, COUNT(*) FROM failed_invariant GROUP BY name;"
+        ).fetchall() == [("equals", 8)]
+
+
+def test_thread_pool_sut(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    thread_ids: set[int] = set()
+    barrier = threading.Barrier(2)
+
+    def threaded_eval_expr(a: ast.Expression) -> float:
+        thread_ids.add(threading.get_ident())
+        # Each call waits for another thread to reach the barrier, which can only
+        # happen if calls are executed concurrently.
+        barrier.wait(timeout=5)
+        return eval_expr(a)
+
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=threaded_eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            num_threads=2,
+        )
+        engine.execute([incorrect_relation_chain])
+
+        assert len(thread_ids) == 2
+        assert threading.get_ident() not in thread_ids
+        assert temp_conn.execute(
+            "SELECT name, COUNT(*) FROM failed_invariant GROUP BY name;"
+        ).fetchall() == [("equals", 2)]
+
+
+def test_streamed_input_data(
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    def generate_expressions() -> Iterator[ast.Expression]:
+        for i in range(5):
+            yield ast.parse(f"{i} + 1", mode="eval")
+
+    batch_sizes: list[int] = []
+
+    @batched
+    def eval_expr_batch(exprs: list[ast.Expression]) -> list[float]:
+        batch_sizes.append(len(exprs))
+        return [eval_expr(expr) for expr in exprs]
+
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr_batch,
+            sqlite_conn=temp_conn,
+            input_data=generate_expressions(),
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            window_size=2,
+        )
+        engine.execute([incorrect_relation_chain])
+
+        # The baseline and each of the 3 links are executed on windows of 2 inputs.
+        assert batch_sizes == [2, 2, 1] + [2] * 3 + [2] * 3 + [1] * 3
+        assert temp_conn.execute(
+            "SELECT COUNT(*) FROM baseline_result;"
+        ).fetchall() == [(5,)]
+        assert temp_conn.execute(
+            "SELECT COUNT(*) FROM applied_transformation;"
+        ).fetchall() == [(3,)]
+        assert temp_conn.execute(
+            "SELECT name, COUNT(*) FROM failed_invariant GROUP BY name;"
+        ).fetchall() == [("equals", 5)]
+
+
+def test_prune_failed_inputs(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    incorrect_relation_1: Relation[ast.Expression, float],
+    correct_relation_2: Relation[ast.Expression, float],
+) -> None:
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            prune_failed_inputs=True,
+        )
+        engine.execute([[incorrect_relation_1, correct_relation_2, correct_relation_2]])
+
+        # Both inputs fail the first link, so the remaining 2 links are skipped.
+        assert engine._stats["Skipped SUT calls"] == 4
+        assert temp_conn.execute(
+            "SELECT name, COUNT(*) FROM failed_invariant GROUP BY name;"
+        ).fetchall() == [("equals", 2)]
+
+
+def test_max_failures(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            max_failures=2,
+        )
+        engine.execute([incorrect_relation_chain] * 3)
+
+        # The first chain records 2 failures, so the other 2 chains are skipped.
+        assert engine._stats["Skipped SUT calls"] == 2 * 3 * 2
+        assert temp_conn.execute(
+            "SELECT COUNT(*) FROM failed_invariant;"
+        ).fetchall() == [(2,)]
+
+
+@pytest.mark.parametrize("share_prefixes", [False, True])
+def test_stopped_chain_links(
+    share_prefixes: bool,
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    correct_relation_1: Relation[ast.Expression, float],
+    correct_relation_2: Relation[ast.Expression, float],
+    incorrect_relation_1: Relation[ast.Expression, float],
+) -> None:
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            share_prefixes=share_prefixes,
+            max_failures=2,
+        )
+        engine.execute(
+            [[incorrect_relation_1, correct_relation_1, correct_relation_2]] * 3
+        )
+
+        # Execution stops after the first link, so the links that were never executed
+        # are not recorded.
+        assert temp_conn.execute(
+            "SELECT link_index FROM chain_link;"
+        ).fetchall() == [(0,)]
+
+
+@pytest.mark.parametrize("share_prefixes", [False, True])
+def test_failed_calls_not_skipped(
+    share_prefixes: bool,
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    correct_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    def eval_expr_except_3(expr: ast.Expression) -> float:
+        result = eval_expr(expr)
+        if result == 3:
+            raise ValueError("The result is 3.")
+        return result
+
+    with TemporaryDuckDBRelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr_except_3,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            share_prefixes=share_prefixes,
+            max_failures=10**6,
+            catch_errors=True,
+        )
+        engine.execute([correct_relation_chain] * 3)
+
+        # The SUT fails on the baseline of the second input, which is never tested but
+        # is not a skipped call either.
+        assert engine._stats["Skipped SUT calls"] == 0
+        assert temp_conn.execute("SELECT COUNT(*) FROM failed_execution;").fetchall() == [
+            (1,)
+        ]
+
+
+def test_time_budget(
+    sample_expression_1: ast.Expression,
+    correct_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    def slow_eval_expr(a: ast.Expression) -> float:
+        time.sleep(0.01)
+        return eval_expr(a)
+
+    def generate_chains() -> Iterator[list[Relation[ast.Expression, float]]]:
+        while True:
+            yield correct_relation_chain
+
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=slow_eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+        )
+        start_time = time.monotonic()
+        engine.execute(generate_chains(), time_budget=0.3)
+        assert time.monotonic() - start_time < 0.5
+
+        (num_transformations,) = temp_conn.execute(
+            "SELECT COUNT(*) FROM applied_transformation;"
+        ).fetchone()
+        assert num_transformations > 0
+        assert temp_conn.execute(
+            "SELECT COUNT(*) FROM failed_invariant;"
+        ).fetchall() == [(0,)]
+
+
+def raise_on_negative(a: ast.Expression) -> float:
+    result = eval_expr(a)
+    if result < 0:
+        raise ValueError("The expression is negative.")
+    return result
+
+
+def test_catch_errors(
+    sample_expression_1: ast.Expression,
+    correct_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=raise_on_negative,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, ast.parse("0 - 1", mode="eval")],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            catch_errors=True,
+        )
+        engine.execute([correct_relation_chain])
+
+        # The negative expression fails its baseline call, while the other expression
+        # fails once it is inverted and is dropped from the last link.
+        assert temp_conn.execute(
+            """
+SELECT f.kind, f.stage, f.message, t.name
+FROM failed_execution f
+LEFT JOIN applied_transformation t ON f.applied_transformation = t.id
+ORDER BY t.link_index NULLS FIRST;
+            """
+        ).fetchall() == [
+            ("exception", "sut", "ValueError: The expression is negative.", None),
+            ("exception", "sut", "ValueError: The expression is negative.", "inverse"),
+        ]
+        assert engine._stats["Failed calls"] == 2
+        assert temp_conn.execute(
+            "SELECT COUNT(*) FROM failed_invariant;"
+        ).fetchall() == [(0,)]
+
+
+def slow_subtract_1_from_expression(expr: ast.Expression) -> ast.Expression:
+    time.sleep(1)
+    return subtract_1_from_expression(expr)
+
+
+@pytest.mark.parametrize("isolate_calls", [False, True])
+def test_transformation_timeout(
+    sample_expression_1: ast.Expression,
+    correct_relation_1: Relation[ast.Expression, float],
+    isolate_calls: bool,
+) -> None:
+    slow_relation = Relation[ast.Expression, float](
+        transformation=slow_subtract_1_from_expression
+    )
+    slow_relation.add_invariant(invariant=invariants.less_than)
+
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            transformation_timeout=0.1,
+            isolate_calls=isolate_calls,
+        )
+        start_time = time.monotonic()
+        engine.execute([[correct_relation_1, slow_relation, correct_relation_1]])
+        assert time.monotonic() - start_time < 1
+
+        assert temp_conn.execute(
+            "SELECT kind, stage FROM failed_execution;"
+        ).fetchall() == [("timeout", "transformation")]
+        # The timed out input is dropped, so the last link is never executed.
+        assert engine._stats["Failed calls"] == 1
+
+
+def test_deterministic_transformation_cache(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+) -> None:
+    transformed: list[ast.Expression] = []
+
+    @deterministic
+    def counting_subtract_1_from_expression(expr: ast.Expression) -> ast.Expression:
+        transformed.append(expr)
+        return subtract_1_from_expression(expr)
+
+    relation = Relation[ast.Expression, float](
+        transformation=counting_subtract_1_from_expression
+    )
+    relation.add_invariant(invariant=invariants.less_than)
+
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+        )
+        engine.execute([[relation, relation]] * 3)
+
+        # Only the first chain calls the transformation, the other chains reuse the
+        # cached outputs of both links.
+        assert len(transformed) == 4
+        assert engine._stats["Transformation cache misses"] == 4
+        assert engine._stats["Transformation cache hits"] == 8
+        assert temp_conn.execute(
+            "SELECT COUNT(*) FROM failed_invariant;"
+        ).fetchall() == [(0,)]
+
+
+def test_skip_fixed_points(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    correct_relation_1: Relation[ast.Expression, float],
+    correct_relation_3: Relation[ast.Expression, float],
+) -> None:
+    evaluated: list[ast.Expression] = []
+
+    def counting_eval_expr(a: ast.Expression) -> float:
+        evaluated.append(a)
+        return eval_expr(a)
+
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=counting_eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            skip_fixed_points=True,
+        )
+        engine.execute([[correct_relation_1, correct_relation_3, correct_relation_1]])
+
+        # Both `identity` links are fixed points, so the SUT is only called for the
+        # baseline and the `subtract_1_from_expression` link.
+        assert len(evaluated) == 2 + 2
+        assert engine._stats["Fixed point SUT calls skipped"] == 4
+        assert temp_conn.execute(
+            "SELECT COUNT(*) FROM failed_invariant;"
+        ).fetchall() == [(0,)]
+
+
+def test_content_hashes_carried_forward(
+    monkeypatch: pytest.MonkeyPatch,
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+) -> None:
+    hashed: list[object] = []
+
+    def counting_content_hash(obj: object) -> bytes:
+        hashed.append(obj)
+        return content_hash(obj)
+
+    monkeypatch.setattr(_engine, "content_hash", counting_content_hash)
+    relation = Relation[ast.Expression, float](
+        transformation=deterministic(subtract_1_from_expression)
+    )
+    relation.add_invariant(invariant=invariants.less_than)
+
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            skip_fixed_points=True,
+        )
+        hashed.clear()
+        engine.execute([[relation, relation]])
+
+        # The hashes of the input data are known from their blobs, and the hashes of
+        # the transformed inputs, computed to detect fixed points, are reused as cache
+        # keys by the next link, so only each transformed input is hashed once.
+        assert len(hashed) == 2 * 2
+
+
+def test_buffered_writes(
+    monkeypatch: pytest.MonkeyPatch,
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    # A tiny buffer forces rows to be written while chains are still executing.
+    monkeypatch.setattr(_engine, "_WRITE_BUFFER_SIZE", 3)
+
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        assert temp_conn.execute("PRAGMA journal_mode;").fetchone() == ("wal",)
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2] * 2,
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            persist_baseline_results=True,
+        )
+        engine.execute([incorrect_relation_chain] * 3)
+
+        assert engine._num_pending_rows == 0
+        assert temp_conn.execute("PRAGMA foreign_key_check;").fetchall() == []
+        assert temp_conn.execute(
+            "SELECT COUNT(*) FROM applied_transformation;"
+        ).fetchall() == [(9,)]
+        assert temp_conn.execute(
+            "SELECT COUNT(*) FROM failed_invariant;"
+        ).fetchall() == [(12,)]
+
+
+def test_interned_names(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    correct_relation_chain: list[Relation[ast.Expression, float]],
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=2,
+        )
+        engine.execute([correct_relation_chain, incorrect_relation_chain] * 2)
+
+        # Each name is stored once, even though every shard interned it separately.
+        assert temp_conn.execute(
+            "SELECT name FROM transformation ORDER BY name;"
+        ).fetchall() == [("identity",), ("inverse",), ("subtract_1_from_expression",)]
+        assert temp_conn.execute("SELECT name FROM invariant;").fetchall() == [
+            ("equals",)
+        ]
+        # Chain links from different shards never share an id.
+        assert temp_conn.execute(
+            "SELECT COUNT(DISTINCT id), MIN(id), MAX(id) FROM applied_transformation;"
+        ).fetchall() == [(12, 1, 12)]
+        assert temp_conn.execute(
+            """
+SELECT COUNT(*)
+FROM applied_transformation t
+LEFT JOIN applied_transformation p ON t.previous_transformation = p.id
+WHERE t.link_index > 0 AND p.link_index != t.link_index - 1;
+            """
+        ).fetchall() == [(0,)]
+        assert temp_conn.execute("PRAGMA foreign_key_check;").fetchall() == []
+
+
+@pytest.mark.parametrize("window_size", [None, 2])
+def test_deduplicated_input_data(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+    window_size: int | None,
+) -> None:
+    input_data = [sample_expression_1, sample_expression_2, sample_expression_1] * 2
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=input_data,
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            window_size=window_size,
+        )
+        engine.execute([incorrect_relation_chain])
+
+        assert temp_conn.execute("SELECT COUNT(*) FROM input_blob;").fetchall() == [
+            (2,)
+        ]
+        # The `input_data` view still exposes every input as a plain pickle.
+        assert [
+            ast.unparse(pickle.loads(obj))
+            for (obj,) in temp_conn.execute(
+                "SELECT obj FROM input_data ORDER BY id;"
+            ).fetchall()
+        ] == [ast.unparse(expr) for expr in input_data]
+        assert temp_conn.execute(
+            "SELECT COUNT(*) FROM failed_invariant;"
+        ).fetchall() == [(6,)]
+
+
+@pytest.mark.parametrize("num_processes", [1, 2])
+def test_duckdb_recorder(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    correct_relation_chain: list[Relation[ast.Expression, float]],
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+    num_processes: int,
+) -> None:
+    with TemporaryDuckDBRelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=num_processes,
+            persist_baseline_results=True,
+        )
+        engine.execute([correct_relation_chain, incorrect_relation_chain] * 2)
+        conn = engine.results_to_duckdb()
+
+    # The recording connection is returned without being converted.
+    assert conn is temp_conn
+    assert [
+        ast.unparse(pickle.loads(obj))
+        for (obj,) in conn.execute("SELECT obj FROM input_data ORDER BY id;").fetchall()
+    ] == [ast.unparse(sample_expression_1), ast.unparse(sample_expression_2)]
+    assert conn.execute("SELECT COUNT(*) FROM baseline_result;").fetchall() == [(2,)]
+    assert conn.execute(
+        "SELECT COUNT(DISTINCT id), MIN(id), MAX(id) FROM applied_transformation;"
+    ).fetchall() == [(12, 1, 12)]
+    assert conn.execute(
+        """
+SELECT COUNT(*)
+FROM applied_transformation t
+LEFT JOIN applied_transformation p ON t.previous_transformation = p.id
+WHERE t.link_index > 0 AND p.link_index != t.link_index - 1;
+        """
+    ).fetchall() == [(0,)]
+    assert conn.execute(
+        "SELECT name, COUNT(DISTINCT id) FROM failed_invariant GROUP BY name;"
+    ).fetchall() == [("equals", 4)]
+    assert not any(db_path.parent.glob("shard_*.db"))
+
+
+def test_duckdb_recorder_streamed_input_data(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    with TemporaryDuckDBRelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=iter([sample_expression_1, sample_expression_2] * 3),
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            window_size=4,
+        )
+        engine.execute([incorrect_relation_chain])
+        conn = engine.results_to_duckdb()
+
+    assert conn.execute("SELECT COUNT(*) FROM input_blob;").fetchall() == [(2,)]
+    assert conn.execute("SELECT COUNT(*) FROM failed_invariant;").fetchall() == [(6,)]
+
+    with pytest.raises(ValueError, match="Streamed input data"):
+        Engine(
+            sut=eval_expr,
+            sqlite_conn=conn,
+            input_data=[sample_expression_1],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=2,
+            window_size=4,
+        )
+
+
+def raise_quoted_message(expr: ast.Expression) -> float:
+    result = eval_expr(expr)
+    if result < 0:
+        raise ValueError('The "result", of all things,\nis negative.')
+    return result
+
+
+def test_duckdb_recorder_staged_rows(
+    sample_expression_1: ast.Expression,
+    correct_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    with TemporaryDuckDBRelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=raise_quoted_message,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, ast.parse("0 - 1", mode="eval")],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            catch_errors=True,
+            persist_baseline_results=True,
+        )
+        engine.execute([correct_relation_chain])
+        conn = engine.results_to_duckdb()
+
+        # Quotes, separators, newlines, NULLs and blobs survive the staged CSV file,
+        # which is removed once its rows are loaded.
+        assert conn.execute(
+            """
+SELECT f.message, f.applied_transformation IS NULL
+FROM failed_execution f
+ORDER BY f.id;
+            """
+        ).fetchall() == [
+            ('ValueError: The "result", of all things,\nis negative.', True),
+            ('ValueError: The "result", of all things,\nis negative.', False),
+        ]
+        assert [
+            pickle.loads(obj)
+            for (obj,) in conn.execute("SELECT obj FROM baseline_result;").fetchall()
+        ] == [eval_expr(sample_expression_1)]
+        assert [
+            ast.unparse(pickle.loads(obj))
+            for (obj,) in conn.execute("SELECT obj FROM input_data ORDER BY id;")
+            .fetchall()[:1]
+        ] == [ast.unparse(sample_expression_1)]
+        assert not any(db_path.parent.glob("rows_*.csv"))
+
+
+def add_1(x: int) -> int:
+    return x + 1
+
+
+def test_duckdb_recorder_benchmark() -> None:
+    relation = Relation[int, int](transformation=add_1)
+    relation.add_invariant(invariant=invariants.equals)
+
+    # Every link fails for every input, so the run is dominated by recording results.
+    durations = {}
+    for recorder, relation_connection in (
+        ("sqlite", TemporarySqlite3RelationConnection),
+        ("duckdb", TemporaryDuckDBRelationConnection),
+    ):
+        with relation_connection() as (temp_conn, db_path):
+            start_time = time.perf_counter()
+            engine = Engine(
+                sut=int,
+                sqlite_conn=temp_conn,
+                input_data=list(range(2_000)),
+                sqlite_db=db_path,
+                writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+                num_processes=1,
+            )
+            engine.execute([[relation] * 5] * 20)
+            try:
+                conn = engine.results_to_duckdb()
+            except duckdb.IOException:
+                pytest.skip("The duckdb sqlite extension cannot be installed.")
+            durations[recorder] = time.perf_counter() - start_time
+            assert conn.execute("SELECT COUNT(*) FROM failed_invariant;").fetchall() == [
+                (2_000 * 5 * 20,)
+            ]
+
+    # Recording directly into duckdb is not slower than recording into sqlite and
+    # converting the results into duckdb afterwards.
+    assert durations["duckdb"] <= durations["sqlite"]
+
+
+def test_resume_run(
+    tmp_path: Path,
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    evaluated: list[ast.Expression] = []
+
+    def counting_sut(expr: ast.Expression) -> float:
+        evaluated.append(expr)
+        return eval_expr(expr)
+
+    relation_chains = [
+        RelationChain(incorrect_relation_chain, seed=seed) for seed in range(3)
+    ]
+    with PersistentSqlite3RelationConnection(tmp_path / "run") as (conn, db_path):
+        engine = Engine(
+            sut=counting_sut,
+            sqlite_conn=conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            persist_baseline_results=True,
+            max_failures=2,
+        )
+        engine.execute(relation_chains)
+
+    with PersistentSqlite3RelationConnection(tmp_path / "run") as (conn, db_path):
+        # Only the first chain completed before the failure limit stopped the run.
+        assert conn.execute("SELECT seed FROM completed_chain;").fetchall() == [(0,)]
+        evaluated.clear()
+        engine = Engine(
+            sut=counting_sut,
+            sqlite_conn=conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            persist_baseline_results=True,
+        )
+        engine.execute(relation_chains[1:])
+
+        # The baseline results are restored instead of being recomputed.
+        assert len(evaluated) == 2 * 3 * 2
+        assert conn.execute(
+            "SELECT seed FROM completed_chain ORDER BY seed;"
+        ).fetchall() == [(0,), (1,), (2,)]
+        assert conn.execute("SELECT COUNT(*) FROM input_record;").fetchall() == [(2,)]
+        assert conn.execute(
+            "SELECT COUNT(DISTINCT id), MAX(id) FROM applied_transformation;"
+        ).fetchall() == [(9, 9)]
+        assert conn.execute(
+            "SELECT COUNT(DISTINCT id) FROM failed_invariant;"
+        ).fetchall() == [(6,)]
+
+    with (
+        PersistentSqlite3RelationConnection(tmp_path / "run") as (conn, db_path),
+        pytest.raises(ValueError, match="does not match"),
+    ):
+        Engine(
+            sut=counting_sut,
+            sqlite_conn=conn,
+            input_data=[sample_expression_2, sample_expression_1],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+        )
+
+
+@pytest.mark.parametrize("share_prefixes", [False, True])
+def test_resume_discards_incomplete_chains(
+    tmp_path: Path,
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    correct_relation_1: Relation[ast.Expression, float],
+    correct_relation_2: Relation[ast.Expression, float],
+    incorrect_relation_1: Relation[ast.Expression, float],
+    share_prefixes: bool,
+) -> None:
+    relation_chains = [
+        RelationChain([incorrect_relation_1, correct_relation_1], seed=0),
+        RelationChain(
+            [correct_relation_2, incorrect_relation_1, correct_relation_1], seed=1
+        ),
+    ]
+    for max_failures in (3, None):
+        with PersistentSqlite3RelationConnection(tmp_path / "run") as (conn, db_path):
+            completed_seeds = {
+                seed
+                for (seed,) in conn.execute(
+                    "SELECT seed FROM completed_chain;"
+                ).fetchall()
+            }
+            engine = Engine(
+                sut=eval_expr,
+                sqlite_conn=conn,
+                input_data=[sample_expression_1, sample_expression_2],
+                sqlite_db=db_path,
+                writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+                num_processes=1,
+                share_prefixes=share_prefixes,
+                max_failures=max_failures,
+            )
+            engine.execute(
+                [
+                    relation_chain
+                    for relation_chain in relation_chains
+                    if relation_chain.seed not in completed_seeds
+                ]
+            )
+
+    with PersistentSqlite3RelationConnection(tmp_path / "run") as (conn, db_path):
+        # The links and failures committed by the chain that was stopped by the failure
+        # limit are deleted before it is executed again.
+        assert conn.execute(
+            "SELECT seed FROM completed_chain ORDER BY seed;"
+        ).fetchall() == [(0,), (1,)]
+        assert conn.execute("SELECT COUNT(*) FROM chain_link;").fetchall() == [(5,)]
+        assert conn.execute("SELECT COUNT(*) FROM invariant_failure;").fetchall() == [
+            (4,)
+        ]
+
+
+@pytest.mark.parametrize(
+    "relation_connection",
+    [TemporarySqlite3RelationConnection, TemporaryDuckDBRelationConnection],
+)
+def test_summaries(
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    correct_relation_chain: list[Relation[ast.Expression, float]],
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+    relation_connection: type,
+) -> None:
+    with relation_connection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+        )
+        engine.execute([correct_relation_chain, incorrect_relation_chain])
+        engine.create_summaries()
+
+        assert temp_conn.execute(
+            "SELECT path FROM chain_path WHERE link_index = 2 ORDER BY chain_link;"
+        ).fetchall() == [
+            ("identity -> inverse -> subtract_1_from_expression",),
+        ] * 2
+        assert temp_conn.execute(
+            "SELECT * FROM failure_count_by_relation;"
+        ).fetchall() == [("subtract_1_from_expression", "equals", 2, 2)]
+        assert temp_conn.execute(
+            "SELECT * FROM failure_count_by_input ORDER BY input_data;"
+        ).fetchall() == [(1, 1, 1, 1), (2, 1, 1, 1)]
+        assert temp_conn.execute("SELECT * FROM failure_count_by_depth;").fetchall() == [
+            (2, 2, 2)
+        ]
+        assert temp_conn.execute(
+            "SELECT name, path FROM failed_invariant_path;"
+        ).fetchall() == [
+            ("equals", "identity -> inverse -> subtract_1_from_expression"),
+        ] * 2
+
+        # Summaries are rebuilt from scratch when they are refreshed.
+        engine.execute([incorrect_relation_chain])
+        engine.create_summaries()
+        assert temp_conn.execute(
+            "SELECT num_failures FROM failure_count_by_relation;"
+        ).fetchall() == [(4,)]
+
+
+@pytest.mark.parametrize(
+    ("num_processes", "share_prefixes"), [(1, False), (1, True), (2, False)]
+)
+def test_chain_feedback(
+    num_processes: int,
+    share_prefixes: bool,
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    correct_relation_chain: list[Relation[ast.Expression, float]],
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    observed: list[list[_engine.LinkOutcome]] = []
+    with TemporaryDuckDBRelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1, sample_expression_2],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=num_processes,
+            share_prefixes=share_prefixes,
+        )
+        engine.execute(
+            [correct_relation_chain, incorrect_relation_chain],
+            on_chain_executed=observed.append,
+        )
+
+    assert sorted(
+        [
+            (outcome.relation, outcome.link_index, outcome.failed_invariants)
+            for outcome in outcomes
+        ]
+        for outcomes in observed
+    ) == [
+        [
+            ("identity", 0, []),
+            ("inverse", 1, []),
+            ("subtract_1_from_expression", 2, []),
+        ],
+        [
+            ("identity", 0, []),
+            ("inverse", 1, []),
+            ("subtract_1_from_expression", 2, ["equals"]),
+        ],
+    ]
+    assert all(
+        outcome.duration >= 0 for outcomes in observed for outcome in outcomes
+    )
+
+
+def test_collect_coverage(
+    sample_expression_1: ast.Expression,
+    correct_relation_1: Relation[ast.Expression, float],
+    correct_relation_2: Relation[ast.Expression, float],
+) -> None:
+    def sign(expr: ast.Expression) -> float:
+        if eval_expr(expr) < 0:
+            return -1.0
+        return 1.0
+
+    observed: list[list[_engine.LinkOutcome]] = []
+    with TemporaryDuckDBRelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=sign,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            collect_coverage=True,
+        )
+        engine.execute(
+            [
+                [correct_relation_1, correct_relation_2],
+                [correct_relation_2, correct_relation_1],
+            ],
+            on_chain_executed=observed.append,
+        )
+
+    # Only the first link that inverts the sign of the input reaches new coverage.
+    assert [
+        [outcome.new_coverage > 0 for outcome in outcomes] for outcomes in observed
+    ] == [[False, True], [False, False]]
+
+    with pytest.raises(ValueError, match="Coverage cannot be collected"):
+        Engine(
+            sut=sign,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            isolate_calls=True,
+            collect_coverage=True,
+        )
+    with pytest.raises(ValueError, match="Coverage cannot be collected"):
+        Engine(
+            sut=sign,
+            sqlite_conn=temp_conn,
+            input_data=[sample_expression_1],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=2,
+            collect_coverage=True,
+        )
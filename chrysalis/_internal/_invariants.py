@@ -11,8 +11,25 @@ This collection can be added to as collaborators see fit. General guidelines for
 a new invariant are as follows:
 - The new invariant is general
 - The new invariant is easy to understand at a moment's glance
+
+Vectorized forms of these invariants, which compare NumPy arrays of results in a single
+call, are available under `vectorized`.
 """
 
+from chrysalis._internal import _vectorized_invariants as vectorized
+
+__all__ = (
+    "equals",
+    "greater_than",
+    "greater_than_equal",
+    "is_same_sign",
+    "less_than",
+    "less_than_equal",
+    "not_equals",
+    "not_same_sign",
+    "vectorized",
+)
+
 
 def equals[T](curr: T, prev: T) -> bool:
     return curr == prev
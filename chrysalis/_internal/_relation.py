@@ -1,6 +1,30 @@
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
+
+from chrysalis._internal._vectorized_invariants import VectorizedInvariant
 
 _LAMBDA_FUNCTION_NAME = "<lambda>"
+_DETERMINISTIC_ATTRIBUTE = "__chrysalis_deterministic__"
+
+type Invariant[R] = Callable[[R, R], bool] | VectorizedInvariant
+"""An invariant comparing single results, or arrays of results if vectorized."""
+
+
+def deterministic[F: Callable](transformation: F) -> F:
+    """
+    Mark a transformation as deterministic.
+
+    A deterministic transformation always returns an equal output for an equal input
+    and has no side effects, so the engine may reuse a previously computed output
+    instead of calling the transformation again. Cached outputs are shared between
+    relation chains, so the transformation must not mutate its input in place.
+    """
+    setattr(transformation, _DETERMINISTIC_ATTRIBUTE, True)
+    return transformation
+
+
+def is_deterministic(transformation: Callable) -> bool:
+    """Return whether a transformation has been marked as deterministic."""
+    return getattr(transformation, _DETERMINISTIC_ATTRIBUTE, False)
 
 
 class Relation[T, R]:
@@ -19,9 +43,9 @@ class Relation[T, R]:
         transformation: Callable[[T], T],
     ):
         self._transformation = transformation
-        self._invariants: set[Callable[[R, R], bool]] = set()
+        self._invariants: set[Invariant[R]] = set()
 
-    def add_invariant(self, invariant: Callable[[R, R], bool]) -> None:
+    def add_invariant(self, invariant: Invariant[R]) -> None:
         """Add an invariant to a transformation to create a new relation pair."""
         self._invariants.add(invariant)
 
@@ -34,7 +58,11 @@ class Relation[T, R]:
         return self._transformation.__name__
 
     @property
-    def invariants(self) -> list[Callable[[R, R], bool]]:
+    def is_deterministic(self) -> bool:
+        return is_deterministic(self._transformation)
+
+    @property
+    def invariants(self) -> list[Invariant[R]]:
         return list(self._invariants)
 
 
@@ -47,26 +75,55 @@ class KnowledgeBase[T, R]:
 
     Is it important to note that lambda functions cannot be used for transformations or
     invariants.
+
+    Algebraic properties of transformations can be declared on registration, which
+    allows the search space to prune equivalent relation chains. Applying an idempotent
+    transformation twice in a row is the same as applying it once, and applying two
+    commuting transformations in either order produces the same input.
     """
 
     def __init__(self) -> None:
         self._relations: dict[str, Relation[T, R]] = {}
+        self._idempotent: set[str] = set()
+        self._commuting: set[frozenset[str]] = set()
 
     def register(
         self,
         transformation: Callable[[T], T],
-        invariant: Callable[[R, R], bool],
+        invariant: Invariant[R],
+        idempotent: bool = False,
+        commutes_with: Iterable[Callable[[T], T]] = (),
     ):
         """Register a relation into the knowledge base, ensuring the name is unique."""
         transform_name = transformation.__name__
-        if _LAMBDA_FUNCTION_NAME in {transform_name, invariant.__name__}:
+        commuting_names = {other.__name__ for other in commutes_with}
+        if _LAMBDA_FUNCTION_NAME in {
+            transform_name,
+            invariant.__name__,
+            *commuting_names,
+        }:
             raise ValueError(
                 "Lambda functions cannot be used as transformation or invariants."
             )
 
+        # The relation is not parametrized, since an instance of a parametrized class
+        # keeps its type parameters, which cannot be pickled when sending relations
+        # to worker processes.
         if transform_name not in self._relations:
-            self._relations[transform_name] = Relation[T, R](transformation)
+            self._relations[transform_name] = Relation(transformation)
         self._relations[transform_name].add_invariant(invariant)
+        if idempotent:
+            self._idempotent.add(transform_name)
+        for other_name in commuting_names - {transform_name}:
+            self._commuting.add(frozenset((transform_name, other_name)))
+
+    def is_idempotent(self, transformation_name: str) -> bool:
+        """Return whether a transformation has been declared idempotent."""
+        return transformation_name in self._idempotent
+
+    def commute(self, transformation_name: str, other_name: str) -> bool:
+        """Return whether two distinct transformations have been declared to commute."""
+        return frozenset((transformation_name, other_name)) in self._commuting
 
     @property
     def relations(self) -> list[Relation[T, R]]:
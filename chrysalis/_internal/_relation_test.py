@@ -3,8 +3,8 @@ import ast
 import pytest
 
 from chrysalis._internal import _invariants as invariants
-from chrysalis._internal._relation import KnowledgeBase
-from chrysalis._internal.conftest import identity
+from chrysalis._internal._relation import KnowledgeBase, Relation, deterministic
+from chrysalis._internal.conftest import identity, inverse
 
 
 def test_create_relation() -> None:
@@ -29,3 +29,32 @@ def test_create_relation_lambda() -> None:
             transformation=lambda x: x,
             invariant=lambda x, y: x == y,
         )
+
+
+def test_deterministic_relation() -> None:
+    def double(x: int) -> int:
+        return 2 * x
+
+    assert not Relation[int, int](transformation=double).is_deterministic
+    assert deterministic(double) is double
+    assert Relation[int, int](transformation=double).is_deterministic
+
+
+def test_relation_properties() -> None:
+    knowledge_base = KnowledgeBase[ast.Expression, float]()
+    knowledge_base.register(
+        transformation=identity,
+        invariant=invariants.equals,
+        idempotent=True,
+        commutes_with=[inverse],
+    )
+    knowledge_base.register(
+        transformation=inverse,
+        invariant=invariants.not_equals,
+    )
+
+    assert knowledge_base.is_idempotent("identity")
+    assert not knowledge_base.is_idempotent("inverse")
+    assert knowledge_base.commute("identity", "inverse")
+    assert knowledge_base.commute("inverse", "identity")
+    assert not knowledge_base.commute("inverse", "inverse")
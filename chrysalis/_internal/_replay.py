@@ -0,0 +1,143 @@
+"""
+Replay of failed invariants.
+
+Transformed inputs are not stored by default, since they can be derived again by
+replaying the transformations of a relation chain on the original input. A failed
+invariant is replayed by walking the `previous_transformation` links of its applied
+transformation back to the start of the relation chain, and applying each of their
+transformations again.
+
+If the engine snapshots intermediate inputs every k links, replay starts from the
+latest snapshot before the failed link instead of the original input, so at most k
+transformations are applied again regardless of the length of the relation chain.
+"""
+
+import asyncio
+import inspect
+import sqlite3
+from collections.abc import Mapping
+from typing import Any, NamedTuple
+
+import duckdb
+
+from chrysalis._internal._relation import Relation
+from chrysalis._internal._serialization import decompress
+from chrysalis._internal._sut import SystemUnderTest, is_batched
+
+_SELECT_FAILED_INVARIANT = """
+SELECT name, applied_transformation, input_data
+FROM failed_invariant
+WHERE id = ?;
+"""
+
+_SELECT_CHAIN_LINKS = """
+WITH RECURSIVE chain (id, name, previous_transformation, link_index) AS (
+    SELECT id, name, previous_transformation, link_index
+    FROM applied_transformation
+    WHERE id = ?
+    UNION ALL
+    SELECT a.id, a.name, a.previous_transformation, a.link_index
+    FROM applied_transformation a
+    JOIN chain c ON a.id = c.previous_transformation
+)
+SELECT c.name, c.link_index, b.data
+FROM chain c
+LEFT JOIN input_snapshot s ON s.chain_link = c.id AND s.input_data = ?
+LEFT JOIN input_blob b ON b.hash = s.blob
+ORDER BY c.link_index;
+"""
+"""Select every link of a relation chain up to a link, along with its snapshot."""
+
+_SELECT_INPUT_DATA = """
+SELECT b.data
+FROM input_record i
+JOIN input_blob b ON b.hash = i.blob
+WHERE i.id = ?;
+"""
+
+
+class Replay(NamedTuple):
+    """The inputs and results of the relation chain link at which an invariant failed."""
+
+    invariant: str
+    transformation: str
+    link_index: int
+    input_data: int
+    previous_input: Any
+    current_input: Any
+    previous_result: Any
+    current_result: Any
+
+
+def _get_relation(relations: Mapping[str, Relation], name: str) -> Relation:
+    """Return the relation of a recorded transformation."""
+    relation = relations.get(name)
+    if relation is None:
+        raise ValueError(
+            f"The transformation {name} must be registered to replay its relation chain."
+        )
+    return relation
+
+
+def _call_sut(sut: SystemUnderTest, input_obj: Any, batched: bool) -> Any:
+    """Call a SUT of any form on a single input."""
+    result: Any = sut([input_obj] if batched else input_obj)
+    if inspect.iscoroutine(result):
+        result = asyncio.run(result)
+    return result[0] if batched else result
+
+
+def replay(
+    conn: sqlite3.Connection | duckdb.DuckDBPyConnection,
+    failed_invariant_id: int,
+    sut: SystemUnderTest,
+    relations: Mapping[str, Relation],
+    batched: bool | None = None,
+) -> Replay:
+    """
+    Replay the relation chain link at which an invariant failed.
+
+    The input of the failed link is derived again from the latest snapshot of a
+    previous link (or the original input if there is none), and the SUT is called on
+    the inputs before and after the transformation of the failed link. If the failed
+    link itself was snapshotted, the snapshot is used instead of transforming the
+    input again.
+    """
+    row = conn.execute(_SELECT_FAILED_INVARIANT, (failed_invariant_id,)).fetchone()
+    if row is None:
+        raise ValueError(f"No failed invariant with id {failed_invariant_id} exists.")
+    invariant, applied_transformation, input_data_id = row
+    links = conn.execute(
+        _SELECT_CHAIN_LINKS, (applied_transformation, input_data_id)
+    ).fetchall()
+    *previous_links, (transformation, link_index, snapshot) = links
+
+    start = len(previous_links)
+    while start > 0 and previous_links[start - 1][2] is None:
+        start -= 1
+    if start > 0:
+        previous_input = decompress(previous_links[start - 1][2])
+    else:
+        [(blob,)] = conn.execute(_SELECT_INPUT_DATA, (input_data_id,)).fetchall()
+        previous_input = decompress(blob)
+    for name, _, _ in previous_links[start:]:
+        previous_input = _get_relation(relations, name).apply_transform(previous_input)
+
+    if snapshot is not None:
+        current_input = decompress(snapshot)
+    else:
+        current_input = _get_relation(relations, transformation).apply_transform(
+            previous_input
+        )
+
+    batched = is_batched(sut) if batched is None else batched
+    return Replay(
+        invariant=invariant,
+        transformation=transformation,
+        link_index=link_index,
+        input_data=input_data_id,
+        previous_input=previous_input,
+        current_input=current_input,
+        previous_result=_call_sut(sut, previous_input, batched),
+        current_result=_call_sut(sut, current_input, batched),
+    )
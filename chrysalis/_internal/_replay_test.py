@@ -0,0 +1,132 @@
+import pytest
+
+from chrysalis._internal._engine import (
+    Engine,
+    TemporaryDuckDBRelationConnection,
+    TemporarySqlite3RelationConnection,
+)
+from chrysalis._internal._relation import Relation
+from chrysalis._internal._writer import TerminalUIWriter, Verbosity
+
+_NUM_TRANSFORMS = 0
+
+
+def add_1(x: int) -> int:
+    global _NUM_TRANSFORMS  # NOQA: PLW0603
+    _NUM_TRANSFORMS += 1
+    return x + 1
+
+
+def double(x: int) -> int:
+    return x * 2
+
+
+def is_smaller(curr: int, prev: int) -> bool:
+    return curr < prev
+
+
+@pytest.fixture
+def add_1_chain() -> list[Relation[int, int]]:
+    relation = Relation[int, int](transformation=add_1)
+    relation.add_invariant(invariant=is_smaller)
+    return [relation] * 10
+
+
+@pytest.mark.parametrize(
+    ("snapshot_interval", "expected_num_transforms"),
+    [
+        (None, 10),
+        # Links 3 and 7 are snapshotted, so links 8 and 9 are transformed again.
+        (4, 2),
+        # Link 9 itself is snapshotted, so only links 5 to 8 are transformed again.
+        (5, 4),
+    ],
+)
+def test_replay(
+    add_1_chain: list[Relation[int, int]],
+    snapshot_interval: int | None,
+    expected_num_transforms: int,
+) -> None:
+    global _NUM_TRANSFORMS  # NOQA: PLW0603
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=double,
+            sqlite_conn=temp_conn,
+            input_data=[0, 100],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+            snapshot_interval=snapshot_interval,
+        )
+        engine.execute([add_1_chain])
+        ((failed_invariant_id,),) = temp_conn.execute(
+            """
+SELECT f.id
+FROM failed_invariant f
+JOIN applied_transformation t ON t.id = f.applied_transformation
+WHERE t.link_index = 9 AND f.input_data = 1;
+            """
+        ).fetchall()
+
+        _NUM_TRANSFORMS = 0
+        replay = engine.replay(failed_invariant_id)
+
+    assert _NUM_TRANSFORMS == expected_num_transforms
+    assert replay.invariant == "is_smaller"
+    assert replay.transformation == "add_1"
+    assert replay.link_index == 9
+    assert (replay.previous_input, replay.current_input) == (9, 10)
+    assert (replay.previous_result, replay.current_result) == (18, 20)
+
+
+def test_replay_parallel_snapshots(add_1_chain: list[Relation[int, int]]) -> None:
+    with TemporaryDuckDBRelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=double,
+            sqlite_conn=temp_conn,
+            input_data=[0, 100],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=2,
+            snapshot_interval=3,
+        )
+        engine.execute([add_1_chain, add_1_chain[:5]])
+
+        # Links 2, 5 and 8 of the first chain and link 2 of the second chain are
+        # snapshotted for both inputs.
+        assert temp_conn.execute("SELECT COUNT(*) FROM input_snapshot;").fetchall() == [
+            (8,)
+        ]
+        replays = [
+            engine.replay(failed_invariant_id)
+            for (failed_invariant_id,) in temp_conn.execute(
+                "SELECT id FROM failed_invariant ORDER BY id;"
+            ).fetchall()
+        ]
+
+    assert sorted(
+        (replay.previous_input, replay.current_input, replay.current_result)
+        for replay in replays
+    ) == sorted(
+        (start + i, start + i + 1, 2 * (start + i + 1))
+        for start in (0, 100)
+        for num_links in (10, 5)
+        for i in range(num_links)
+    )
+
+
+def test_replay_missing_failed_invariant(
+    add_1_chain: list[Relation[int, int]],
+) -> None:
+    with TemporarySqlite3RelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=double,
+            sqlite_conn=temp_conn,
+            input_data=[0],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+        )
+        engine.execute([add_1_chain])
+        with pytest.raises(ValueError, match="No failed invariant"):
+            engine.replay(1000)
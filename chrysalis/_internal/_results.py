@@ -0,0 +1,173 @@
+"""
+Persistence of run results as Parquet files.
+
+The duckdb connection returned by a run is in-memory, so its results are lost once the
+process exits. Results can instead be exported into a directory of Parquet files and
+opened again later. Every table is exported into its own file, except for invariant
+failures, which are usually the largest table by far and are partitioned by the name of
+the failed invariant and the name of the transformation that was applied. Filtering the
+failures of a loaded run by either name then only scans the matching partitions.
+
+Summary tables are exported alongside the results if they have been built, so that a
+loaded run can be summarized without scanning all of its failures again.
+
+Loading a run does not read any data up front. Each table is exposed as a view over a
+Parquet scan, so queries only read the files (and columns) that they need.
+"""
+
+from pathlib import Path
+
+import duckdb
+
+from chrysalis._internal._engine import (
+    _BLOB_TO_PICKLE_FUNCTION,
+    _CREATE_APPLIED_TRANSFORMATION_VIEW,
+    _CREATE_FAILED_INVARIANT_PATH_VIEW,
+    _CREATE_INPUT_DATA_VIEW,
+    _SUMMARY_TABLES,
+)
+from chrysalis._internal._serialization import blob_to_pickle
+
+_TABLES = (
+    "input_blob",
+    "input_record",
+    "baseline_result",
+    "transformation",
+    "invariant",
+    "chain_link",
+    "input_snapshot",
+    "failed_execution",
+    "completed_chain",
+)
+"""Every table that is exported into a single Parquet file."""
+
+_INVARIANT_FAILURE_DIR = "invariant_failure"
+"""The directory holding the partitioned `invariant_failure` table."""
+
+_SELECT_PARTITIONED_INVARIANT_FAILURES = """
+SELECT
+    f.id,
+    f.invariant,
+    f.chain_link,
+    f.input_data,
+    i.name AS invariant_name,
+    t.name AS transformation_name
+FROM invariant_failure f
+JOIN invariant i ON i.id = f.invariant
+JOIN chain_link l ON l.id = f.chain_link
+JOIN transformation t ON t.id = l.transformation
+"""
+
+_EMPTY_PARTITIONED_INVARIANT_FAILURES = """
+(
+    SELECT
+        NULL::INTEGER AS id,
+        NULL::INTEGER AS invariant,
+        NULL::INTEGER AS chain_link,
+        NULL::INTEGER AS input_data,
+        NULL::TEXT AS invariant_name,
+        NULL::TEXT AS transformation_name
+    WHERE false
+)
+"""
+"""The partitioned invariant failures of a run without any failed invariant."""
+
+
+def _quote(path: Path) -> str:
+    """Return a path as a SQL string literal."""
+    escaped = str(path).replace("'", "''")
+    return f"'{escaped}'"
+
+
+def export_results(conn: duckdb.DuckDBPyConnection, directory: str | Path) -> None:
+    """
+    Export the results of a run into a directory of Parquet files.
+
+    The directory is created if it does not exist, and the results of a previous export
+    into the same directory are overwritten.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    summary_tables = [
+        table
+        for (table,) in conn.execute(
+            "SELECT table_name FROM information_schema.tables;"
+        ).fetchall()
+        if table in _SUMMARY_TABLES
+    ]
+    for table in (*_TABLES, *summary_tables):
+        conn.execute(
+            f"COPY {table} TO {_quote(directory / f'{table}.parquet')} (FORMAT PARQUET);"
+        )
+    conn.execute(
+        f"""
+COPY ({_SELECT_PARTITIONED_INVARIANT_FAILURES})
+TO {_quote(directory / _INVARIANT_FAILURE_DIR)}
+(FORMAT PARQUET, PARTITION_BY (invariant_name, transformation_name), OVERWRITE TRUE);
+"""
+    )
+
+
+def load_results(directory: str | Path) -> duckdb.DuckDBPyConnection:
+    """
+    Open the results of a run previously exported into a directory of Parquet files.
+
+    The returned connection has the same tables and views as the connection returned by
+    the run, but every table is a view over the exported files that is scanned lazily.
+    """
+    directory = Path(directory)
+    if not (directory / "chain_link.parquet").exists():
+        raise FileNotFoundError(f"No exported results were found in {directory}.")
+
+    conn = duckdb.connect()
+    conn.create_function(_BLOB_TO_PICKLE_FUNCTION, blob_to_pickle, ["BLOB"], "BLOB")
+    for table in _TABLES:
+        conn.execute(
+            f"CREATE VIEW {table} AS SELECT * FROM read_parquet({_quote(directory / f'{table}.parquet')});"
+        )
+
+    # A run without any failed invariant has no partitions, and a Parquet scan cannot
+    # be created without any files.
+    failure_dir = directory / _INVARIANT_FAILURE_DIR
+    if any(failure_dir.rglob("*.parquet")):
+        failures = f"""
+read_parquet(
+    {_quote(failure_dir / "**" / "*.parquet")},
+    hive_partitioning = true,
+    hive_types_autocast = false
+)
+"""
+    else:
+        failures = _EMPTY_PARTITIONED_INVARIANT_FAILURES
+    conn.execute(
+        f"""
+CREATE VIEW invariant_failure AS
+SELECT id, invariant, chain_link, input_data
+FROM {failures};
+"""
+    )
+    # The name of a failed invariant is read from its partition instead of being joined,
+    # so that filtering by name prunes the partitions that are scanned.
+    conn.execute(
+        f"""
+CREATE VIEW failed_invariant AS
+SELECT
+    id,
+    invariant_name AS name,
+    chain_link AS applied_transformation,
+    input_data
+FROM {failures};
+"""
+    )
+    conn.execute(_CREATE_INPUT_DATA_VIEW)
+    conn.execute(_CREATE_APPLIED_TRANSFORMATION_VIEW)
+
+    for table in _SUMMARY_TABLES:
+        path = directory / f"{table}.parquet"
+        if path.exists():
+            conn.execute(
+                f"CREATE VIEW {table} AS SELECT * FROM read_parquet({_quote(path)});"
+            )
+    if (directory / "chain_path.parquet").exists():
+        conn.execute(_CREATE_FAILED_INVARIANT_PATH_VIEW)
+    return conn
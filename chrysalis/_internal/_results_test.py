@@ -0,0 +1,88 @@
+import ast
+import pickle
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from chrysalis._internal._engine import Engine, TemporaryDuckDBRelationConnection
+from chrysalis._internal._relation import Relation
+from chrysalis._internal._results import export_results, load_results
+from chrysalis._internal._writer import TerminalUIWriter, Verbosity
+from chrysalis._internal.conftest import eval_expr
+
+
+def _execute(
+    input_data: list[ast.Expression],
+    relation_chains: list[list[Relation[ast.Expression, float]]],
+) -> duckdb.DuckDBPyConnection:
+    with TemporaryDuckDBRelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=eval_expr,
+            sqlite_conn=temp_conn,
+            input_data=input_data,
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+        )
+        engine.execute(relation_chains)
+        return engine.results_to_duckdb()
+
+
+def test_export_and_load_results(
+    tmp_path: Path,
+    sample_expression_1: ast.Expression,
+    sample_expression_2: ast.Expression,
+    correct_relation_chain: list[Relation[ast.Expression, float]],
+    incorrect_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    conn = _execute(
+        [sample_expression_1, sample_expression_2],
+        [correct_relation_chain, incorrect_relation_chain],
+    )
+    export_results(conn, tmp_path / "run")
+
+    assert (tmp_path / "run" / "chain_link.parquet").exists()
+    assert [
+        path.relative_to(tmp_path / "run" / "invariant_failure").parts[:2]
+        for path in (tmp_path / "run" / "invariant_failure").rglob("*.parquet")
+    ] == [("invariant_name=equals", "transformation_name=subtract_1_from_expression")]
+
+    loaded = load_results(tmp_path / "run")
+    for view in (
+        "input_data",
+        "applied_transformation",
+        "failed_invariant",
+        "failed_execution",
+        "failed_invariant_path",
+    ):
+        query = f"SELECT * FROM {view} ORDER BY id;"
+        assert loaded.execute(query).fetchall() == conn.execute(query).fetchall()
+    query = "SELECT * FROM failure_count_by_relation;"
+    assert loaded.execute(query).fetchall() == conn.execute(query).fetchall()
+    assert [
+        ast.unparse(pickle.loads(obj))
+        for (obj,) in loaded.execute("SELECT obj FROM input_data ORDER BY id;").fetchall()
+    ] == [ast.unparse(sample_expression_1), ast.unparse(sample_expression_2)]
+
+
+def test_load_results_without_failures(
+    tmp_path: Path,
+    sample_expression_1: ast.Expression,
+    correct_relation_chain: list[Relation[ast.Expression, float]],
+) -> None:
+    conn = _execute([sample_expression_1], [correct_relation_chain])
+    export_results(conn, tmp_path)
+
+    loaded = load_results(tmp_path)
+    assert loaded.execute("SELECT COUNT(*) FROM failed_invariant;").fetchall() == [
+        (0,)
+    ]
+    assert loaded.execute(
+        "SELECT COUNT(*) FROM applied_transformation;"
+    ).fetchall() == [(3,)]
+
+
+def test_load_results_missing(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        load_results(tmp_path)
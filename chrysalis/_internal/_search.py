@@ -1,8 +1,15 @@
+import itertools
 import random
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator
 from enum import Enum
+from typing import TYPE_CHECKING
 
 from chrysalis._internal._relation import KnowledgeBase, Relation
 
+if TYPE_CHECKING:
+    from chrysalis._internal._engine import LinkOutcome
+
 
 class SearchStrategy(Enum):
     """Possible search strategies when creating metamorphic relation chains."""
@@ -10,32 +17,302 @@ class SearchStrategy(Enum):
     RANDOM = 1
     EXHAUSTIVE = 2
     DYNAMIC = 3
+    COVERAGE = 4
+
+
+_ONLINE_STRATEGIES = frozenset({SearchStrategy.DYNAMIC, SearchStrategy.COVERAGE})
+"""The search strategies that generate relation chains from previous outcomes."""
+
+
+_CHAIN_SEED_BITS = 63
+"""The number of bits in the seed of a relation chain, which fits a signed integer."""
+
+_PRIOR_FAILURES = 1.0
+"""
+The number of failures every transition is assumed to have produced in a link of
+average duration before it is observed, which favors unexplored transitions.
+"""
+
+_CORPUS_PROBABILITY = 0.8
+"""
+The probability that a coverage-guided relation chain is derived from a relation chain
+in the corpus instead of being sampled uniformly.
+"""
+
+
+class RelationChain(list[Relation]):
+    """
+    A relation chain along with the seed it was generated from.
+
+    For the random and exhaustive strategies, generating a relation chain from the same
+    seed always produces the same relation chain, so the seed identifies a relation
+    chain across runs, such as when a run is resumed. The dynamic and coverage
+    strategies also generate a relation chain from the outcomes observed before it, so
+    the same seed only produces the same relation chain if the same outcomes were
+    observed, and the seed only identifies a relation chain within a single run.
+    """
+
+    def __init__(self, relations: Iterable[Relation], seed: int) -> None:
+        super().__init__(relations)
+        self.seed = seed
 
 
 class SearchSpace:
-    """A handle to interact with the search space for a knowledge base."""
+    """
+    A handle to interact with the search space for a knowledge base.
+
+    Every generated relation chain is seeded from a sequence of seeds. If the search
+    space is seeded, the same sequence of seeds is drawn every time, otherwise it is
+    drawn from the global random state. The random and exhaustive strategies then
+    generate the same relation chains in the same order, while the relation chains of
+    the online strategies also depend on the outcomes that were observed.
+
+    The exhaustive strategy instead enumerates every relation chain in lexicographic
+    order of the registered relations, and the seed of a relation chain is its position
+    in that enumeration. Relation chains that are equivalent to another relation chain,
+    given the idempotent and commuting transformations declared in the knowledge base,
+    are skipped. Of all relation chains that only differ by the order of adjacent
+    commuting transformations, only the first in lexicographic order is kept, and a
+    relation chain is skipped if an idempotent transformation is applied twice with only
+    commuting transformations in between, since it is equivalent to a shorter relation
+    chain. Both conditions only depend on a prefix of the relation chain, so the
+    enumeration skips over every relation chain sharing a pruned prefix at once and
+    only keeps the current relation chain in memory. A shorter relation chain is
+    already covered as the prefix of a longer one, unless every way of extending it is
+    skipped, in which case it is generated on its own with the seed of its position
+    when padded with the first relation.
+
+    The dynamic strategy generates relation chains online from the outcomes of previous
+    relation chains, which are fed back with `observe`. Each relation is chosen based on
+    the relation before it, using Thompson sampling over the failure rate of every
+    transition between two relations. The failures of a transition are modeled as a
+    Poisson process over the time spent executing it, so relations that fail
+    invariants more often per second of execution are chosen more often, while
+    transitions with few observations are still explored.
+
+    The coverage strategy also generates relation chains online, from a corpus of
+    relation chains that reached lines of the SUT that were never reached before. Each
+    relation chain in the corpus is truncated after its last link that reached new
+    coverage. New relation chains usually extend a relation chain from the corpus with
+    uniformly sampled relations, or replace one of its relations if it is already long
+    enough, and are otherwise sampled uniformly.
+    """
 
     def __init__(
         self,
         knowledge_base: KnowledgeBase,
         strategy: SearchStrategy = SearchStrategy.RANDOM,
         chain_length: int = 10,
+        seed: int | str | None = None,
     ):
         self._knowledge_base = knowledge_base
         self._strategy = strategy
         self._chain_length = chain_length
+        self._random = random.Random(
+            random.getrandbits(_CHAIN_SEED_BITS) if seed is None else seed
+        )
+        # The number of failed invariants and the total duration of each transition,
+        # keyed by the names of the previous relation (if any) and the next relation.
+        self._transition_failures: Counter[tuple[str | None, str]] = Counter()
+        self._transition_durations: defaultdict[tuple[str | None, str], float] = (
+            defaultdict(float)
+        )
+        self._num_observed_links = 0
+        self._observed_duration = 0.0
+        self._corpus: list[list[str]] = []
 
-    def generate_chains(self, num_chains: int) -> list[list[Relation]]:
-        """Generate metamorphic chains based on search strategy."""
+    def iter_chains(
+        self, num_chains: int | None = None, start: int = 0
+    ) -> Iterator[RelationChain]:
+        """
+        Lazily generate metamorphic chains based on search strategy.
+
+        If the number of chains is not specified, chains are generated until the caller
+        stops iterating. This allows chains to be generated on demand, such as when
+        execution is bounded by a time budget instead of a number of chains.
+
+        For the exhaustive strategy, the enumeration starts at the provided position,
+        so it can be resumed from the seed of the last generated relation chain plus
+        one.
+        """
         match self._strategy:
             case SearchStrategy.RANDOM:
-                orderings = [
-                    random.choices(self._knowledge_base.relations, k=self._chain_length)
-                    for _ in range(num_chains)
-                ]
+                num_generated = 0
+                while num_chains is None or num_generated < num_chains:
+                    seed = self._random.getrandbits(_CHAIN_SEED_BITS)
+                    yield RelationChain(
+                        random.Random(seed).choices(
+                            self._knowledge_base.relations, k=self._chain_length
+                        ),
+                        seed=seed,
+                    )
+                    num_generated += 1
             case SearchStrategy.EXHAUSTIVE:
-                raise NotImplementedError
+                yield from itertools.islice(
+                    self._iter_exhaustive_chains(start), num_chains
+                )
             case SearchStrategy.DYNAMIC:
-                raise NotImplementedError
+                num_generated = 0
+                while num_chains is None or num_generated < num_chains:
+                    seed = self._random.getrandbits(_CHAIN_SEED_BITS)
+                    yield RelationChain(
+                        self._sample_dynamic_chain(random.Random(seed)), seed=seed
+                    )
+                    num_generated += 1
+            case SearchStrategy.COVERAGE:
+                num_generated = 0
+                while num_chains is None or num_generated < num_chains:
+                    seed = self._random.getrandbits(_CHAIN_SEED_BITS)
+                    yield RelationChain(
+                        self._sample_coverage_chain(random.Random(seed)), seed=seed
+                    )
+                    num_generated += 1
+
+    def observe(self, outcomes: Iterable["LinkOutcome"]) -> None:
+        """
+        Record the outcomes of an executed relation chain.
+
+        The outcomes of the links of a relation chain must be provided in order, they
+        are used by the dynamic and coverage strategies to generate the next relation
+        chains.
+        """
+        outcomes = list(outcomes)
+        previous: str | None = None
+        for outcome in outcomes:
+            transition = (previous, outcome.relation)
+            self._transition_failures[transition] += len(outcome.failed_invariants)
+            self._transition_durations[transition] += outcome.duration
+            self._num_observed_links += 1
+            self._observed_duration += outcome.duration
+            previous = outcome.relation
+
+        num_covering_links = max(
+            (
+                link_index + 1
+                for link_index, outcome in enumerate(outcomes)
+                if outcome.new_coverage > 0
+            ),
+            default=0,
+        )
+        if num_covering_links > 0:
+            self._corpus.append(
+                [outcome.relation for outcome in outcomes[:num_covering_links]]
+            )
+
+    def _sample_dynamic_chain(self, rng: random.Random) -> list[Relation]:
+        """Sample a relation chain from the failure rates of observed transitions."""
+        relations = self._knowledge_base.relations
+        # The prior duration of a transition is the average duration of a link, so
+        # that the prior failure rate is on the same scale as the observed ones.
+        prior_duration = (
+            self._observed_duration / self._num_observed_links
+            if self._observed_duration > 0
+            else 1.0
+        )
+        relation_chain: list[Relation] = []
+        previous: str | None = None
+        for _ in range(self._chain_length):
+            failure_rates = [
+                rng.gammavariate(
+                    _PRIOR_FAILURES + self._transition_failures[transition],
+                    1
+                    / (prior_duration + self._transition_durations.get(transition, 0.0)),
+                )
+                for transition in (
+                    (previous, relation.transformation_name) for relation in relations
+                )
+            ]
+            relation = relations[failure_rates.index(max(failure_rates))]
+            relation_chain.append(relation)
+            previous = relation.transformation_name
+        return relation_chain
 
-        return orderings
+    def _iter_exhaustive_chains(self, start: int) -> Iterator[RelationChain]:
+        """Enumerate every relation chain that is not equivalent to a previous one."""
+        relations = self._knowledge_base.relations
+        names = [relation.transformation_name for relation in relations]
+        idempotent = [self._knowledge_base.is_idempotent(name) for name in names]
+        commute = [
+            [self._knowledge_base.commute(name, other) for other in names]
+            for name in names
+        ]
+        num_relations = len(relations)
+        if num_relations == 0 or start >= num_relations**self._chain_length:
+            return
+
+        def is_pruned(indices: list[int], link: int) -> bool:
+            # Walk back over the transformations that commute with the one at the link,
+            # which could all be swapped with it.
+            current = indices[link]
+            for previous in reversed(indices[:link]):
+                if previous == current:
+                    return idempotent[current]
+                if not commute[current][previous]:
+                    return False
+                if previous > current:
+                    return True
+            return False
+
+        def position(indices: list[int]) -> int:
+            # Missing links of a shorter relation chain count as the first relation.
+            return sum(
+                index * num_relations ** (self._chain_length - link - 1)
+                for link, index in enumerate(indices)
+            )
+
+        indices = [
+            start // num_relations ** (self._chain_length - link - 1) % num_relations
+            for link in range(self._chain_length)
+        ]
+        # Whether the prefix before each link can be extended by any relation.
+        extended = [False] * self._chain_length
+        link = 0
+        while True:
+            while link < self._chain_length and not is_pruned(indices, link):
+                extended[link] = True
+                link += 1
+            if link == self._chain_length:
+                yield RelationChain(
+                    (relations[index] for index in indices), seed=position(indices)
+                )
+                link -= 1
+            # Advance to the next prefix, skipping every relation chain that shares the
+            # pruned prefix.
+            while link >= 0 and indices[link] == num_relations - 1:
+                # A prefix that cannot be extended without being pruned is not part of
+                # any other relation chain, so it is generated on its own. Its position
+                # is only reached by the enumeration if it starts before the prefix.
+                if link > 0 and not extended[link] and position(indices[:link]) >= start:
+                    yield RelationChain(
+                        (relations[index] for index in indices[:link]),
+                        seed=position(indices[:link]),
+                    )
+                link -= 1
+            if link < 0:
+                return
+            indices[link] += 1
+            indices[link + 1 :] = [0] * (self._chain_length - link - 1)
+            extended[link + 1 :] = [False] * (self._chain_length - link - 1)
+
+    def _sample_coverage_chain(self, rng: random.Random) -> list[Relation]:
+        """Sample a relation chain derived from the corpus of covering chains."""
+        relations = self._knowledge_base.relations
+        if len(self._corpus) == 0 or rng.random() >= _CORPUS_PROBABILITY:
+            return rng.choices(relations, k=self._chain_length)
+
+        relations_by_name = {
+            relation.transformation_name: relation for relation in relations
+        }
+        relation_chain = [
+            relations_by_name[name] for name in rng.choice(self._corpus)
+        ][: self._chain_length]
+        if len(relation_chain) < self._chain_length:
+            return relation_chain + rng.choices(
+                relations, k=self._chain_length - len(relation_chain)
+            )
+        relation_chain[rng.randrange(self._chain_length)] = rng.choice(relations)
+        return relation_chain
+
+    def generate_chains(self, num_chains: int) -> list[RelationChain]:
+        """Generate metamorphic chains based on search strategy."""
+        return list(self.iter_chains(num_chains=num_chains))
@@ -1,11 +1,16 @@
 import ast
+import random
+from collections import Counter
 
 from chrysalis._internal import _invariants as invariants
+from chrysalis._internal._engine import LinkOutcome
 from chrysalis._internal._relation import KnowledgeBase
-from chrysalis._internal._search import SearchSpace
+from chrysalis._internal._search import RelationChain, SearchSpace, SearchStrategy
 from chrysalis._internal.conftest import (
+    divide_constant_by_2,
     identity,
     inverse,
+    multiply_constant_by_2,
 )
 
 
@@ -31,3 +36,270 @@ def test_metamorphic_search_random() -> None:
         )
         for relation_chain in relation_chains
     )
+
+
+def test_metamorphic_search_random_lazy() -> None:
+    knowledge_base = KnowledgeBase[ast.Expression, float]()
+    knowledge_base.register(
+        transformation=identity,
+        invariant=invariants.equals,
+    )
+
+    search_space = SearchSpace(knowledge_base=knowledge_base, chain_length=3)
+    relation_chains = search_space.iter_chains()
+    for _ in range(100):
+        assert [relation.transformation_name for relation in next(relation_chains)] == [
+            "identity"
+        ] * 3
+    assert len(list(search_space.iter_chains(num_chains=4))) == 4
+
+
+def test_metamorphic_search_seeded() -> None:
+    knowledge_base = KnowledgeBase[ast.Expression, float]()
+    knowledge_base.register(
+        transformation=identity,
+        invariant=invariants.equals,
+    )
+    knowledge_base.register(
+        transformation=inverse,
+        invariant=invariants.not_equals,
+    )
+
+    relation_chains = SearchSpace(
+        knowledge_base=knowledge_base, seed="run"
+    ).generate_chains(5)
+    assert relation_chains == SearchSpace(
+        knowledge_base=knowledge_base, seed="run"
+    ).generate_chains(5)
+    assert len({relation_chain.seed for relation_chain in relation_chains}) == 5
+    # Each relation chain can be generated again from its seed alone.
+    assert all(
+        relation_chain
+        == random.Random(relation_chain.seed).choices(knowledge_base.relations, k=10)
+        for relation_chain in relation_chains
+    )
+
+
+def test_metamorphic_search_exhaustive() -> None:
+    knowledge_base = KnowledgeBase[ast.Expression, float]()
+    knowledge_base.register(
+        transformation=identity,
+        invariant=invariants.equals,
+    )
+    knowledge_base.register(
+        transformation=inverse,
+        invariant=invariants.not_equals,
+    )
+
+    search_space = SearchSpace(
+        knowledge_base=knowledge_base,
+        strategy=SearchStrategy.EXHAUSTIVE,
+        chain_length=3,
+    )
+    relation_chains = search_space.generate_chains(10)
+    assert len(relation_chains) == 8
+    assert [relation_chain.seed for relation_chain in relation_chains] == list(range(8))
+    assert [
+        [relation.transformation_name for relation in relation_chain]
+        for relation_chain in relation_chains[5:]
+    ] == [
+        ["inverse", "identity", "inverse"],
+        ["inverse", "inverse", "identity"],
+        ["inverse", "inverse", "inverse"],
+    ]
+    # The enumeration can be resumed after any relation chain.
+    assert search_space.generate_chains(3) == relation_chains[:3]
+    assert list(search_space.iter_chains(start=relation_chains[3].seed + 1)) == (
+        relation_chains[4:]
+    )
+
+
+def test_metamorphic_search_exhaustive_pruned() -> None:
+    knowledge_base = KnowledgeBase[ast.Expression, float]()
+    knowledge_base.register(
+        transformation=identity,
+        invariant=invariants.equals,
+        idempotent=True,
+        commutes_with=[multiply_constant_by_2],
+    )
+    knowledge_base.register(
+        transformation=multiply_constant_by_2,
+        invariant=invariants.not_equals,
+        commutes_with=[divide_constant_by_2],
+    )
+    knowledge_base.register(
+        transformation=divide_constant_by_2,
+        invariant=invariants.not_equals,
+    )
+
+    def names(chain_length: int, start: int = 0) -> list[tuple[str, ...]]:
+        return [
+            tuple(relation.transformation_name for relation in relation_chain)
+            for relation_chain in SearchSpace(
+                knowledge_base=knowledge_base,
+                strategy=SearchStrategy.EXHAUSTIVE,
+                chain_length=chain_length,
+            ).iter_chains(start=start)
+        ]
+
+    assert names(2) == [
+        ("identity", "multiply_constant_by_2"),
+        ("identity", "divide_constant_by_2"),
+        ("multiply_constant_by_2", "multiply_constant_by_2"),
+        ("multiply_constant_by_2", "divide_constant_by_2"),
+        ("divide_constant_by_2", "identity"),
+        ("divide_constant_by_2", "divide_constant_by_2"),
+    ]
+    # Resuming in the middle of a pruned prefix skips to the next kept relation chain.
+    assert names(2, start=1) == names(2)
+    assert names(2, start=5) == names(2)[3:]
+
+    chains = names(4)
+    assert len(chains) == len(set(chains))
+    # An idempotent transformation is never applied twice with only commuting
+    # transformations in between.
+    assert (
+        "identity",
+        "multiply_constant_by_2",
+        "identity",
+        "divide_constant_by_2",
+    ) not in chains
+    assert (
+        "divide_constant_by_2",
+        "identity",
+        "multiply_constant_by_2",
+        "identity",
+    ) not in chains
+
+
+
+def test_metamorphic_search_exhaustive_pruned_prefix() -> None:
+    knowledge_base = KnowledgeBase[ast.Expression, float]()
+    knowledge_base.register(
+        transformation=identity,
+        invariant=invariants.equals,
+        idempotent=True,
+    )
+
+    def chains(chain_length: int, start: int = 0) -> list[tuple[tuple[str, ...], int]]:
+        return [
+            (
+                tuple(relation.transformation_name for relation in relation_chain),
+                relation_chain.seed,
+            )
+            for relation_chain in SearchSpace(
+                knowledge_base=knowledge_base,
+                strategy=SearchStrategy.EXHAUSTIVE,
+                chain_length=chain_length,
+            ).iter_chains(start=start)
+        ]
+
+    # Every extension of the prefix is pruned, so the prefix is generated on its own.
+    assert chains(2) == [(("identity",), 0)]
+    assert chains(2, start=1) == []
+
+    knowledge_base.register(
+        transformation=multiply_constant_by_2,
+        invariant=invariants.not_equals,
+        idempotent=True,
+        commutes_with=[identity],
+    )
+    assert chains(3) == [
+        (("identity", "multiply_constant_by_2"), 2),
+        (("multiply_constant_by_2",), 4),
+    ]
+    assert chains(3, start=4) == [(("multiply_constant_by_2",), 4)]
+
+
+def test_metamorphic_search_dynamic() -> None:
+    knowledge_base = KnowledgeBase[ast.Expression, float]()
+    knowledge_base.register(
+        transformation=identity,
+        invariant=invariants.equals,
+    )
+    knowledge_base.register(
+        transformation=inverse,
+        invariant=invariants.not_equals,
+    )
+
+    def count_relations(relation_chains: list[RelationChain]) -> Counter[str]:
+        return Counter(
+            relation.transformation_name
+            for relation_chain in relation_chains
+            for relation in relation_chain
+        )
+
+    search_space = SearchSpace(
+        knowledge_base=knowledge_base,
+        strategy=SearchStrategy.DYNAMIC,
+        chain_length=4,
+        seed=0,
+    )
+    relation_chains = search_space.generate_chains(5)
+    assert len(relation_chains) == 5
+    assert relation_chains == SearchSpace(
+        knowledge_base=knowledge_base,
+        strategy=SearchStrategy.DYNAMIC,
+        chain_length=4,
+        seed=0,
+    ).generate_chains(5)
+
+    # Only the inverse transformation fails, so it is chosen far more often once its
+    # outcomes have been observed.
+    for _ in range(20):
+        for relation_chain in search_space.generate_chains(5):
+            search_space.observe(
+                LinkOutcome(
+                    relation=relation.transformation_name,
+                    link_index=link_index,
+                    failed_invariants=(
+                        ["not_equals"]
+                        if relation.transformation_name == "inverse"
+                        else []
+                    ),
+                    duration=0.01,
+                    new_coverage=0,
+                )
+                for link_index, relation in enumerate(relation_chain)
+            )
+    relation_counts = count_relations(search_space.generate_chains(50))
+    assert relation_counts["inverse"] > 9 * relation_counts["identity"]
+
+
+def test_metamorphic_search_coverage() -> None:
+    knowledge_base = KnowledgeBase[ast.Expression, float]()
+    for transformation in (identity, inverse, multiply_constant_by_2):
+        knowledge_base.register(
+            transformation=transformation,
+            invariant=invariants.equals,
+        )
+
+    search_space = SearchSpace(
+        knowledge_base=knowledge_base,
+        strategy=SearchStrategy.COVERAGE,
+        chain_length=4,
+        seed=0,
+    )
+    search_space.observe(
+        LinkOutcome(
+            relation=name,
+            link_index=link_index,
+            failed_invariants=[],
+            duration=0.01,
+            new_coverage=new_coverage,
+        )
+        for link_index, (name, new_coverage) in enumerate(
+            [("inverse", 0), ("inverse", 3), ("identity", 0), ("identity", 0)]
+        )
+    )
+
+    # Most relation chains are derived from the only relation chain in the corpus,
+    # which is truncated after its last link that reached new coverage.
+    relation_chains = search_space.generate_chains(50)
+    assert all(len(relation_chain) == 4 for relation_chain in relation_chains)
+    num_derived = sum(
+        [relation.transformation_name for relation in relation_chain[:2]]
+        == ["inverse", "inverse"]
+        for relation_chain in relation_chains
+    )
+    assert num_derived >= 30
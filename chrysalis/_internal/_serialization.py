@@ -0,0 +1,102 @@
+"""
+Compact serialization of input data.
+
+Input data objects are pickled with protocol 5 so that large contiguous buffers (such as
+NumPy arrays or bytearrays) are handed over out-of-band instead of being copied into the
+pickle stream. The pickle stream and the buffers are then hashed and compressed directly
+from memory, so a large payload is only copied once, into the compressed blob.
+
+The content hash of a serialized object identifies it within the results database,
+which allows duplicate input data to be stored once. The same content hash identifies
+input data everywhere else, such as in the keys of cached computations, so an input
+that was already hashed never needs to be hashed again.
+"""
+
+import functools
+import hashlib
+import pickle
+import struct
+import zlib
+from typing import Any
+
+_DIGEST_SIZE = 16
+"""The number of bytes in the content hash of a serialized object."""
+
+_COMPRESSION_LEVEL = 1
+"""The zlib compression level, which favours throughput over the compression ratio."""
+
+_NUM_SEGMENTS_FORMAT = "<I"
+_NUM_SEGMENTS_SIZE = struct.calcsize(_NUM_SEGMENTS_FORMAT)
+
+
+class SerializedObject:
+    """
+    An object pickled with out-of-band buffers.
+
+    The first segment of a serialized object is the pickle stream and every following
+    segment is an out-of-band buffer. A header holding the length of every segment is
+    prepended so that the segments can be split again once decompressed.
+    """
+
+    def __init__(self, obj: object) -> None:
+        buffers: list[memoryview] = []
+
+        def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+            try:
+                buffers.append(buffer.raw())
+            except BufferError:
+                # Non-contiguous buffers cannot be referenced directly, so they are
+                # serialized in-band instead.
+                return True
+            return False
+
+        stream = pickle.dumps(obj, protocol=5, buffer_callback=buffer_callback)
+        self._segments: list[bytes | memoryview] = [stream, *buffers]
+        self._header = struct.pack(
+            f"{_NUM_SEGMENTS_FORMAT}{len(self._segments)}Q",
+            len(self._segments),
+            *(memoryview(segment).nbytes for segment in self._segments),
+        )
+
+    @functools.cached_property
+    def digest(self) -> bytes:
+        """Return the content hash of the serialized object."""
+        hasher = hashlib.blake2b(self._header, digest_size=_DIGEST_SIZE)
+        for segment in self._segments:
+            hasher.update(segment)
+        return hasher.digest()
+
+    def compress(self) -> bytes:
+        """Return the compressed header and segments of the serialized object."""
+        compressor = zlib.compressobj(_COMPRESSION_LEVEL)
+        chunks = [compressor.compress(self._header)]
+        chunks.extend(compressor.compress(segment) for segment in self._segments)
+        chunks.append(compressor.flush())
+        return b"".join(chunks)
+
+
+def decompress(blob: bytes) -> Any:
+    """Reconstruct an object from the blob returned by `SerializedObject.compress`."""
+    data = zlib.decompress(blob)
+    (num_segments,) = struct.unpack_from(_NUM_SEGMENTS_FORMAT, data)
+    lengths_format = f"<{num_segments}Q"
+    lengths = struct.unpack_from(lengths_format, data, _NUM_SEGMENTS_SIZE)
+    # Out-of-band buffers are shared with the reconstructed object, so they must be
+    # writable for objects such as NumPy arrays to be writable.
+    view = memoryview(bytearray(data) if num_segments > 1 else data)
+    offset = _NUM_SEGMENTS_SIZE + struct.calcsize(lengths_format)
+    segments: list[memoryview] = []
+    for length in lengths:
+        segments.append(view[offset : offset + length])
+        offset += length
+    return pickle.loads(segments[0], buffers=segments[1:])
+
+
+def blob_to_pickle(blob: bytes) -> bytes:
+    """Convert a compressed blob into a plain pickle of the same object."""
+    return pickle.dumps(decompress(blob))
+
+
+def content_hash(obj: object) -> bytes:
+    """Return the content hash of an object, the digest of its serialized form."""
+    return SerializedObject(obj).digest
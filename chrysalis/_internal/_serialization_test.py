@@ -0,0 +1,59 @@
+import ast
+import pickle
+
+import pytest
+
+from chrysalis._internal._serialization import (
+    SerializedObject,
+    blob_to_pickle,
+    content_hash,
+    decompress,
+)
+
+
+def test_round_trip() -> None:
+    expr = ast.parse("1 + 2", mode="eval")
+    serialized = SerializedObject(expr)
+    assert ast.unparse(decompress(serialized.compress())) == ast.unparse(expr)
+
+
+def test_digest_identifies_content() -> None:
+    assert SerializedObject([1, 2]).digest == SerializedObject([1, 2]).digest
+    assert SerializedObject([1, 2]).digest != SerializedObject([2, 1]).digest
+
+
+def test_content_hash() -> None:
+    assert content_hash(ast.dump(ast.parse("1 + 2"))) == content_hash(
+        ast.dump(ast.parse("1 + 2"))
+    )
+    assert content_hash([1, 2]) != content_hash([2, 1])
+    # Cache keys and blob keys share a single hashing scheme.
+    assert content_hash([1, 2]) == SerializedObject([1, 2]).digest
+
+
+def test_out_of_band_buffers() -> None:
+    payload = bytearray(range(256)) * 1024
+    serialized = SerializedObject({"payload": payload})
+    blob = serialized.compress()
+
+    assert len(blob) < len(payload)
+    restored = decompress(blob)
+    assert restored == {"payload": payload}
+    # Out-of-band buffers remain writable once restored.
+    restored["payload"][0] = 1
+
+
+def test_numpy_round_trip() -> None:
+    np = pytest.importorskip("numpy")
+
+    array = np.arange(1024, dtype=np.float64).reshape(32, 32)
+    restored = decompress(SerializedObject(array).compress())
+    np.testing.assert_array_equal(restored, array)
+    # Non-contiguous arrays are serialized in-band.
+    restored = decompress(SerializedObject(array[:, ::2]).compress())
+    np.testing.assert_array_equal(restored, array[:, ::2])
+
+
+def test_blob_to_pickle() -> None:
+    blob = SerializedObject([1, 2, 3]).compress()
+    assert pickle.loads(blob_to_pickle(blob)) == [1, 2, 3]
@@ -0,0 +1,259 @@
+"""
+Shrinking of failed relation chains.
+
+A failed invariant only records the link of the relation chain at which it failed, but
+most of the links before it are usually irrelevant to the failure. The relation chain
+leading up to a failed invariant is shrunk with delta debugging, which repeatedly tries
+to drop chunks of links while the shrunk relation chain still fails the same invariant,
+and is truncated after the first link that fails the invariant. The input the invariant
+failed on is then shrunk in the same way, either by dropping elements of a sequence or
+with a user provided function that returns smaller candidates of an input. Shrinking
+alternates between the relation chain and the input until neither can be shrunk any
+further.
+
+Every attempt replays its relation chain from scratch, so the results of the SUT are
+cached by the content hash of their input, and an input reached by several attempts is
+only passed to the SUT once.
+"""
+
+import copy
+import math
+import sqlite3
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any, NamedTuple
+
+import duckdb
+
+from chrysalis._internal._engine import _failed_invariant_indices
+from chrysalis._internal._relation import Relation
+from chrysalis._internal._replay import (
+    _SELECT_CHAIN_LINKS,
+    _SELECT_FAILED_INVARIANT,
+    _SELECT_INPUT_DATA,
+    _call_sut,
+    _get_relation,
+)
+from chrysalis._internal._serialization import content_hash, decompress
+from chrysalis._internal._sut import SystemUnderTest, is_batched
+
+
+class Shrink(NamedTuple):
+    """The shortest relation chain and input found that fail the same invariant."""
+
+    invariant: str
+    transformations: list[str]
+    input_obj: Any
+    num_sut_calls: int
+
+
+def _ddmin[V](
+    values: list[V], reduce: Callable[[list[V]], list[V] | None]
+) -> list[V]:
+    """
+    Shrink a list with delta debugging.
+
+    The reduction returns the (possibly further reduced) candidate if it still fails,
+    or `None` otherwise. The list is split into chunks of decreasing size, and each
+    chunk or its complement replaces the list as soon as it still fails.
+    """
+    num_chunks = 2
+    while len(values) >= 2:
+        chunk_size = math.ceil(len(values) / num_chunks)
+        chunks = [
+            values[i : i + chunk_size] for i in range(0, len(values), chunk_size)
+        ]
+        candidates = [
+            *chunks,
+            *(
+                [value for chunk in chunks[:i] + chunks[i + 1 :] for value in chunk]
+                for i in range(len(chunks))
+            ),
+        ]
+        for i, candidate in enumerate(candidates):
+            reduced = reduce(candidate)
+            if reduced is not None:
+                values = reduced
+                # A failing chunk restarts from two chunks, while a failing complement
+                # keeps the granularity of its chunks.
+                num_chunks = 2 if i < len(chunks) else max(num_chunks - 1, 2)
+                break
+        else:
+            if num_chunks >= len(values):
+                break
+            num_chunks = min(2 * num_chunks, len(values))
+    return values
+
+
+def _to_elements(input_obj: Any) -> list | None:
+    """Return the elements of an input that can be shrunk as a sequence."""
+    # Subclasses, such as named tuples, cannot necessarily be built from elements.
+    if type(input_obj) in {str, bytes, list, tuple}:
+        return list(input_obj)
+    return None
+
+
+def _from_elements(input_obj: Any, elements: list) -> Any:
+    """Build an input of the same type as another input from a list of elements."""
+    if type(input_obj) is str:
+        return "".join(elements)
+    if type(input_obj) is bytes:
+        return bytes(elements)
+    return type(input_obj)(elements)
+
+
+class _Shrinker:
+    """Check whether relation chains fail an invariant, caching results of the SUT."""
+
+    def __init__(
+        self,
+        invariant: str,
+        sut: SystemUnderTest,
+        batched: bool,
+    ) -> None:
+        self._invariant = invariant
+        self._sut = sut
+        self._batched = batched
+        self._results: dict[bytes, Any] = {}
+        self.num_sut_calls = 0
+
+    def _call_sut(self, input_obj: Any) -> Any:
+        key = content_hash(input_obj)
+        if key not in self._results:
+            self._results[key] = _call_sut(self._sut, input_obj, self._batched)
+            self.num_sut_calls += 1
+        return self._results[key]
+
+    def num_failing_links(
+        self, relation_chain: list[Relation], input_obj: Any
+    ) -> int | None:
+        """
+        Return the number of links up to the first link that fails the invariant.
+
+        If no link fails the invariant, `None` is returned. An error raised by the SUT
+        or a transformation is a different failure, so the relation chain does not fail
+        the invariant either.
+        """
+        # Transformations may mutate their input in place, which must not affect the
+        # input of later attempts.
+        previous_input = copy.deepcopy(input_obj)
+        try:
+            previous_result = self._call_sut(previous_input)
+            for link_index, relation in enumerate(relation_chain):
+                current_input = relation.apply_transform(previous_input)
+                current_result = self._call_sut(current_input)
+                if any(
+                    invariant.__name__ == self._invariant
+                    and _failed_invariant_indices(
+                        invariant=invariant,
+                        previous_results=[previous_result],
+                        current_results=[current_result],
+                    )
+                    for invariant in relation.invariants
+                ):
+                    return link_index + 1
+                previous_input, previous_result = current_input, current_result
+        except Exception:  # NOQA: BLE001
+            return None
+        return None
+
+    def shrink_chain(
+        self, relation_chain: list[Relation], input_obj: Any
+    ) -> list[Relation]:
+        """Shrink a failing relation chain on an input."""
+
+        def reduce(candidate: list[Relation]) -> list[Relation] | None:
+            num_links = self.num_failing_links(candidate, input_obj)
+            return None if num_links is None else candidate[:num_links]
+
+        return _ddmin(relation_chain, reduce)
+
+    def shrink_input(
+        self,
+        relation_chain: list[Relation],
+        input_obj: Any,
+        shrink_input: Callable[[Any], Iterable[Any]] | None,
+    ) -> Any:
+        """Shrink the input of a failing relation chain."""
+        if shrink_input is not None:
+            # Candidates are tried greedily, starting over from the first candidate
+            # that still fails.
+            is_shrunk = True
+            while is_shrunk:
+                is_shrunk = False
+                for candidate in shrink_input(input_obj):
+                    if self.num_failing_links(relation_chain, candidate) is not None:
+                        input_obj = candidate
+                        is_shrunk = True
+                        break
+            return input_obj
+
+        elements = _to_elements(input_obj)
+        if elements is None:
+            return input_obj
+
+        def reduce(candidate: list) -> list | None:
+            candidate_obj = _from_elements(input_obj, candidate)
+            if self.num_failing_links(relation_chain, candidate_obj) is None:
+                return None
+            return candidate
+
+        return _from_elements(input_obj, _ddmin(elements, reduce))
+
+
+def shrink(
+    conn: sqlite3.Connection | duckdb.DuckDBPyConnection,
+    failed_invariant_id: int,
+    sut: SystemUnderTest,
+    relations: Mapping[str, Relation],
+    batched: bool | None = None,
+    shrink_input: Callable[[Any], Iterable[Any]] | None = None,
+) -> Shrink:
+    """
+    Shrink the relation chain and input of a failed invariant.
+
+    The relation chain up to the failed link is replayed on the original input, and
+    must still fail the same invariant. Inputs that are strings, bytes, lists or tuples
+    are shrunk by dropping elements, any other input is only shrunk if a function
+    returning smaller candidates of an input is provided.
+    """
+    row = conn.execute(_SELECT_FAILED_INVARIANT, (failed_invariant_id,)).fetchone()
+    if row is None:
+        raise ValueError(f"No failed invariant with id {failed_invariant_id} exists.")
+    invariant, applied_transformation, input_data_id = row
+    relation_chain = [
+        _get_relation(relations, name)
+        for name, _, _ in conn.execute(
+            _SELECT_CHAIN_LINKS, (applied_transformation, input_data_id)
+        ).fetchall()
+    ]
+    [(blob,)] = conn.execute(_SELECT_INPUT_DATA, (input_data_id,)).fetchall()
+    input_obj = decompress(blob)
+
+    shrinker = _Shrinker(
+        invariant=invariant,
+        sut=sut,
+        batched=is_batched(sut) if batched is None else batched,
+    )
+    num_links = shrinker.num_failing_links(relation_chain, input_obj)
+    if num_links is None:
+        raise ValueError(
+            f"The failed invariant with id {failed_invariant_id} could not be reproduced."
+        )
+    relation_chain = relation_chain[:num_links]
+
+    while True:
+        relation_chain = shrinker.shrink_chain(relation_chain, input_obj)
+        shrunk_input = shrinker.shrink_input(relation_chain, input_obj, shrink_input)
+        if content_hash(shrunk_input) == content_hash(input_obj):
+            break
+        input_obj = shrunk_input
+        # The shrunk input may fail the invariant at an earlier link.
+        num_links = shrinker.num_failing_links(relation_chain, input_obj)
+        assert num_links is not None
+        relation_chain = relation_chain[:num_links]
+    return Shrink(
+        invariant=invariant,
+        transformations=[relation.transformation_name for relation in relation_chain],
+        input_obj=input_obj,
+        num_sut_calls=shrinker.num_sut_calls,
+    )
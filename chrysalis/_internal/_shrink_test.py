@@ -0,0 +1,137 @@
+import pytest
+
+from chrysalis._internal import _invariants as invariants
+from chrysalis._internal._engine import Engine, TemporaryDuckDBRelationConnection
+from chrysalis._internal._relation import Relation
+from chrysalis._internal._shrink import Shrink, shrink
+from chrysalis._internal._writer import TerminalUIWriter, Verbosity
+
+
+def buggy_max(values: list[int]) -> int:
+    # Long lists and lists containing 7 are handled incorrectly.
+    if len(values) > 5:
+        return min(values)
+    if 7 in values:
+        return 0
+    return max(values)
+
+
+def reverse(values: list[int]) -> list[int]:
+    return values[::-1]
+
+
+def sort(values: list[int]) -> list[int]:
+    return sorted(values)
+
+
+def append_0(values: list[int]) -> list[int]:
+    return [*values, 0]
+
+
+def append_7(values: list[int]) -> list[int]:
+    return [*values, 7]
+
+
+def is_greater_or_equal(curr: int, prev: int) -> bool:
+    return curr >= prev
+
+
+def _shrink_chain(
+    input_obj: list[int], relation_chain: list[Relation[list[int], int]]
+) -> Shrink:
+    called: list[list[int]] = []
+
+    def recorded_buggy_max(values: list[int]) -> int:
+        called.append(values)
+        return buggy_max(values)
+
+    with TemporaryDuckDBRelationConnection() as (temp_conn, db_path):
+        engine = Engine(
+            sut=buggy_max,
+            sqlite_conn=temp_conn,
+            input_data=[input_obj],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+        )
+        engine.execute([relation_chain])
+        ((failed_invariant_id,),) = temp_conn.execute(
+            "SELECT id FROM failed_invariant;"
+        ).fetchall()
+        result = shrink(
+            conn=temp_conn,
+            failed_invariant_id=failed_invariant_id,
+            sut=recorded_buggy_max,
+            relations={
+                relation.transformation_name: relation for relation in relation_chain
+            },
+        )
+
+    # Results are cached, so the SUT is called at most once per distinct input.
+    assert result.num_sut_calls == len(called)
+    assert len({tuple(values) for values in called}) == len(called)
+    return result
+
+
+@pytest.fixture
+def relations() -> dict[str, Relation[list[int], int]]:
+    relations: dict[str, Relation[list[int], int]] = {}
+    for transformation in (reverse, sort, append_0):
+        relations[transformation.__name__] = Relation(transformation=transformation)
+        relations[transformation.__name__].add_invariant(invariants.equals)
+    relations["append_7"] = Relation(transformation=append_7)
+    relations["append_7"].add_invariant(is_greater_or_equal)
+    return relations
+
+
+def test_shrink_chain(relations: dict[str, Relation[list[int], int]]) -> None:
+    result = _shrink_chain(
+        [3, 1, 2],
+        [
+            relations[name]
+            for name in (
+                "reverse",
+                "append_0",
+                "sort",
+                "append_0",
+                "reverse",
+                "append_0",
+                "sort",
+            )
+        ],
+    )
+
+    assert result.invariant == "equals"
+    assert result.transformations == ["append_0"] * 3
+    # No element of the input can be dropped, since the input must stay long enough.
+    assert result.input_obj == [3, 1, 2]
+
+
+def test_shrink_input(relations: dict[str, Relation[list[int], int]]) -> None:
+    result = _shrink_chain(
+        [5, 1, 4, 2],
+        [relations[name] for name in ("reverse", "sort", "append_7", "reverse")],
+    )
+
+    assert result.invariant == "is_greater_or_equal"
+    assert result.transformations == ["append_7"]
+    assert result.input_obj == [5]
+
+
+def test_shrink_missing(relations: dict[str, Relation[list[int], int]]) -> None:
+    with TemporaryDuckDBRelationConnection() as (temp_conn, db_path):
+        Engine(
+            sut=buggy_max,
+            sqlite_conn=temp_conn,
+            input_data=[[1]],
+            sqlite_db=db_path,
+            writer=TerminalUIWriter(verbosity=Verbosity.SILENT),
+            num_processes=1,
+        )
+        with pytest.raises(ValueError, match="No failed invariant"):
+            shrink(
+                conn=temp_conn,
+                failed_invariant_id=1,
+                sut=buggy_max,
+                relations=relations,
+            )
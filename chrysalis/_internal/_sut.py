@@ -0,0 +1,66 @@
+"""
+Helpers describing how a system under test (SUT) should be called.
+
+By default, a SUT is a callable that accepts a single input object and returns a single
+result. Some SUTs are much faster when called on many inputs at once (such as vectorized
+models), so a SUT can be marked as batched so that the engine calls it with a list of
+inputs instead. Either form of SUT can also be a coroutine function.
+"""
+
+from collections.abc import Awaitable, Callable
+from typing import overload
+
+_BATCHED_ATTRIBUTE = "__chrysalis_batched__"
+_BATCH_SIZE_ATTRIBUTE = "__chrysalis_batch_size__"
+
+type SystemUnderTest[T, R] = (
+    Callable[[T], R]
+    | Callable[[list[T]], list[R]]
+    | Callable[[T], Awaitable[R]]
+    | Callable[[list[T]], Awaitable[list[R]]]
+)
+
+
+@overload
+def batched[F: Callable](sut: F) -> F: ...
+
+
+@overload
+def batched[F: Callable](
+    sut: None = None, *, batch_size: int | None = None
+) -> Callable[[F], F]: ...
+
+
+def batched[F: Callable](
+    sut: F | None = None,
+    *,
+    batch_size: int | None = None,
+) -> F | Callable[[F], F]:
+    """
+    Mark a SUT as accepting a list of inputs and returning a list of results.
+
+    The decorator can be used with or without arguments. If a batch size is specified,
+    the engine splits the inputs into chunks of at most `batch_size` inputs before
+    calling the SUT, otherwise every input of a relation chain link is passed at once.
+    """
+    if batch_size is not None and batch_size < 1:
+        raise ValueError("The batch size of a SUT must be at least 1.")
+
+    def decorator(func: F) -> F:
+        setattr(func, _BATCHED_ATTRIBUTE, True)
+        setattr(func, _BATCH_SIZE_ATTRIBUTE, batch_size)
+        return func
+
+    if sut is None:
+        return decorator
+    return decorator(sut)
+
+
+def is_batched(sut: Callable) -> bool:
+    """Return whether a SUT has been marked as batched."""
+    return getattr(sut, _BATCHED_ATTRIBUTE, False)
+
+
+def get_batch_size(sut: Callable) -> int | None:
+    """Return the batch size a batched SUT was marked with, if any."""
+    return getattr(sut, _BATCH_SIZE_ATTRIBUTE, None)
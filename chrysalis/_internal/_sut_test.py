@@ -0,0 +1,34 @@
+import pytest
+
+from chrysalis._internal._sut import batched, get_batch_size, is_batched
+
+
+def _double(x: int) -> int:
+    return 2 * x
+
+
+@batched
+def _double_batch(xs: list[int]) -> list[int]:
+    return [2 * x for x in xs]
+
+
+@batched(batch_size=4)
+def _double_chunk(xs: list[int]) -> list[int]:
+    return [2 * x for x in xs]
+
+
+def test_batched_decorator() -> None:
+    assert not is_batched(_double)
+    assert get_batch_size(_double) is None
+
+    assert is_batched(_double_batch)
+    assert get_batch_size(_double_batch) is None
+    assert _double_batch([1, 2]) == [2, 4]
+
+    assert is_batched(_double_chunk)
+    assert get_batch_size(_double_chunk) == 4
+
+
+def test_batched_decorator_invalid_batch_size() -> None:
+    with pytest.raises(ValueError, match="The batch size of a SUT must be at least 1."):
+        batched(batch_size=0)
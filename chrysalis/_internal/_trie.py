@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+from chrysalis._internal._relation import Relation
+
+
+class ChainTrieNode:
+    """
+    A single relation within a trie of relation chains.
+
+    Each node represents the prefix of every relation chain that passes through it. The
+    root node of a trie does not hold a relation and represents the unmodified input
+    data.
+    """
+
+    def __init__(self, relation: Relation | None, link_index: int) -> None:
+        self.relation = relation
+        self.link_index = link_index
+        self.children: dict[Relation, ChainTrieNode] = {}
+        self.chain_indices: list[int] = []
+        """The indices of the relation chains that end at this node."""
+
+
+class ChainTrie:
+    """
+    A prefix tree of relation chains.
+
+    Relation chains that share leading relations share the same path from the root of
+    the trie. This allows the transformations and SUT calls of a shared prefix to be
+    evaluated once for all of the chains that contain it. Relations are compared by
+    identity, so two relations sharing a transformation but testing different invariants
+    are kept on separate branches.
+    """
+
+    def __init__(self, relation_chains: list[list[Relation]]) -> None:
+        self.root = ChainTrieNode(relation=None, link_index=-1)
+        self.num_chains = len(relation_chains)
+        for chain_index, relation_chain in enumerate(relation_chains):
+            node = self.root
+            for link_index, relation in enumerate(relation_chain):
+                child = node.children.get(relation)
+                if child is None:
+                    child = ChainTrieNode(relation=relation, link_index=link_index)
+                    node.children[relation] = child
+                node = child
+            node.chain_indices.append(chain_index)
+
+    def walk(self) -> Iterator[tuple[ChainTrieNode, ChainTrieNode]]:
+        """
+        Yield each node of the trie along with its parent in depth first order.
+
+        A node is always yielded after its parent, and the children of a node are
+        yielded in the order they were first inserted.
+        """
+        stack = [(self.root, child) for child in reversed(self.root.children.values())]
+        while stack:
+            parent, node = stack.pop()
+            yield parent, node
+            stack.extend((node, child) for child in reversed(node.children.values()))
+
+    @property
+    def num_links(self) -> int:
+        """Return the number of distinct relation chain prefixes in the trie."""
+        return sum(1 for _ in self.walk())
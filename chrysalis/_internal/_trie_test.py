@@ -0,0 +1,51 @@
+from chrysalis._internal._relation import Relation
+from chrysalis._internal._trie import ChainTrie
+
+
+def test_chain_trie_shares_prefixes(
+    correct_relation_chain: list[Relation],
+    incorrect_relation_chain: list[Relation],
+) -> None:
+    trie = ChainTrie([correct_relation_chain, incorrect_relation_chain])
+
+    assert trie.num_chains == 2
+    assert trie.num_links == 4
+    (identity_node,) = trie.root.children.values()
+    (inverse_node,) = identity_node.children.values()
+    assert inverse_node.link_index == 1
+    # Both chains end with `subtract_1_from_expression`, but test different invariants
+    # and thus branch after their shared prefix.
+    assert [
+        (child.relation, child.chain_indices)
+        for child in inverse_node.children.values()
+    ] == [
+        (correct_relation_chain[2], [0]),
+        (incorrect_relation_chain[2], [1]),
+    ]
+
+
+def test_chain_trie_nested_chains(correct_relation_chain: list[Relation]) -> None:
+    trie = ChainTrie([correct_relation_chain, correct_relation_chain[:2]])
+
+    assert trie.num_links == 3
+    (identity_node,) = trie.root.children.values()
+    (inverse_node,) = identity_node.children.values()
+    assert inverse_node.chain_indices == [1]
+    (subtract_node,) = inverse_node.children.values()
+    assert subtract_node.chain_indices == [0]
+
+
+def test_chain_trie_walk(
+    correct_relation_chain: list[Relation],
+    incorrect_relation_chain: list[Relation],
+) -> None:
+    trie = ChainTrie([correct_relation_chain, incorrect_relation_chain])
+
+    assert [
+        (parent.link_index, node.relation) for parent, node in trie.walk()
+    ] == [
+        (-1, correct_relation_chain[0]),
+        (0, correct_relation_chain[1]),
+        (1, correct_relation_chain[2]),
+        (1, incorrect_relation_chain[2]),
+    ]
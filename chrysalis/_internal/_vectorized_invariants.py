@@ -0,0 +1,79 @@
+"""
+A collection of vectorized invariants for numeric SUTs.
+
+Each invariant in this module mirrors an invariant in `chrysalis.invariants`, but
+instead of comparing a single pair of results it compares NumPy arrays of the current
+and previous results of every input in a relation chain link and returns a boolean mask.
+The engine uses the mask to record all of the failures of a link in one pass.
+
+Results with more than one dimension per input (such as vectors returned by a model) are
+supported, an input only passes an invariant if every element of its mask holds.
+
+Custom vectorized invariants can be created by decorating a function with
+`vectorized_invariant`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+    from numpy.typing import NDArray
+
+type VectorizedInvariant = Callable[[NDArray, NDArray], NDArray[np.bool_]]
+"""An invariant comparing arrays of current and previous results."""
+
+_VECTORIZED_ATTRIBUTE = "__chrysalis_vectorized__"
+
+
+def vectorized_invariant[F: Callable](invariant: F) -> F:
+    """Mark an invariant as operating on arrays of results instead of single results."""
+    setattr(invariant, _VECTORIZED_ATTRIBUTE, True)
+    return invariant
+
+
+def is_vectorized(invariant: Callable) -> bool:
+    """Return whether an invariant has been marked as vectorized."""
+    return getattr(invariant, _VECTORIZED_ATTRIBUTE, False)
+
+
+@vectorized_invariant
+def equals(curr: NDArray, prev: NDArray) -> NDArray[np.bool_]:
+    return curr == prev
+
+
+@vectorized_invariant
+def not_equals(curr: NDArray, prev: NDArray) -> NDArray[np.bool_]:
+    return curr != prev
+
+
+@vectorized_invariant
+def is_same_sign(curr: NDArray, prev: NDArray) -> NDArray[np.bool_]:
+    return ((curr >= 0) & (prev >= 0)) | ((curr <= 0) & (prev <= 0))
+
+
+@vectorized_invariant
+def not_same_sign(curr: NDArray, prev: NDArray) -> NDArray[np.bool_]:
+    return ~is_same_sign(curr, prev)
+
+
+@vectorized_invariant
+def greater_than(curr: NDArray, prev: NDArray) -> NDArray[np.bool_]:
+    return curr > prev
+
+
+@vectorized_invariant
+def greater_than_equal(curr: NDArray, prev: NDArray) -> NDArray[np.bool_]:
+    return curr >= prev
+
+
+@vectorized_invariant
+def less_than(curr: NDArray, prev: NDArray) -> NDArray[np.bool_]:
+    return curr < prev
+
+
+@vectorized_invariant
+def less_than_equal(curr: NDArray, prev: NDArray) -> NDArray[np.bool_]:
+    return curr <= prev
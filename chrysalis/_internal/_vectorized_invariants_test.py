@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from chrysalis._internal import _invariants as invariants
+from chrysalis._internal._vectorized_invariants import (
+    is_vectorized,
+    vectorized_invariant,
+)
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+np = pytest.importorskip("numpy")
+
+
+def test_is_vectorized() -> None:
+    assert is_vectorized(invariants.vectorized.equals)
+    assert not is_vectorized(invariants.equals)
+
+    @vectorized_invariant
+    def all_positive(curr: NDArray, prev: NDArray) -> NDArray:
+        return (curr > 0) & (prev > 0)
+
+    assert is_vectorized(all_positive)
+
+
+def test_equals() -> None:
+    assert invariants.vectorized.equals(
+        np.array([4, 3]), np.array([4, 4])
+    ).tolist() == [True, False]
+    assert invariants.vectorized.not_equals(
+        np.array([4, 3]), np.array([4, 4])
+    ).tolist() == [False, True]
+
+
+def test_is_same_sign() -> None:
+    curr = np.array([2, -2, 2, 0, 0])
+    prev = np.array([2, -2, -2, 2, -2])
+    assert invariants.vectorized.is_same_sign(curr, prev).tolist() == [
+        True,
+        True,
+        False,
+        True,
+        True,
+    ]
+    assert invariants.vectorized.not_same_sign(curr, prev).tolist() == [
+        False,
+        False,
+        True,
+        False,
+        False,
+    ]
+
+
+def test_ordering() -> None:
+    curr = np.array([1.0, 2.0, 3.0])
+    prev = np.array([2.0, 2.0, 2.0])
+    assert invariants.vectorized.greater_than(curr, prev).tolist() == [
+        False,
+        False,
+        True,
+    ]
+    assert invariants.vectorized.greater_than_equal(curr, prev).tolist() == [
+        False,
+        True,
+        True,
+    ]
+    assert invariants.vectorized.less_than(curr, prev).tolist() == [
+        True,
+        False,
+        False,
+    ]
+    assert invariants.vectorized.less_than_equal(curr, prev).tolist() == [
+        True,
+        True,
+        False,
+    ]
@@ -0,0 +1,237 @@
+"""
+Supervision of calls to the SUT and to transformations.
+
+A single SUT call or transformation that raises, hangs or crashes the interpreter should
+not abort a metamorphic testing run. The watchdog wraps each call so that exceptions and
+timeouts are returned as a `FailedCall` instead. Calls can optionally be isolated within
+supervised worker processes, which are killed and replaced when a call times out or
+crashes the worker, and recycled after a fixed number of calls.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import threading
+from collections.abc import Callable
+from enum import Enum
+from multiprocessing.connection import Connection
+from multiprocessing.context import ForkServerContext, SpawnContext
+from typing import Any, NamedTuple, Self
+
+# Forking a process that has started threads (such as abandoned calls or a thread pool)
+# can deadlock the child, so workers are started from a single-threaded server instead.
+_MP_CONTEXT: ForkServerContext | SpawnContext
+if "forkserver" in multiprocessing.get_all_start_methods():
+    _MP_CONTEXT = multiprocessing.get_context("forkserver")
+else:
+    _MP_CONTEXT = multiprocessing.get_context("spawn")
+
+
+class CallFailureKind(Enum):
+    """The possible ways a supervised call can fail."""
+
+    EXCEPTION = "exception"
+    TIMEOUT = "timeout"
+    CRASH = "crash"
+
+
+class FailedCall(NamedTuple):
+    """The result of a supervised call that did not return normally."""
+
+    kind: CallFailureKind
+    message: str
+
+    @classmethod
+    def from_exception(cls, e: BaseException) -> FailedCall:
+        return cls(CallFailureKind.EXCEPTION, f"{type(e).__name__}: {e}")
+
+    @classmethod
+    def from_timeout(cls, timeout: float | None) -> FailedCall:
+        return cls(CallFailureKind.TIMEOUT, f"The call exceeded {timeout} seconds.")
+
+
+def _supervised_worker_loop(conn: Connection) -> None:
+    """Execute calls received through a pipe until the pipe is closed."""
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        func, arg = message
+        try:
+            response = func(arg)
+        except Exception as e:  # NOQA: BLE001
+            response = FailedCall.from_exception(e)
+        try:
+            conn.send(response)
+        except Exception as e:  # NOQA: BLE001
+            # The result could not be pickled, which is reported as an exception.
+            conn.send(FailedCall.from_exception(e))
+
+
+class _SupervisedWorker:
+    """A worker process that executes calls on behalf of the watchdog."""
+
+    def __init__(self) -> None:
+        self._conn, child_conn = _MP_CONTEXT.Pipe()
+        self._process = _MP_CONTEXT.Process(
+            target=_supervised_worker_loop,
+            args=(child_conn,),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        self.num_calls = 0
+        self.is_alive = True
+
+    def call(
+        self,
+        func: Callable[[Any], Any],
+        arg: Any,
+        timeout: float | None,
+    ) -> Any | FailedCall:
+        self.num_calls += 1
+        # A call that cannot be pickled is a setup error rather than an outcome of the
+        # call, so it is raised. Pickling happens before anything is written to the
+        # pipe, so the worker can still be used afterwards.
+        try:
+            self._conn.send((func, arg))
+        except (BrokenPipeError, ConnectionResetError):
+            self.kill()
+            return FailedCall(CallFailureKind.CRASH, "The worker process exited.")
+
+        if not self._conn.poll(timeout):
+            self.kill()
+            return FailedCall.from_timeout(timeout)
+        try:
+            return self._conn.recv()
+        except (EOFError, ConnectionResetError):
+            self.kill()
+            return FailedCall(
+                CallFailureKind.CRASH,
+                f"The worker process exited with code {self._process.exitcode}.",
+            )
+
+    def kill(self) -> None:
+        self.is_alive = False
+        self._conn.close()
+        if self._process.is_alive():
+            self._process.kill()
+        self._process.join()
+
+    def close(self) -> None:
+        self.is_alive = False
+        self._conn.close()
+        self._process.join(timeout=1)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+
+
+class Watchdog:
+    """
+    Execute calls, returning exceptions and timeouts as a `FailedCall`.
+
+    Without isolation, calls are executed in the calling process. A call with a timeout
+    is executed on a separate daemon thread which is abandoned if the call does not
+    complete in time. This protects the run from hangs, but not from crashes, and an
+    abandoned call keeps running in the background.
+
+    With isolation, calls are executed in a pool of supervised worker processes. The
+    function and its argument must be picklable, otherwise the pickling error is raised
+    instead of being returned. A worker is killed and replaced when a
+    call times out or crashes it, and is recycled after the maximum number of calls per
+    worker so that leaked state does not accumulate.
+    """
+
+    def __init__(
+        self,
+        isolate: bool = False,
+        num_workers: int = 1,
+        max_calls_per_worker: int | None = None,
+    ) -> None:
+        if num_workers < 1:
+            raise ValueError("The number of workers must be at least 1.")
+        if max_calls_per_worker is not None and max_calls_per_worker < 1:
+            raise ValueError("The maximum number of calls per worker must be at least 1.")
+
+        self._isolate = isolate
+        self._max_calls_per_worker = max_calls_per_worker
+        self._workers: queue.Queue[_SupervisedWorker | None] = queue.Queue()
+        for _ in range(num_workers):
+            # Workers are started lazily the first time they are checked out.
+            self._workers.put(None)
+
+    def call(
+        self,
+        func: Callable[[Any], Any],
+        arg: Any,
+        timeout: float | None = None,
+    ) -> Any | FailedCall:
+        """Call a function on a single argument under supervision."""
+        if self._isolate:
+            return self._call_isolated(func, arg, timeout)
+        if timeout is None:
+            try:
+                return func(arg)
+            except Exception as e:  # NOQA: BLE001
+                return FailedCall.from_exception(e)
+        return self._call_with_thread(func, arg, timeout)
+
+    def _call_with_thread(
+        self,
+        func: Callable[[Any], Any],
+        arg: Any,
+        timeout: float,
+    ) -> Any | FailedCall:
+        response: list[Any] = []
+
+        def target() -> None:
+            try:
+                response.append(func(arg))
+            except Exception as e:  # NOQA: BLE001
+                response.append(FailedCall.from_exception(e))
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        thread.join(timeout)
+        if thread.is_alive() or len(response) == 0:
+            return FailedCall.from_timeout(timeout)
+        return response[0]
+
+    def _call_isolated(
+        self,
+        func: Callable[[Any], Any],
+        arg: Any,
+        timeout: float | None,
+    ) -> Any | FailedCall:
+        worker = self._workers.get()
+        try:
+            if worker is None or not worker.is_alive:
+                worker = _SupervisedWorker()
+            result = worker.call(func, arg, timeout)
+            if (
+                self._max_calls_per_worker is not None
+                and worker.num_calls >= self._max_calls_per_worker
+            ):
+                worker.close()
+            return result
+        finally:
+            self._workers.put(worker)
+
+    def close(self) -> None:
+        """Stop all supervised worker processes."""
+        while True:
+            try:
+                worker = self._workers.get_nowait()
+            except queue.Empty:
+                return
+            if worker is not None and worker.is_alive:
+                worker.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args, **kwargs) -> None:
+        self.close()
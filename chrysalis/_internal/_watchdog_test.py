@@ -0,0 +1,80 @@
+import os
+import pickle
+import time
+
+import pytest
+
+from chrysalis._internal._watchdog import CallFailureKind, FailedCall, Watchdog
+
+
+def double(x: int) -> int:
+    return x * 2
+
+
+def raise_value_error(x: int) -> int:
+    raise ValueError(f"Invalid input {x}.")
+
+
+def sleep(x: float) -> float:
+    time.sleep(x)
+    return x
+
+
+def crash(x: int) -> int:
+    os._exit(x)
+
+
+def get_pid(_: int) -> int:
+    return os.getpid()
+
+
+@pytest.mark.parametrize("isolate", [False, True])
+def test_successful_call(isolate: bool) -> None:
+    with Watchdog(isolate=isolate) as watchdog:
+        assert watchdog.call(double, 2) == 4
+        assert watchdog.call(double, 3, timeout=5) == 6
+
+
+@pytest.mark.parametrize("isolate", [False, True])
+def test_exception(isolate: bool) -> None:
+    with Watchdog(isolate=isolate) as watchdog:
+        assert watchdog.call(raise_value_error, 1) == FailedCall(
+            CallFailureKind.EXCEPTION, "ValueError: Invalid input 1."
+        )
+
+
+@pytest.mark.parametrize("isolate", [False, True])
+def test_timeout(isolate: bool) -> None:
+    with Watchdog(isolate=isolate) as watchdog:
+        start_time = time.monotonic()
+        result = watchdog.call(sleep, 1, timeout=0.1)
+        assert time.monotonic() - start_time < 1
+        assert isinstance(result, FailedCall)
+        assert result.kind == CallFailureKind.TIMEOUT
+        # The watchdog keeps working after a timeout.
+        assert watchdog.call(double, 2) == 4
+
+
+def test_crash_replaces_worker() -> None:
+    with Watchdog(isolate=True) as watchdog:
+        pid = watchdog.call(get_pid, 0)
+        result = watchdog.call(crash, 3)
+        assert result == FailedCall(
+            CallFailureKind.CRASH, "The worker process exited with code 3."
+        )
+        assert watchdog.call(get_pid, 0) not in {pid, os.getpid()}
+
+
+def test_recycle_worker() -> None:
+    with Watchdog(isolate=True, max_calls_per_worker=2) as watchdog:
+        pids = [watchdog.call(get_pid, 0) for _ in range(4)]
+        assert pids[0] == pids[1]
+        assert pids[2] == pids[3]
+        assert pids[0] != pids[2]
+
+
+def test_unpicklable_call_raises() -> None:
+    with Watchdog(isolate=True) as watchdog:
+        with pytest.raises((AttributeError, pickle.PicklingError)):
+            watchdog.call(lambda x: x, 0)
+        assert watchdog.call(double, 2) == 4
@@ -13,8 +13,6 @@ from rich.table import Table
 from rich.progress import Progress, BarColumn, TextColumn, TimeElapsedColumn, SpinnerColumn
 from rich.live import Live
 
-import time
-
 from chrysalis._internal._search import SearchStrategy
 
 # ASCII ART Credit: https://patorjk.com/software/taag.
@@ -77,9 +75,7 @@ class TerminalUIWriter[T, R]:
         
         self._live_display = None
         self._result_bar = Text()
-        
-        self._time = 0
-        
+
         self._success_count = 0
         self._failure_count = 0
 
@@ -106,18 +102,30 @@ class TerminalUIWriter[T, R]:
         search_strategy: SearchStrategy,
         chain_length: int,
         num_chains: int,
+        time_budget: float | None = None,
+        run_id: str | None = None,
     ) -> None:
         if self._pretty:
             self._console.print(Panel(Text("CHRYSALIS Metamorphic Test", justify="center", style="bold magenta")))
+            if run_id is not None:
+                self._console.print(f"[bold cyan]Run ID:[/] {run_id}")
             self._console.print(f"[bold cyan]Search Strategy:[/] {search_strategy.name}")
             self._console.print(f"[bold cyan]Chain Length:[/] {chain_length}")
-            self._console.print(f"[bold cyan]Num Chains:[/] {num_chains}")
-            self._console.print()            
+            if time_budget is None:
+                self._console.print(f"[bold cyan]Num Chains:[/] {num_chains}")
+            else:
+                self._console.print(f"[bold cyan]Time Budget:[/] {time_budget:.2f}s")
+            self._console.print()
         else:
             print(_ASCII_ART_CHRYSALIS)
+            if run_id is not None:
+                print(f"Run ID: {run_id}")
             print(f"Search Strategy: {search_strategy.name}")
             print(f"Chain Length: {chain_length}")
-            print(f"Num Chains: {num_chains}")
+            if time_budget is None:
+                print(f"Num Chains: {num_chains}")
+            else:
+                print(f"Time Budget: {time_budget:.2f}s")
             print()
 
     def _print_tested_relation_level_failure(self, success: bool) -> None:
@@ -135,13 +143,11 @@ class TerminalUIWriter[T, R]:
         if self._pretty and self._verbosity == Verbosity.ALL:
             self._live_display = Live(self._result_bar, console=self._console, refresh_per_second=10)
             self._live_display.start()
-        self._time = time.time()
 
     def stop_live(self):
         if self._live_display:
             self._live_display.stop()
             self._live_display = None
-        self._time = time.time() - self._time
     
     def _print_tested_relation_level_all(self, success: bool, metadata: dict | None = None) -> None:
         char = "[green].[/]" if success else "[red]F[/]"
@@ -208,19 +214,30 @@ class TerminalUIWriter[T, R]:
                 print("=" * get_terminal_size())
                 print()
 
-    def print_summary(self) -> None:
+    @min_verbosity_level(verbosity=Verbosity.FAILURE)
+    def print_summary(
+        self,
+        time_taken: float,
+        statistics: dict[str, int] | None = None,
+    ) -> None:
+        if statistics is None:
+            statistics = {}
         if self._pretty:
             self._console.print()
             self._console.rule("[bold green]Summary")
             self._console.print(f"[green]✔ Passed:[/] {self._success_count}")
             self._console.print(f"[red]✘ Failed:[/] {self._failure_count}")
-            self._console.print(f"[blue]🕒 Time:[/] {self._time:.2f}s")
+            self._console.print(f"[blue]🕒 Time:[/] {time_taken:.2f}s")
+            for name, value in statistics.items():
+                self._console.print(f"[cyan]{name}:[/] {value}")
         else:
             print()
             print("Summary")
             print(f"Passed: {self._success_count}")
             print(f"Failed: {self._failure_count}")
-            print(f"Time: {self._time:.2f}s")
+            print(f"Time: {time_taken:.2f}s")
+            for name, value in statistics.items():
+                print(f"{name}: {value}")
 
     def start_progress(self) -> None:
         if self._pretty and self._progress:
@@ -134,3 +134,25 @@ def test_print_summary_pretty() -> None:
     assert "✔ Passed" in output
     assert "✘ Failed" in output
     assert "4.56" in output
+
+
+def test_print_summary_statistics(capsys: pytest.CaptureFixture) -> None:
+    writer = TerminalUIWriter(verbosity=Verbosity.ALL, pretty=False)
+
+    writer.print_summary(time_taken=0.5, statistics={"Skipped SUT calls": 12})
+    captured = capsys.readouterr()
+
+    assert "Skipped SUT calls: 12" in captured.out
+
+
+def test_print_header_time_budget(capsys: pytest.CaptureFixture) -> None:
+    writer = TerminalUIWriter(verbosity=Verbosity.ALL, pretty=False)
+    writer.print_header(
+        search_strategy=SearchStrategy.RANDOM,
+        chain_length=10,
+        num_chains=5,
+        time_budget=90,
+    )
+    captured = capsys.readouterr()
+    assert "Time Budget: 90.00s" in captured.out
+    assert "Num Chains" not in captured.out